@@ -0,0 +1,86 @@
+'''Command line startup benchmark.
+
+Run `rpscripts info` on the example JSON file a few times and fail (exit status 1) if the best wall time is over the given budget. The slowest imports (from `python -X importtime`) are printed to help to find eager heavy imports.
+
+Usage: python benchmarks/startup.py [--budget SECONDS] [--runs N] [--filename JSON]
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_FILENAME = os.path.join(ROOT_DIR, 'examples', 'schumann-opus48no2.json')
+
+## Default budget of `rpscripts info` startup (in seconds)
+BUDGET = 1.0
+RUNS = 5
+SLOWEST_IMPORTS = 10
+
+
+def get_command(filename: str, importtime=False) -> list:
+    '''Return the `rpscripts info` command line of a given filename.'''
+
+    command = [sys.executable]
+    if importtime:
+        command.extend(['-X', 'importtime'])
+    command.extend(['-m', 'rpscripts.cli', 'info', filename])
+    return command
+
+
+def get_environment() -> dict:
+    '''Return the subprocesses' environment, with the repository in the Python path.'''
+
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT_DIR, environment.get('PYTHONPATH')]))
+    return environment
+
+
+def get_wall_time(filename: str) -> float:
+    '''Return the wall time (in seconds) of a `rpscripts info` run.'''
+
+    start = time.perf_counter()
+    subprocess.run(get_command(filename), env=get_environment(), check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def get_slowest_imports(filename: str, number=SLOWEST_IMPORTS) -> list:
+    '''Return a list of (cumulative microseconds, module) tuples of the slowest top-level imports of a `rpscripts info` run.'''
+
+    process = subprocess.run(get_command(filename, True), env=get_environment(), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        # Top-level imports have a single space of indentation
+        if module.startswith(' ') and not module.startswith('  '):
+            imports.append((int(cumulative), module.strip()))
+    return sorted(imports, reverse=True)[:number]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='rpscripts info startup benchmark')
+    parser.add_argument('-b', '--budget', help='startup time budget in seconds. Default={}'.format(BUDGET), default=BUDGET, type=float)
+    parser.add_argument('-r', '--runs', help='number of runs. Default={}'.format(RUNS), default=RUNS, type=int)
+    parser.add_argument('-f', '--filename', help='JSON filename. Default: the example file', default=EXAMPLE_FILENAME, type=str)
+    args = parser.parse_args()
+
+    times = [get_wall_time(args.filename) for _ in range(args.runs)]
+    best = min(times)
+
+    print('Slowest top-level imports:')
+    for cumulative, module in get_slowest_imports(args.filename):
+        print('{:>10.1f} ms  {}'.format(cumulative / 1000, module))
+    print('rpscripts info startup: best {:.3f}s, median {:.3f}s of {} runs (budget {:.3f}s)'.format(best, sorted(times)[len(times) // 2], args.runs, args.budget))
+
+    if best > args.budget:
+        print('Startup is over the budget.')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,49 @@
-'''Provide main modules and classes.'''
+'''Provide main modules and classes.
+
+The modules and classes are imported on their first access, so importing the package (such as in the command line interface startup) doesn't import music21, matplotlib, pandas and statsmodels.'''
+
+import importlib
 
 from ._version import __version__
 
-from .calculator import ParsemaeSegment
-from .lib.partition import Partition
-from .lib.base import RPData
-
-from . import annotator
-from . import calculator
-from . import converter
-from . import info
-from . import labeler
-from . import plotter
-from . import stats
-from . import trimmer
-from . import utils
-from . import finder
-
-from . import tclass
-from . import tcontour
+
+## Main classes and their modules
+CLASSES_MODULES = {
+    'ParsemaeSegment': '.calculator',
+    'Partition': '.lib.partition',
+    'RPData': '.lib.base',
+}
+
+MODULES = [
+    'annotator',
+    'calculator',
+    'converter',
+    'info',
+    'labeler',
+    'plotter',
+    'stats',
+    'trimmer',
+    'utils',
+    'finder',
+    'concatenator',
+    'subsetter',
+    'tclass',
+    'tcontour',
+    'operations',
+    'pipeline',
+    'subparsers',
+]
+
+
+def __getattr__(name: str):
+    '''Import and return the given main class or module on its first access.'''
+
+    if name in CLASSES_MODULES:
+        return getattr(importlib.import_module(CLASSES_MODULES[name], __name__), name)
+    if name in MODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+
+def __dir__() -> list:
+    return sorted(list(globals().keys()) + list(CLASSES_MODULES.keys()) + MODULES)
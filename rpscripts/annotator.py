@@ -3,7 +3,7 @@
 from copy import deepcopy
 import music21
 
-from .lib.base import RPDATA_ATTRIBUTES, CustomException, GeneralSubparser, RPData, file_rename, is_midi_file
+from .lib.base import RPDATA_ATTRIBUTES, CustomException, RPData, file_rename, is_midi_file
 
 
 def main(m21_score: music21.stream.Score, rpdata: RPData, outfilename: str, labels_name='partitions') -> None:
@@ -51,38 +51,27 @@ def main(m21_score: music21.stream.Score, rpdata: RPData, outfilename: str, labe
     new_score.write(fmt='mxl', fp=outfilename)
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-    def setup(self) -> None:
-        self.program_name = 'annotate'
-        self.program_help = 'Digital score annotator'
+    sco_fname = args.score_filename
+    json_fname = args.filename
 
-    def add_arguments(self) -> None:
-        attributes = ', '.join(RPDATA_ATTRIBUTES)
+    if is_midi_file(sco_fname):
+        raise CustomException('Invalid file format. Convert the given MIDI file to MusicXML. Use MuseScore or other converter.')
 
-        self.parser.add_argument('-s', '--score_filename', help="digital score filename (XML, MXL, and KRN)", type=str, required=True)
-        self.parser.add_argument('-t', '--type', help="type of annotation ({})".format(attributes), type=str, default='partitions')
+    print('Running script on {} filename...'.format(sco_fname))
 
-    def handle(self, args):
-        sco_fname = args.score_filename
-        json_fname = args.filename
+    try:
+        sco = music21.converter.parse(sco_fname)
+    except:
+        raise CustomException('Error on given score parsing.')
 
-        if is_midi_file(sco_fname):
-            raise CustomException('Invalid file format. Convert the given MIDI file to MusicXML. Use MuseScore or other converter.')
+    outfile = file_rename(json_fname, 'mxl', 'annotated-{}'.format(args.type))
 
-        print('Running script on {} filename...'.format(sco_fname))
+    rpdata = RPData(json_fname)
 
-        try:
-            sco = music21.converter.parse(sco_fname)
-        except:
-            raise CustomException('Error on given score parsing.')
+    if args.type not in RPDATA_ATTRIBUTES:
+        raise AttributeError('Chosen type "{}" is not available.'.format(args.type))
 
-        outfile = file_rename(json_fname, 'mxl', 'annotated-{}'.format(args.type))
-
-        rpdata = RPData(json_fname)
-
-        if args.type not in RPDATA_ATTRIBUTES:
-            raise AttributeError('Chosen type "{}" is not available.'.format(args.type))
-
-        main(sco, rpdata, outfile, args.type)
+    main(sco, rpdata, outfile, args.type)
@@ -1,5 +1,6 @@
 '''This module provides classes and functions to calculate the rhythmic partitions from a given digital score.'''
 
+import bisect
 import copy
 import multiprocessing
 import os
@@ -9,7 +10,8 @@ from fractions import Fraction
 from tqdm import tqdm
 
 from .lib.partition import Partition
-from .lib.base import CustomException, EventLocation, GeneralSubparser, RPData, file_rename, find_nearest_smaller, is_midi_file, make_fraction
+from .lib.sounding import PartEvents, PartsTable, get_parts_table_filename
+from .lib.base import CategoricalSequence, CustomException, EventLocation, RPData, file_rename, find_nearest_smaller, is_midi_file, make_fraction
 
 
 SCORE_FILETYPES = [
@@ -247,6 +249,23 @@ def make_offset_map(m21part: music21.stream.Part) -> dict:
     return new_offset_map
 
 
+def get_instrument_section(m21_instrument) -> str:
+    '''Return the orchestral section (see `SECTIONS` in sounding module) of a given Music21 Instrument object.'''
+
+    pairs = [
+        ('strings', music21.instrument.StringInstrument),
+        ('woodwinds', music21.instrument.WoodwindInstrument),
+        ('brass', music21.instrument.BrassInstrument),
+        ('percussion', music21.instrument.Percussion),
+        ('keyboards', music21.instrument.KeyboardInstrument),
+        ('voices', music21.instrument.Vocalist),
+    ]
+    for section, instrument_class in pairs:
+        if isinstance(m21_instrument, instrument_class):
+            return section
+    return 'others'
+
+
 class MusicalEvent(object):
     '''Auxiliary musical event class.
 
@@ -387,6 +406,10 @@ class PartSoundingMap(object):
     def __init__(self, **kwargs) -> None:
         self.single_events = None
         self.attack_global_offsets = []
+        self.intervals = []
+        self.name = ''
+        self.instrument = ''
+        self.section = 'others'
 
         if 'kwargs' in kwargs:
             self.__dict__.update(kwargs['kwargs'])
@@ -423,17 +446,38 @@ class PartSoundingMap(object):
                 (closed_beginning, open_ending): single_event
             })
             self.attack_global_offsets.append(closed_beginning)
+            self.intervals.append((closed_beginning, open_ending))
+
+    def set_part_info(self, m21_part: music21.stream.Part) -> None:
+        '''Set name, instrument and section attributes from a given Music21 part.'''
+
+        m21_instrument = m21_part.getInstrument()
+        self.instrument = m21_instrument.instrumentName or ''
+        self.name = m21_part.partName or self.instrument
+        self.section = get_instrument_section(m21_instrument)
+
+    def get_part_events(self) -> PartEvents:
+        '''Return the part's events as a `PartEvents` object.'''
+
+        events = [self.single_events[interval] for interval in self.intervals]
+        return PartEvents(
+            name=self.name,
+            instrument=self.instrument,
+            section=self.section,
+            starts=list(self.attack_global_offsets),
+            durations=[event.duration for event in events],
+            pitches=[event.number_of_pitches for event in events],
+        )
 
     def get_single_event_by_location(self, global_offset: Fraction) -> SingleEvent:
         '''Return a `SingleEvent` object from its location.'''
 
-        beginning = find_nearest_smaller(global_offset, self.attack_global_offsets)
+        ind = bisect.bisect_right(self.attack_global_offsets, global_offset) - 1
 
-        if beginning == -1: # No event to return
+        if ind < 0: # No event to return
             return
 
-        ind = self.attack_global_offsets.index(beginning)
-        _, ending = list(self.single_events.keys())[ind]
+        beginning, ending = self.intervals[ind]
         s_event = None
         if global_offset >= beginning and global_offset < ending:
             s_event = copy.deepcopy(self.single_events[(beginning, ending)])
@@ -470,9 +514,14 @@ class ScoreSoundingMap(object):
         '''Creates a `PartSoundingMap` from a given Music21 Part and add it to sounding_maps and attacks attributes.'''
 
         psm = PartSoundingMap()
+        psm.set_part_info(m21_part)
         psm.set_from_m21_part(m21_part)
         del m21_part
         if psm.single_events:
+            # Parts made of split chords have no instrument. They get the previous part's info.
+            if not psm.instrument and self.sounding_maps:
+                previous = self.sounding_maps[-1]
+                psm.name, psm.instrument, psm.section = previous.name, previous.instrument, previous.section
             self.sounding_maps.append(psm)
             self.attacks.extend(psm.attack_global_offsets)
             self.attacks = sorted(set(self.attacks))
@@ -547,6 +596,7 @@ class ParsemaeSegment(object):
     def __init__(self, **kwargs) -> None:
         self.parsemae = []
         self._measure_offsets = {}
+        self.parts_table = None
 
         if 'kwargs' in kwargs:
             self.__dict__.update(kwargs['kwargs'])
@@ -565,6 +615,9 @@ class ParsemaeSegment(object):
         del m21_score
         self.parsemae = ssm.make_parsemae()
         self._measure_offsets = ssm.measure_offsets
+        self.parts_table = PartsTable()
+        self.parts_table.offset_map = dict(ssm.measure_offsets)
+        self.parts_table.parts = [psm.get_part_events() for psm in ssm.sounding_maps]
         del ssm
 
     def get_data(self) -> tuple:
@@ -603,7 +656,7 @@ class ParsemaeSegment(object):
             data['Density-number'].append(partition.get_density_number())
             data['Agglomeration'].append(agglomeration)
             data['Dispersion'].append(dispersion)
-            data['Parts'].append(partition.parts)
+            data['Parts'].append(list(partition.parts))
 
             if partition_str not in values_map.keys():
                 values_map[partition_str] = (agglomeration, dispersion)
@@ -620,13 +673,13 @@ class ParsemaeSegment(object):
         # offset_map_conv = {mn: fraction_to_string(offset) for mn, offset in offset_map_orig.items()} # values as strings
 
         rpdata.data, rpdata.values_map = self.get_data()
-        rpdata.partitions = rpdata.data['Partition']
+        rpdata.partitions = CategoricalSequence(rpdata.data['Partition'])
         rpdata.size = len(rpdata.partitions)
         rpdata.offset_map = offset_map_conv
         return rpdata
 
 
-def main(filename, csv, equally_sized):
+def main(filename, csv, equally_sized, compact=False, compress=False, parts_table=False):
     sco = split_score(filename)
     segment = ParsemaeSegment()
     segment.make_from_music21_score(sco)
@@ -634,54 +687,48 @@ def main(filename, csv, equally_sized):
     del sco
 
     rpdata = segment.make_rpdata(filename)
+    if compact:
+        rpdata.schema_version = 2
+    rpdata.compress = compress
     rpdata.save_to_file()
 
+    if parts_table:
+        segment.parts_table.compress = compress
+        segment.parts_table.save_to_file(get_parts_table_filename(filename))
+
     del segment
 
     if csv:
         rpdata.save_to_csv(equally_sized)
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-    def setup(self) -> None:
-        self.program_name = 'calc'
-        self.program_help = 'Calculator'
-        self.add_parent = False
+    print('Running script on {} file...'.format(args.filename))
 
-    def add_arguments(self) -> None:
-        self.parser.add_argument('filename', help='digital score filename (XML, MXL, and KRN)', type=str)
-        self.parser.add_argument('-d', '--dir', help='folder with digital score files', default=False, action='store_true')
-        self.parser.add_argument('-m', '--multiprocessing', help='multiprocessing', default=False, action='store_true')
-        self.parser.add_argument('-c', '--csv', help='output data in a CSV file.', default=False, action='store_true')
-        self.parser.add_argument('-e', '--equally_sized', help='generate equally-sized events', default=False, action='store_true')
+    if args.dir:
+        filetypes = SCORE_FILETYPES[:]
+        filetypes.extend([f.upper() for f in SCORE_FILETYPES])
+        filetypes.extend([f.lower() for f in SCORE_FILETYPES])
+        filetypes = list(set(filetypes))
 
-    def handle(self, args):
-        print('Running script on {} file...'.format(args.filename))
+        if not os.path.isdir(args.filename):
+            raise CustomException('The given filename is not of directory type.')
+        else:
+            files = [
+                f for f in map(lambda x: os.path.join(args.filename, x), sorted(os.listdir(args.filename)))
+                if os.path.isfile(f) and f.split('.')[-1] in filetypes
+            ]
 
-        if args.dir:
-            filetypes = SCORE_FILETYPES[:]
-            filetypes.extend([f.upper() for f in SCORE_FILETYPES])
-            filetypes.extend([f.lower() for f in SCORE_FILETYPES])
-            filetypes = list(set(filetypes))
+            total_cpus = multiprocessing.cpu_count()
 
-            if not os.path.isdir(args.filename):
-                raise CustomException('The given filename is not of directory type.')
+            if args.multiprocessing and total_cpus > 3:
+                with multiprocessing.Pool(total_cpus - 2) as p:
+                    out = p.starmap(main, [(f, args.csv, args.equally_sized, args.compact, args.gzip, args.parts_table) for f in files])
             else:
-                files = [
-                    f for f in map(lambda x: os.path.join(args.filename, x), sorted(os.listdir(args.filename)))
-                    if os.path.isfile(f) and f.split('.')[-1] in filetypes
-                ]
+                for f in files:
+                    main(f, args.csv, args.equally_sized, args.compact, args.gzip, args.parts_table)
 
-                total_cpus = multiprocessing.cpu_count()
-
-                if args.multiprocessing and total_cpus > 3:
-                    with multiprocessing.Pool(total_cpus - 2) as p:
-                        out = p.starmap(main, [(f, args.csv, args.equally_sized) for f in files])
-                else:
-                    for f in files:
-                        main(f, args.csv, args.equally_sized)
-
-        else:
-            main(args.filename, args.csv, args.equally_sized)
+    else:
+        main(args.filename, args.csv, args.equally_sized, args.compact, args.gzip, args.parts_table)
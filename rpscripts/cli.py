@@ -1,52 +1,24 @@
-'''This module provides the command line interface.'''
+'''This module provides the command line interface.
+
+The subcommands' parsers are built from their arguments in `subparsers` module, which doesn't import the subcommands' modules. A subcommand's module (and its heavy libraries, such as music21 and matplotlib) is imported only when the subcommand runs, so help messages and argument errors are fast.'''
 
 import argparse
 
 from ._version import __version__
+from .lib.base import get_memos_stats_description
+from .subparsers import SUBPARSERS
 
-from . import annotator
-from . import calculator
-from . import converter
-from . import info
-from . import labeler
-from . import plotter
-from . import stats
-from . import trimmer
-from . import utils
-from . import finder
-
-from . import tclass
-from . import tcontour
 
 def main() -> None:
     '''Parse the given command line arguments.'''
 
-    # Subparsers
-    parsers = [
-        calculator.Subparser,
-        plotter.Subparser,
-        annotator.Subparser,
-        labeler.Subparser,
-        info.Subparser,
-        utils.Subparser,
-        stats.Subparser,
-        converter.Subparser,
-        trimmer.Subparser,
-        finder.Subparser
-    ]
-
-    # Add new custom arg parsers here
-    parsers.extend([
-        tclass.Subparser,
-        tcontour.Subparser,
-    ])
-
     main_parser = argparse.ArgumentParser(
                 prog = 'rpscripts',
                 description = 'Rhythmic Partitioning Scripts.',
                 epilog = 'Further information available at https://github.com/msampaio/rpScripts')
 
     main_parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    main_parser.add_argument('-ms', '--memo_stats', help='print the partitions memos\' hits and misses after the subcommand', default=False, action='store_true')
 
     subparsers = main_parser.add_subparsers(
         title='Subcommands',
@@ -54,8 +26,8 @@ def main() -> None:
     )
 
     # Initialize subparsers
-    for parser_class in parsers:
-        parser_class(subparsers).add_arguments()
+    for subparser_class in SUBPARSERS:
+        subparser_class(subparsers).add_arguments()
 
     args = main_parser.parse_args()
 
@@ -65,6 +37,9 @@ def main() -> None:
     except AttributeError:
         main_parser.error('Too few arguments. Try rpscripts -h for help.')
 
+    if args.memo_stats:
+        print(get_memos_stats_description())
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,27 @@
+'''This module concatenates calculator's JSON outputs (such as the movements of a multi-movement work) into a single JSON file.'''
+
+
+from .lib.base import CustomException, RPData, file_rename
+
+
+def main(filenames: list, output=None, merge_parsemae=True, label_pieces=False) -> None:
+    '''Concatenate the given JSON files in the given order and save the result into the output filename.
+
+    If no output filename is given, the first filename is used with a `concat` suffix.'''
+
+    if len(filenames) < 2:
+        raise CustomException('At least two JSON files are necessary for concatenation.')
+
+    rpdata_list = [RPData(filename) for filename in filenames]
+    new_rpdata = rpdata_list[0].concat(rpdata_list[1:], merge_parsemae, label_pieces)
+
+    if not output:
+        output = file_rename(filenames[0], 'json', 'concat')
+    new_rpdata.path = output
+    new_rpdata.save_to_file()
+
+
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
+
+    main(args.filenames, args.output, not args.no_merge, args.label_pieces)
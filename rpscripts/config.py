@@ -1,28 +1,33 @@
 '''This module contains RP Scripts' global variables.
 
-These variables are used in multiple modules.'''
+These variables are used in multiple modules. This module has no side effects: the auxiliary files (such as the lattice map) are read or created only on their first use.'''
 
 
 import os
-import shutil
-
-import rpscripts
 
 lattice_map_filename = 'lattice_map.json'
+lattice_graph_dirname = 'lattice_graph'
+complexity_index_filename = 'complexity_index.npy'
 
 ENCODING = 'utf-8'
 HOME_DIR = os.path.expanduser('~')
 AUX_NAME = 'rps_aux'
 AUX_DIR = os.path.join(HOME_DIR, AUX_NAME)
 LATTICE_MAP_PATH = os.path.join(AUX_DIR, lattice_map_filename)
-
-# Copy lattice map it it doesn't exist
-if not os.path.exists(LATTICE_MAP_PATH):
-    if not os.path.exists(AUX_DIR):
-        print('Creating the folder {}...'.format(AUX_DIR))
-        os.mkdir(AUX_DIR)
-
-    print('Setting up lattice map...')
-    mpath = os.path.dirname(os.path.abspath(rpscripts.__file__))
-    orig_dir = os.path.join(mpath, 'data')
-    shutil.copy(os.path.join(orig_dir, lattice_map_filename), AUX_DIR)
\ No newline at end of file
+LATTICE_GRAPH_PATH = os.path.join(AUX_DIR, lattice_graph_dirname)
+COMPLEXITY_INDEX_PATH = os.path.join(AUX_DIR, complexity_index_filename)
+
+## Environment variable with the user's lattice map path. It overrides LATTICE_MAP_PATH.
+LATTICE_MAP_VARIABLE = 'RPSCRIPTS_LATTICE_MAP'
+
+## Available pipeline steps in running order
+STEPS = [
+    'calc',
+    'tclass',
+    'tcontour',
+    'ops',
+    'plot',
+    'stats',
+]
+
+DEFAULT_STEPS = 'calc,tclass,tcontour,plot,stats'
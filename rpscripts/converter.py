@@ -1,7 +1,7 @@
-'''This module converts calculator's JSON output into CSV file with or without intermediary equally-sized events.'''
+'''This module converts calculator's JSON output into CSV file with or without intermediary equally-sized events. It also converts JSON files between the full and the compact schemas.'''
 
 
-from .lib.base import GeneralSubparser, RPData
+from .lib.base import RPData
 
 
 def main(filename: str, equally_sized=False) -> None:
@@ -13,19 +13,24 @@ def main(filename: str, equally_sized=False) -> None:
     rp_data.save_to_csv(equally_sized)
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
+def convert_schema(filename: str, schema_version: int, compress=False) -> None:
+    '''Rewrite the given JSON file in the given schema version (1: full, 2: compact).'''
 
-    def setup(self) -> None:
-        self.program_name = 'convert'
-        self.program_help = 'JSON file converter. Convert JSON to CSV file'
+    rp_data = RPData(filename)
+    rp_data.schema_version = schema_version
+    rp_data.compress = compress
+    rp_data.save_to_file()
+
+
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-    def add_arguments(self) -> None:
-        self.parser.add_argument('-e', '--equally_sized', help='generate equally-sized events', default=False, action='store_true')
+    if args.json_schema:
+        convert_schema(args.filename, args.json_schema, args.gzip)
+        return
 
-    def handle(self, args) -> None:
-        equally_sized = False
-        if args.equally_sized:
-            equally_sized = True
+    equally_sized = False
+    if args.equally_sized:
+        equally_sized = True
 
-        main(args.filename, equally_sized)
+    main(args.filename, equally_sized)
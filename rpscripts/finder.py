@@ -3,7 +3,7 @@
 import pandas
 
 from .config import ENCODING
-from .lib.base import CustomException, GeneralSubparser, RPData, file_rename
+from .lib.base import CategoricalSequence, CustomException, RPData, as_categorical, file_rename
 
 MAX_TO_PRINT = 30
 
@@ -26,24 +26,30 @@ def main(json_filename: str, field_name: str, value: str) -> None:
 
     if field_name == 'Parts':
         raw_data = list(map(len, raw_data))
-    series = pandas.Series(raw_data, index = rpdata.data['Index'])
-    df = pandas.DataFrame(rpdata.data, index = rpdata.data['Index'])
+    df = rpdata.to_dataframe(['Partition', 'Density-number', 'Parts', 'Agglomeration', 'Dispersion'])
+    df.index = rpdata.data['Index']
     df['Number-parts'] = df['Parts'].apply(len)
     cols = ['Partition', 'Density-number', 'Number-parts', 'Agglomeration', 'Dispersion']
     if len(rpdata.tcontour) > 0:
-        df['Tcontour'] = rpdata.tcontour
+        df['Tcontour'] = as_categorical(rpdata.tcontour).to_categorical()
         cols.append('Tcontour')
 
     if len(rpdata.tclass) > 0:
-        df['Tclass'] = rpdata.tclass
+        df['Tclass'] = as_categorical(rpdata.tclass).to_categorical()
         cols.append('Tclass')
 
     df = df[cols]
 
-    if value == -1:
-        value = series.max()
+    if isinstance(raw_data, CategoricalSequence) and value != -1:
+        ## Compare integer codes instead of the values.
+        mask = raw_data.codes == raw_data.get_code(value)
+    else:
+        series = pandas.Series(list(raw_data), index = rpdata.data['Index'])
+        if value == -1:
+            value = series.max()
+        mask = (series == value).values
 
-    data = df[series==value]
+    data = df[mask]
     size = len(data)
     if size > 0:
         output = ''
@@ -60,48 +66,33 @@ def main(json_filename: str, field_name: str, value: str) -> None:
         print('The given event is not in the given file.')
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
-
-    def setup(self) -> None:
-        self.program_name = 'find'
-        self.program_help = 'Events finder. Find events in the given JSON file'
-
-    def add_arguments(self) -> None:
-        self.parser.add_argument('-p', '--partition', help="Partition (between quotation marks)", type=str)
-        self.parser.add_argument('-d', '--density_number', help="Density-number", type=int)
-        self.parser.add_argument('-n', '--number_of_parts', help="Number of parts", type=int)
-        self.parser.add_argument('-tcl', '--tclass', help="Textural class", type=str)
-        self.parser.add_argument('-tcn', '--tcontour', help="Textural contour", type=str)
-
-        self.parser.add_argument('-md', '--max_density_number', help="Maximum density-number", action='store_true', default=False)
-        self.parser.add_argument('-mn', '--max_number_of_parts', help="Maximum density-number", action='store_true', default=False)
-
-    def handle(self, args):
-        print('Running script on {} filename...'.format(args.filename))
-
-        field_name = 'partition'
-
-        if args.max_density_number:
-            field_name = 'Density-number'
-            value = -1
-        elif args.max_number_of_parts:
-            field_name = 'Parts'
-            value = -1
-        elif args.partition:
-            field_name = 'Partition'
-            value = args.partition
-        elif args.density_number:
-            field_name = 'Density-number'
-            value = args.density_number
-        elif args.number_of_parts:
-            field_name = 'Parts'
-            value = args.number_of_parts
-        elif args.tclass:
-            field_name = 'tclass'
-            value = args.tclass
-        elif args.tcontour:
-            field_name = 'tcontour'
-            value = args.tcontour
-
-        main(args.filename, field_name, value)
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
+
+    print('Running script on {} filename...'.format(args.filename))
+
+    field_name = 'partition'
+
+    if args.max_density_number:
+        field_name = 'Density-number'
+        value = -1
+    elif args.max_number_of_parts:
+        field_name = 'Parts'
+        value = -1
+    elif args.partition:
+        field_name = 'Partition'
+        value = args.partition
+    elif args.density_number:
+        field_name = 'Density-number'
+        value = args.density_number
+    elif args.number_of_parts:
+        field_name = 'Parts'
+        value = args.number_of_parts
+    elif args.tclass:
+        field_name = 'tclass'
+        value = args.tclass
+    elif args.tcontour:
+        field_name = 'tcontour'
+        value = args.tcontour
+
+    main(args.filename, field_name, value)
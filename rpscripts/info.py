@@ -1,35 +1,31 @@
 '''This shows information about data.'''
 
 
-from .lib.base import GeneralSubparser, RPData
+from .lib.base import RPData
 
 
 def main(filename: str) -> None:
     '''Print basic information about the given filename.'''
 
     rpdata = RPData(filename)
-    distinct_partitions = len(set(rpdata.partitions))
-    distinct_density_numbers = len(set(rpdata.data['Density-number']))
+    summary = rpdata.get_summary()
+    distinct_partitions = summary['distinct_partitions']
+    distinct_density_numbers = summary['distinct_density_numbers']
     ratio = round(distinct_partitions / distinct_density_numbers, 2)
     data = {
-        'This file contains labels data': rpdata.labels != [],
-        'Number of events': rpdata.size,
+        'This file contains labels data': len(rpdata.labels) > 0,
+        'Number of events': summary['size'],
         'Number of distinct partitions': distinct_partitions,
         'Number of distinct density numbers': distinct_density_numbers,
         'Ratio partitions/dn': ratio,
-        'Highest dispersion index': max(rpdata.data['Dispersion']),
-        'Highest agglomeration index': max(rpdata.data['Agglomeration']),
+        'Highest dispersion index': summary['highest_dispersion'],
+        'Highest agglomeration index': summary['highest_agglomeration'],
     }
     for k, v in data.items():
         print('{}: {}'.format(k, v))
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-    def setup(self) -> None:
-        self.program_name = 'info'
-        self.program_help = 'JSON data info.'
-
-    def handle(self, args):
-        main(args.filename)
+    main(args.filename)
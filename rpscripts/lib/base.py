@@ -1,15 +1,21 @@
-'''This module provides RPScripts' basic classes and methods '''
+'''This module provides RPScripts' basic classes and methods.
+
+The slow libraries (pandas and graphviz) are imported only inside the functions that use them, for a fast command line startup.'''
 
 from fractions import Fraction
 import argparse
+import bisect
 import copy
 import csv
-import graphviz
+import functools
+import gzip
+import hashlib
+import importlib
+import itertools
 import json
-import math
 import numpy
 import os
-import pandas
+import tempfile
 
 from ..config import ENCODING
 
@@ -21,8 +27,108 @@ RPDATA_ATTRIBUTES = [
     'partitions',
     'tclass',
     'tcontour',
+    'operations',
+    'reduction',
+]
+
+## RP Data attributes relative to the whole piece. They are not kept in concatenations.
+PIECE_RELATIVE_ATTRIBUTES = [
+    'tcontour',
+    'reduction',
+]
+
+## RP Data attributes relative to the previous event. The first event has no value (an empty string) and they are not kept in concatenations.
+TRANSITION_ATTRIBUTES = [
+    'operations',
+]
+
+## Texture data columns
+TEXTURE_DATA_COLUMNS = [
+    'Index', # 0
+    'Measure number', # 1
+    'Offset', # 2
+    'Global offset', # 3
+    'Duration', # 4
+    'Partition', # 5
+    'Density-number', # 6
+    'Agglomeration', # 7
+    'Dispersion', # 8
+    'Parts', # 9
+]
+
+## Columns stored in the compact (version 2) schema. The other ones are derived.
+PRIMARY_COLUMNS = [
+    'Measure number',
+    'Offset',
+    'Global offset',
+    'Duration',
+    'Partition',
 ]
 
+FRACTION_COLUMNS = [
+    'Offset',
+    'Global offset',
+    'Duration',
+]
+
+INDEX_COLUMNS = [
+    'Agglomeration',
+    'Dispersion',
+]
+
+GZIP_MAGIC_NUMBER = b'\x1f\x8b'
+
+CATEGORICAL_CODES_TYPE = numpy.int32
+
+## Sidecar file of derived attributes (RPDATA_ATTRIBUTES and labels)
+SIDECAR_SUFFIX = 'attributes'
+SIDECAR_EXTENSION = 'jsonl'
+
+## Memo functions
+
+## Size of each memo. A piece has only a few hundred distinct partitions.
+MEMO_SIZE = 4096
+
+## Memoized functions by name. See memoize function.
+MEMOIZED_FUNCTIONS = {}
+
+
+def memoize(function):
+    '''Decorate a given function with a process-wide, size-bounded (least recently used) memo.
+
+    The memo is registered into `MEMOIZED_FUNCTIONS` for the hits and misses statistics.'''
+
+    memoized = functools.lru_cache(maxsize=MEMO_SIZE)(function)
+    MEMOIZED_FUNCTIONS[function.__name__] = memoized
+    return memoized
+
+
+def get_memos_stats() -> dict:
+    '''Return the hits, misses and current size of each memoized function.'''
+
+    stats = {}
+    for name, function in MEMOIZED_FUNCTIONS.items():
+        info = function.cache_info()
+        stats[name] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+    return stats
+
+
+def get_memos_stats_description() -> str:
+    '''Return a description of the memos' statistics, one memo in each line.'''
+
+    rows = []
+    for name, stats in get_memos_stats().items():
+        rows.append('{}: {} hits, {} misses, {} entries'.format(name, stats['hits'], stats['misses'], stats['size']))
+    return '\n'.join(rows)
+
+
+def clear_memos() -> None:
+    '''Clear all the memos and their statistics.'''
+
+    for function in MEMOIZED_FUNCTIONS.values():
+        function.cache_clear()
+
+
 ## Pow conversion functions
 
 POW_DICT = {
@@ -39,6 +145,7 @@ POW_DICT = {
 }
 
 
+@memoize
 def parse_pow(partition) -> str:
     '''Superscript pow values in given partitions.'''
 
@@ -135,25 +242,154 @@ def save_dict_into_csv_file(dic: dict, filename: str) -> None:
         csv_writer.writerows(rows)
 
 
+def is_gzip_content(content: bytes) -> bool:
+    '''Return True if the given file content is gzip-compressed.'''
+
+    return content[:2] == GZIP_MAGIC_NUMBER
+
+
+def parse_json_content(content: bytes, filename: str):
+    '''Parse JSON data from a given file content.'''
+
+    if is_gzip_content(content):
+        content = gzip.decompress(content)
+    try:
+        return json.loads(content.decode(ENCODING))
+    except:
+        raise ValueError('Invalid json file: {}'.format(filename))
+
+
 def load_json_file(filename: str) -> dict:
     '''Load JSON file.'''
 
-    with open(filename, 'r', encoding=ENCODING) as fp:
-        try:
-            return json.load(fp)
-        except:
-            raise ValueError('Invalid json file: {}'.format(filename))
+    with open(filename, 'rb') as fp:
+        return parse_json_content(fp.read(), filename)
 
 
-def dump_json_data(filename: str, data) -> None:
-    '''Dump data to json file.'''
+def dump_json_data(filename: str, data, compress=False) -> bytes:
+    '''Dump data to json file and return the written content.
+
+    If compress parameter is true, the content is gzip-compressed.'''
+
+    try:
+        content = json.dumps(data).encode(ENCODING)
+    except:
+        raise ValueError('Invalid json file or data')
+
+    if compress:
+        content = gzip.compress(content, mtime=0)
+
+    with open(filename, 'wb') as fp:
+        fp.write(content)
+    return content
+
+
+def get_content_hash(content: bytes) -> str:
+    '''Return the hash of a given file content.'''
+
+    return hashlib.sha1(content).hexdigest()
+
+
+def get_sidecar_filename(filename: str) -> str:
+    '''Return the filename of the derived attributes sidecar file of a given JSON file.'''
+
+    return file_rename(filename, SIDECAR_EXTENSION, SIDECAR_SUFFIX)
+
+
+def read_sidecar_rows(filename: str) -> list:
+    '''Return the entries (dictionaries with base, attribute and data keys) of the sidecar file of a given JSON file, in writing order.
+
+    Incomplete lines (interrupted appends) are ignored.'''
+
+    sidecar_filename = get_sidecar_filename(filename)
+    rows = []
+
+    if not os.path.isfile(sidecar_filename):
+        return rows
+
+    with open(sidecar_filename, 'r', encoding=ENCODING) as fp:
+        for row in fp:
+            try:
+                rows.append(json.loads(row))
+            except ValueError:
+                continue
+    return rows
+
+
+def get_current_sidecar_entries(rows: list, base_hash: str) -> dict:
+    '''Return the latest data of each attribute of the given sidecar entries keyed to the given base data hash.'''
+
+    entries = {}
+    for entry in rows:
+        if entry.get('base') == base_hash:
+            entries[entry['attribute']] = entry['data']
+    return entries
+
+
+def load_sidecar_entries(filename: str, base_hash: str) -> dict:
+    '''Return the derived attributes stored in the sidecar file of a given JSON file.
+
+    Only the entries keyed to the given base data hash are considered. Later entries override the earlier ones and incomplete lines (interrupted appends) are ignored.'''
+
+    return get_current_sidecar_entries(read_sidecar_rows(filename), base_hash)
+
+
+def write_sidecar_entries(filename: str, base_hash: str, attributes: dict, mode='a') -> None:
+    '''Write the given derived attributes into the sidecar file of a given JSON file, each one in a single line keyed to the given base data hash.
+
+    The lines are appended or, if `mode` is `w`, they replace the file atomically (through a temporary file).'''
+
+    rows = []
+    for attribute, data in attributes.items():
+        entry = {'base': base_hash, 'attribute': attribute, 'data': data}
+        rows.append(json.dumps(entry) + '\n')
+
+    sidecar_filename = get_sidecar_filename(filename)
+    if mode == 'a':
+        with open(sidecar_filename, 'a', encoding=ENCODING) as fp:
+            fp.write(''.join(rows))
+        return
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(sidecar_filename)), suffix='.' + SIDECAR_EXTENSION)
+    try:
+        with os.fdopen(fd, 'w', encoding=ENCODING) as fp:
+            fp.write(''.join(rows))
+        os.replace(tmp_path, sidecar_filename)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
-    with open(filename, 'w', encoding=ENCODING) as fp:
-        try:
-            json.dump(data, fp)
-        except:
-            raise ValueError('Invalid json file or data')
 
+def compact_sidecar_file(filename: str, base_hash: str, force=False) -> bool:
+    '''Rewrite the sidecar file of a given JSON file with only the latest entry of each attribute keyed to the given base data hash. Return true if the file is rewritten.
+
+    Unless `force` is true, the file is rewritten only if its superseded entries (older entries of the same attributes and entries of other base data) outnumber the current ones.'''
+
+    rows = read_sidecar_rows(filename)
+    entries = get_current_sidecar_entries(rows, base_hash)
+    if not force and len(rows) - len(entries) <= len(entries):
+        return False
+
+    write_sidecar_entries(filename, base_hash, entries, 'w')
+    return True
+
+
+def append_sidecar_entries(filename: str, base_hash: str, attributes: dict) -> None:
+    '''Append the given derived attributes to the sidecar file of a given JSON file.
+
+    Each attribute is written in a single line keyed to the given base data hash. The file is compacted when its superseded entries outnumber the current ones (see `compact_sidecar_file`), so it doesn't grow with repeated runs.'''
+
+    write_sidecar_entries(filename, base_hash, attributes)
+    compact_sidecar_file(filename, base_hash)
+
+
+def remove_sidecar_file(filename: str) -> None:
+    '''Remove the sidecar file of a given JSON file if it exists.'''
+
+    sidecar_filename = get_sidecar_filename(filename)
+    if os.path.isfile(sidecar_filename):
+        os.remove(sidecar_filename)
 
 
 ## Fraction converters (for offset and duration data)
@@ -193,28 +429,14 @@ def make_fraction(value) -> Fraction:
 ## Finders
 
 def find_nearest_smaller(value, seq: list):
-    '''Find the smaller nearest value of a given value from a given sequence.'''
+    '''Find the smaller nearest value of a given value from a given sorted sequence.
 
-    if value < seq[0]:
-        return -1
-
-    if value > seq[-1]:
-        return seq[-1]
-
-    size = len(seq)
-
-    if size == 1 and value >= seq[0]:
-        return seq[0]
-
-    middle_pointer = math.floor(size/2)
+    Return -1 if the given value is smaller than all the sequence values.'''
 
-    left = seq[:middle_pointer]
-    right = seq[middle_pointer:]
-
-    if value < right[0]:
-        return find_nearest_smaller(value, left)
-    else:
-        return find_nearest_smaller(value, right)
+    ind = bisect.bisect_right(seq, value)
+    if ind == 0:
+        return -1
+    return seq[ind - 1]
 
 
 def aux_find_next_measure_number(global_offset: Fraction, offset_map: dict, index=0) -> tuple:
@@ -236,11 +458,11 @@ def aux_find_next_measure_number(global_offset: Fraction, offset_map: dict, inde
 
 ## Math auxiliary funcions
 
-def get_number_combinations_pairs(n: int) -> float:
+def get_number_combinations_pairs(n: int) -> int:
     '''Return the number of pair combinations of a list of `n` elements.
 
     Binomial coefficient.'''
-    return n * (n - 1) / 2
+    return n * (n - 1) // 2
 
 
 def get_fractions_denominator_lcm(fractions_lst: list):
@@ -271,9 +493,11 @@ def aux_sum_if_none(a, b):
 
 ## Graph functions
 
-def make_general_graph(labels: list, name: str, relations=None) -> graphviz.Digraph:
+def make_general_graph(labels: list, name: str, relations=None) -> 'graphviz.Digraph':
     '''Return a `graphviz.Digraph` with the adjacent values of a given list of labels.'''
 
+    import graphviz
+
     labels_pairs = set()
     for i in range(len(labels) - 1):
         previous_label = labels[i]
@@ -294,12 +518,14 @@ def make_general_graph(labels: list, name: str, relations=None) -> graphviz.Digr
 
 ## General converters
 
-def convert_to_equal_durations(dataframe: pandas.DataFrame, offset_map: dict) -> dict:
+def convert_to_equal_durations(dataframe: 'pandas.DataFrame', offset_map: dict) -> dict:
     '''Convert texture data from a given DataFrame to dictionary format with events of the same duration.
 
     For instance, a dataframe with two events with durations 1/2 and 1/3 are converted in 3 events and 2 events of duration 1/6.
     '''
 
+    import pandas
+
     columns = dataframe.columns
     global_offsets = dataframe['Global offset'].apply(Fraction).values
     minimal_duration = make_fraction(get_diff_lcm(global_offsets))
@@ -341,23 +567,29 @@ def convert_to_equal_durations(dataframe: pandas.DataFrame, offset_map: dict) ->
     return pandas.DataFrame(new_data, columns=columns).to_dict()
 
 
+def convert_texture_column_from_json(column: str, values: list, partitions_dictionary=None) -> list:
+    '''Convert a texture data column from JSON.
+
+    The fractions are converted from string to Fraction objects, the null indexes to `nan` and the partition codes (compact schema) to a `CategoricalSequence` object.
+    '''
+
+    if column in FRACTION_COLUMNS:
+        return list(map(parse_fraction, values))
+    if column in INDEX_COLUMNS:
+        return [v if v != None else numpy.nan for v in values]
+    if column == 'Partition' and partitions_dictionary is not None:
+        return CategoricalSequence(categories=partitions_dictionary, codes=values)
+    return values
+
+
 def convert_texture_data_from_json(data: dict) -> dict:
     '''Convert texture data from JSON.
 
     The fractions are converted from string to Fraction objects.
     '''
 
-    fraction_keys = [
-        'Offset',
-        'Global offset',
-        'Duration',
-    ]
-
-    for k in ['Agglomeration', 'Dispersion']:
-        data[k] = [v if v != None else numpy.nan for v in data[k]]
-
-    for k in fraction_keys:
-        data[k] = list(map(parse_fraction, data[k]))
+    for k in FRACTION_COLUMNS + INDEX_COLUMNS:
+        data[k] = convert_texture_column_from_json(k, data[k])
     return data
 
 
@@ -367,23 +599,36 @@ def convert_texture_data_to_json(data: dict) -> dict:
     The fractions are converted from Fraction objects to strings.
     '''
 
-    new_data = {k: v for k, v in data.items()}
-    fraction_keys = [
-        'Offset',
-        'Global offset',
-        'Duration',
-    ]
+    new_data = {k: v.tolist() if isinstance(v, (CategoricalSequence, SequenceView)) else v for k, v in data.items()}
 
-    for k in ['Agglomeration', 'Dispersion']:
+    for k in INDEX_COLUMNS:
+        if k not in new_data:
+            continue
         if numpy.nan in new_data[k]:
             new_data[k] = [v if not numpy.isnan(v) else None for v in new_data[k]]
         new_data[k] = [v if v != None else None for v in new_data[k]]
 
-    for k in fraction_keys:
+    for k in FRACTION_COLUMNS:
         new_data[k] = list(map(fraction_to_string, new_data[k]))
     return new_data
 
 
+def encode_categories(values: list) -> tuple:
+    '''Return the distinct values of a given list (in order of appearance) and the list of their codes.'''
+
+    categories = {}
+    codes = [categories.setdefault(v, len(categories)) for v in values]
+    return list(categories.keys()), codes
+
+
+def get_highest_index(values: list):
+    '''Return the highest agglomeration or dispersion index of a given list, ignoring the rests' null values.'''
+
+    values = [v for v in values if v != None and not numpy.isnan(v)]
+    if values:
+        return int(max(values))
+
+
 ## Classes
 
 class CustomException(Exception):
@@ -435,6 +680,548 @@ class EventLocation(object):
                 return '{}+~{}'.format(self.measure_number, _offset)
         return self.str_index
 
+class OffsetIndex(object):
+    '''Sorted index of measures and events locations.
+
+    It converts measure numbers, global offsets and data rows into each other by binary search.'''
+
+    def __init__(self, offset_map: dict, global_offsets: list) -> None:
+        pairs = sorted((parse_fraction(v), int(k)) for k, v in offset_map.items())
+        self.measure_offsets = [offset for offset, _ in pairs]
+        self.measure_numbers = [number for _, number in pairs]
+        self.measures_positions = {number: i for i, number in enumerate(self.measure_numbers)}
+        self.global_offsets = global_offsets
+
+    def __repr__(self) -> str:
+        return '<OI {} measures, {} events>'.format(len(self.measure_numbers), len(self.global_offsets))
+
+    def get_measure_offset(self, measure_number) -> Fraction:
+        '''Return the global offset of the given measure number's beginning.'''
+
+        return self.measure_offsets[self.get_measure_index(measure_number)]
+
+    def get_measure_index(self, measure_number) -> int:
+        '''Return the position of the given measure number in the sorted measures list.'''
+
+        try:
+            return self.measures_positions[int(measure_number)]
+        except (KeyError, ValueError):
+            raise CustomException('The measure number {} is not in the offset map.'.format(measure_number))
+
+    def has_measure(self, measure_number) -> bool:
+        '''Return True if the given measure number is in the offset map.'''
+
+        return int(measure_number) in self.measures_positions
+
+    def get_measure_position(self, global_offset) -> int:
+        '''Return the position of the measure that contains the given global offset.
+
+        Global offsets before the first measure belong to the first one.'''
+
+        return max(bisect.bisect_right(self.measure_offsets, global_offset) - 1, 0)
+
+    def get_measure_number(self, global_offset) -> int:
+        '''Return the number of the measure that contains the given global offset.'''
+
+        return self.measure_numbers[self.get_measure_position(global_offset)]
+
+    def get_location(self, global_offset) -> tuple:
+        '''Return the measure number and the local offset of the given global offset.'''
+
+        ind = self.get_measure_position(global_offset)
+        return self.measure_numbers[ind], global_offset - self.measure_offsets[ind]
+
+    def get_event_location(self, global_offset) -> EventLocation:
+        '''Return an `EventLocation` object of the given global offset.'''
+
+        measure_number, offset = self.get_location(global_offset)
+        return EventLocation(measure_number=measure_number, offset=offset, global_offset=global_offset)
+
+    def get_global_offset(self, measure_number, offset=0) -> Fraction:
+        '''Return the global offset of the given measure number and local offset.'''
+
+        return self.get_measure_offset(measure_number) + parse_fraction(offset)
+
+    def get_row(self, global_offset) -> int:
+        '''Return the data row of the event that sounds at the given global offset.
+
+        Return -1 if the given global offset is before the first event.'''
+
+        return bisect.bisect_right(self.global_offsets, global_offset) - 1
+
+    def get_rows_slice(self, start_offset=None, end_offset=None) -> slice:
+        '''Return the slice of data rows whose global offsets are in the given interval (closed start and open end).
+
+        `None` values mean the beginning or the end of the data.'''
+
+        start = 0
+        end = len(self.global_offsets)
+        if start_offset is not None:
+            start = bisect.bisect_left(self.global_offsets, start_offset)
+        if end_offset is not None:
+            end = max(bisect.bisect_left(self.global_offsets, end_offset), start)
+        return slice(start, end)
+
+    def get_measures_rows_slice(self, start_measure=None, end_measure=None) -> slice:
+        '''Return the slice of data rows from the beginning of the given start measure to the end of the given end measure.
+
+        `None` values mean the beginning or the end of the data.'''
+
+        start_offset = None
+        end_offset = None
+        if start_measure is not None:
+            start_offset = self.get_measure_offset(start_measure)
+        if end_measure is not None:
+            ind = self.get_measure_index(end_measure)
+            if ind + 1 < len(self.measure_offsets):
+                end_offset = self.measure_offsets[ind + 1]
+        return self.get_rows_slice(start_offset, end_offset)
+
+
+class SequenceView(object):
+    '''Read-only view of a contiguous slice of a sequence. The data is not copied.
+
+    The view is materialised as a list when it is copied or pickled.'''
+
+    def __init__(self, values, rows=slice(None)) -> None:
+        start, stop, step = rows.indices(len(values))
+        if step != 1:
+            raise CustomException('Sequence views demand contiguous slices.')
+        stop = max(start, stop)
+        if isinstance(values, SequenceView):
+            start += values.start
+            stop += values.start
+            values = values.values
+        self.values = values
+        self.start = start
+        self.stop = stop
+
+    def __repr__(self) -> str:
+        return '<SV {}:{}>'.format(self.start, self.stop)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __iter__(self):
+        return itertools.islice(self.values, self.start, self.stop)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return SequenceView(self, key)
+        size = len(self)
+        if key < 0:
+            key += size
+        if key < 0 or key >= size:
+            raise IndexError('SequenceView index out of range')
+        return self.values[self.start + key]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (SequenceView, list, tuple)):
+            return self.tolist() == list(other)
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (list, (self.tolist(),))
+
+    def tolist(self) -> list:
+        '''Return the viewed values as a new list.'''
+
+        return self.values[self.start:self.stop]
+
+
+def get_rows_view(values, rows: slice):
+    '''Return the given rows of a sequence. Lists are sliced as `SequenceView` objects and the other sequences (such as `CategoricalSequence`) by their own slicing, which shares the data.'''
+
+    if isinstance(values, (list, SequenceView)):
+        return SequenceView(values, rows)
+    return values[rows]
+
+
+class CategoricalSequence(object):
+    '''Sequence of repeated values (such as partitions, textural classes and labels) stored as integer codes of a categories list.
+
+    Slices are views of the original codes. The sequence is converted to a `pandas.Categorical` with `to_categorical` method.'''
+
+    def __init__(self, values=None, categories=None, codes=None) -> None:
+        if codes is None:
+            categories, codes = encode_categories([] if values is None else values)
+        self.categories = list(categories)
+        self.codes = numpy.asarray(codes, dtype=CATEGORICAL_CODES_TYPE)
+        self._categories_map = None
+
+    def __repr__(self) -> str:
+        return '<CS {} values, {} categories>'.format(len(self.codes), len(self.categories))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self):
+        categories = self.categories
+        return (categories[code] for code in self.codes.tolist())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CategoricalSequence(categories=self.categories, codes=self.codes[key])
+        return self.categories[self.codes[key]]
+
+    def __contains__(self, value) -> bool:
+        code = self.get_code(value)
+        return code > -1 and bool((self.codes == code).any())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CategoricalSequence):
+            return self.tolist() == other.tolist()
+        if isinstance(other, (list, tuple)):
+            return self.tolist() == list(other)
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __array__(self, dtype=None, copy=None) -> numpy.ndarray:
+        return numpy.array(self.categories, dtype=object)[self.codes]
+
+    def tolist(self) -> list:
+        '''Return the values as a list.'''
+
+        return list(self)
+
+    def get_code(self, value) -> int:
+        '''Return the code of a given value or -1 if it is not a category.'''
+
+        if self._categories_map is None:
+            self._categories_map = {v: i for i, v in enumerate(self.categories)}
+        return self._categories_map.get(value, -1)
+
+    def get_counts(self, groups=None) -> numpy.ndarray:
+        '''Return the number of occurrences of each category.
+
+        If a `CategoricalSequence` of groups (such as labels) of the same size is given, return a matrix with the counts of each group (rows) and category (columns).'''
+
+        size = len(self.categories)
+        if groups is None:
+            return numpy.bincount(self.codes, minlength=size)
+
+        groups = as_categorical(groups)
+        groups_size = len(groups.categories)
+        counts = numpy.bincount(groups.codes.astype(numpy.int64) * size + self.codes, minlength=groups_size * size)
+        return counts.reshape(groups_size, size)
+
+    def get_distinct_codes(self) -> numpy.ndarray:
+        '''Return the codes present in the sequence in order of first appearance.'''
+
+        codes, first_positions = numpy.unique(self.codes, return_index=True)
+        return codes[numpy.argsort(first_positions)]
+
+    def get_distinct_values(self) -> list:
+        '''Return the values present in the sequence in order of first appearance.'''
+
+        return [self.categories[code] for code in self.get_distinct_codes().tolist()]
+
+    def compact(self):
+        '''Return a new `CategoricalSequence` with only the present categories, in order of first appearance.'''
+
+        distinct_codes = self.get_distinct_codes()
+        mapping = numpy.zeros(len(self.categories), dtype=CATEGORICAL_CODES_TYPE)
+        mapping[distinct_codes] = numpy.arange(len(distinct_codes))
+        categories = [self.categories[code] for code in distinct_codes.tolist()]
+        return CategoricalSequence(categories=categories, codes=mapping[self.codes])
+
+    def to_json(self) -> dict:
+        '''Return the sequence as a dictionary with categories and codes.'''
+
+        compacted = self.compact()
+        return {'categories': compacted.categories, 'codes': compacted.codes.tolist()}
+
+    def to_categorical(self) -> 'pandas.Categorical':
+        '''Return the sequence as a `pandas.Categorical` object.'''
+
+        import pandas
+
+        return pandas.Categorical.from_codes(self.codes, categories=self.categories)
+
+
+def as_categorical(values) -> CategoricalSequence:
+    '''Return the given values as a `CategoricalSequence` object.'''
+
+    if isinstance(values, CategoricalSequence):
+        return values
+    if isinstance(values, LabelSpans):
+        return values.get_sequence()
+    if isinstance(values, dict):
+        return CategoricalSequence(categories=values['categories'], codes=values['codes'])
+    return CategoricalSequence(values)
+
+
+class LabelSpans(object):
+    '''Sorted sequence of labeled spans of the texture data. Each span is a tuple of label, start and end global offsets (closed start and open end).
+
+    The object behaves as the sequence of the events' labels. This sequence is materialised at its first access. The spans covering no events are discarded.'''
+
+    def __init__(self, spans=None, global_offsets=None) -> None:
+        self.global_offsets = global_offsets if global_offsets is not None else []
+        self.labels = []
+        self.starts = []
+        self.ends = []
+        self.rows_starts = []
+        self.rows_ends = []
+        self._sequence = None
+
+        for label, start, end in sorted(spans or [], key=lambda span: span[1]):
+            rows_start = bisect.bisect_left(self.global_offsets, start)
+            rows_end = bisect.bisect_left(self.global_offsets, end)
+            if rows_end > rows_start:
+                self.labels.append(label)
+                self.starts.append(start)
+                self.ends.append(end)
+                self.rows_starts.append(rows_start)
+                self.rows_ends.append(rows_end)
+
+    def __repr__(self) -> str:
+        return '<LS {} spans>'.format(len(self.labels))
+
+    def __len__(self) -> int:
+        if not self.labels:
+            return 0
+        return len(self.global_offsets)
+
+    def __iter__(self):
+        return iter(self.get_sequence())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.trim(key)
+        return self.get_sequence()[key]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (LabelSpans, CategoricalSequence, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def get_spans(self) -> list:
+        '''Return the list of spans as tuples of label, start and end global offsets.'''
+
+        return list(zip(self.labels, self.starts, self.ends))
+
+    def get_span_position(self, global_offset) -> int:
+        '''Return the position of the span containing the given global offset or -1 if there is no such span.'''
+
+        position = bisect.bisect_right(self.starts, global_offset) - 1
+        if position > -1 and global_offset < self.ends[position]:
+            return position
+        return -1
+
+    def get_label(self, global_offset):
+        '''Return the label at the given global offset or `None` if it is not labeled.'''
+
+        position = self.get_span_position(global_offset)
+        if position > -1:
+            return self.labels[position]
+
+    def get_span_rows_slice(self, position: int) -> slice:
+        '''Return the slice of data rows of the span at the given position.'''
+
+        return slice(self.rows_starts[position], self.rows_ends[position])
+
+    def get_label_rows_slices(self, label) -> list:
+        '''Return the slices of data rows of all the spans with the given label.'''
+
+        return [self.get_span_rows_slice(i) for i, _label in enumerate(self.labels) if _label == label]
+
+    def get_distinct_labels(self) -> list:
+        '''Return the distinct labels in order of appearance.'''
+
+        return list(dict.fromkeys(self.labels))
+
+    def get_sequence(self) -> CategoricalSequence:
+        '''Return the events' labels as a `CategoricalSequence` object.
+
+        The events out of the spans are labeled as `None`.'''
+
+        if self._sequence is None:
+            categories = self.get_distinct_labels()
+            codes = numpy.full(len(self), -1, dtype=CATEGORICAL_CODES_TYPE)
+            for label, rows_start, rows_end in zip(self.labels, self.rows_starts, self.rows_ends):
+                codes[rows_start:rows_end] = categories.index(label)
+            missing = codes == -1
+            if missing.any():
+                codes[missing] = len(categories)
+                categories.append(None)
+            self._sequence = CategoricalSequence(categories=categories, codes=codes)
+        return self._sequence
+
+    def trim(self, rows: slice):
+        '''Return a new `LabelSpans` object with the spans of the given data rows slice.'''
+
+        positions = range(len(self.global_offsets))[rows]
+        global_offsets = get_rows_view(self.global_offsets, rows)
+        if not self.labels or not global_offsets:
+            return LabelSpans(global_offsets=global_offsets)
+
+        start_offset = global_offsets[0]
+        end_offset = None
+        if positions[-1] + 1 < len(self.global_offsets):
+            end_offset = self.global_offsets[positions[-1] + 1]
+
+        spans = []
+        for label, start, end in self.get_spans():
+            if end_offset is not None:
+                end = min(end, end_offset)
+            spans.append((label, max(start, start_offset), end))
+        return LabelSpans(spans, global_offsets)
+
+    def to_json(self) -> list:
+        '''Return the spans formated to json.'''
+
+        return [[label, fraction_to_string(start), fraction_to_string(end)] for label, start, end in self.get_spans()]
+
+
+def make_label_spans(labels, global_offsets: list, durations: list) -> LabelSpans:
+    '''Return a `LabelSpans` object from the given events' labels, global offsets and durations.
+
+    Each sequence of adjacent equal labels is converted into a span.'''
+
+    labels = as_categorical(labels)
+    size = len(labels)
+    if size == 0:
+        return LabelSpans(global_offsets=global_offsets)
+
+    rows_starts = [0] + (numpy.flatnonzero(labels.codes[1:] != labels.codes[:-1]) + 1).tolist()
+    rows_ends = rows_starts[1:] + [size]
+    last_end = global_offsets[-1] + durations[-1]
+
+    spans = []
+    for rows_start, rows_end in zip(rows_starts, rows_ends):
+        label = labels[rows_start]
+        if label is not None:
+            end = global_offsets[rows_end] if rows_end < size else last_end
+            spans.append((label, global_offsets[rows_start], end))
+    return LabelSpans(spans, global_offsets)
+
+
+class TextureData(dict):
+    '''Texture data columns dictionary.
+
+    The columns loaded from JSON data are converted at their first access. The columns missing in the compact schema (index, parts, density-number, agglomeration and dispersion) are derived from the primary ones at their first access, too.'''
+
+    def __init__(self, json_data=None, values_map=None, partitions_dictionary=None) -> None:
+        super().__init__()
+        self.json_data = dict(json_data or {})
+        self.values_map = values_map or {}
+        self.partitions_dictionary = partitions_dictionary
+        self._partitions_info = None
+
+    def __missing__(self, column: str):
+        if column in self.json_data:
+            values = convert_texture_column_from_json(column, self.json_data.pop(column), self.partitions_dictionary)
+        elif column in self.get_derivable_columns():
+            values = self.derive_column(column)
+        else:
+            raise KeyError(column)
+        self[column] = values
+        return values
+
+    def __contains__(self, column) -> bool:
+        return column in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get_derivable_columns(self) -> list:
+        '''Return the columns that can be derived from the available ones.'''
+
+        def is_available(column):
+            return dict.__contains__(self, column) or column in self.json_data
+
+        columns = []
+        if is_available('Measure number') and is_available('Offset'):
+            columns.append('Index')
+        if is_available('Partition'):
+            columns.extend(['Density-number', 'Agglomeration', 'Dispersion', 'Parts'])
+        return columns
+
+    def keys(self) -> list:
+        available = set(dict.keys(self)).union(self.json_data.keys(), self.get_derivable_columns())
+        columns = [k for k in TEXTURE_DATA_COLUMNS if k in available]
+        columns.extend(k for k in dict.keys(self) if k not in TEXTURE_DATA_COLUMNS)
+        return columns
+
+    def values(self) -> list:
+        return [self[k] for k in self.keys()]
+
+    def items(self) -> list:
+        return [(k, self[k]) for k in self.keys()]
+
+    def get(self, column, default=None):
+        if column in self:
+            return self[column]
+        return default
+
+    def get_partitions_info(self) -> dict:
+        '''Return a dictionary with the parts, density-number, agglomeration and dispersion of each distinct partition.
+
+        The indexes of all the distinct partitions are calculated in bulk (see `partition.get_ragged_indexes`), unless they are in `values_map`.'''
+
+        # Local import to avoid circular import (partition module imports this one)
+        from .partition import get_ragged_indexes, make_ragged_parts
+
+        if self._partitions_info is None:
+            self._partitions_info = {}
+            categories = as_categorical(self['Partition']).categories
+            parts, offsets = make_ragged_parts(categories)
+            density_numbers, _, agglomerations, dispersions = get_ragged_indexes(parts, offsets)
+
+            for i, partition_str in enumerate(categories):
+                agglomeration = agglomerations[i]
+                dispersion = dispersions[i]
+                if partition_str in self.values_map:
+                    agglomeration, dispersion = [numpy.nan if v is None else v for v in self.values_map[partition_str]]
+                self._partitions_info[partition_str] = {
+                    'Parts': parts[offsets[i]:offsets[i + 1]].tolist(),
+                    'Density-number': int(density_numbers[i]),
+                    'Agglomeration': numpy.nan if numpy.isnan(agglomeration) else int(agglomeration),
+                    'Dispersion': numpy.nan if numpy.isnan(dispersion) else int(dispersion),
+                }
+        return self._partitions_info
+
+    def derive_column(self, column: str) -> list:
+        '''Return a column derived from the primary ones.'''
+
+        if column == 'Index':
+            return ['{}+{}'.format(m, fraction_to_string(o)) for m, o in zip(self['Measure number'], self['Offset'])]
+
+        partitions = as_categorical(self['Partition'])
+        partitions_info = self.get_partitions_info()
+        values = [partitions_info[p][column] for p in partitions.categories]
+        if column == 'Parts':
+            return [list(values[code]) for code in partitions.codes.tolist()]
+        return [values[code] for code in partitions.codes.tolist()]
+
+
 class RPData(object):
     '''Main Rhythmic Partitioning Data class.'''
 
@@ -461,55 +1248,159 @@ class RPData(object):
         for attr in self.attributes_list:
             self.__setattr__(attr, [])
 
-        self.labels = [] # for comparison
+        self.labels = LabelSpans() # for comparison
         self.size = 0
+        self.schema_version = 1
+        self.compress = False
+        self.summary = None
+        self.base_hash = None
+        self._offset_index = None
 
         if path:
             self.path = path
             self.load_from_file()
 
+    def get_derived_attributes(self) -> list:
+        '''Return the names of the derived attributes. They can be stored in the sidecar file.'''
+
+        return ['labels'] + self.attributes_list
+
+    def attribute_to_json(self, attribute: str):
+        '''Return the given derived attribute data formated to json.
+
+        In the compact schema, the attribute is stored as categories and codes.'''
+
+        values = self.__getattribute__(attribute)
+        if self.schema_version == 2:
+            if attribute == 'labels':
+                return {'spans': values.to_json()}
+            return as_categorical(values).to_json()
+        return list(values)
+
+    def set_attribute_from_json(self, attribute: str, data) -> None:
+        '''Set the given derived attribute from json data (list or categories and codes) as a `CategoricalSequence` object.
+
+        The labels are set as a `LabelSpans` object from a list of events' labels or of spans.'''
+
+        if attribute == 'labels':
+            self.labels = self.make_labels_from_json(data)
+        else:
+            self.__setattr__(attribute, as_categorical(data))
+
+    def make_labels_from_json(self, data) -> LabelSpans:
+        '''Return a `LabelSpans` object from json data (events' labels list or spans).'''
+
+        if not data:
+            return LabelSpans()
+        if isinstance(data, dict):
+            if not data['spans']:
+                return LabelSpans()
+            spans = [(label, parse_fraction(start), parse_fraction(end)) for label, start, end in data['spans']]
+            return LabelSpans(spans, self.data['Global offset'])
+        return make_label_spans(data, self.data['Global offset'], self.data['Duration'])
+
     def to_json(self) -> dict:
-        '''Return the data as a dictionary with fractions formated to json.'''
+        '''Return the data as a dictionary with fractions formated to json.
+
+        The data layout follows the `schema_version` attribute.'''
+
+        if self.schema_version == 2:
+            return self.to_compact_json()
 
         data = {
             'texture_data': convert_texture_data_to_json(self.data),
             'offset_map': {k: fraction_to_string(v) for k, v in self.offset_map.items()},
             'values_map': self.values_map,
-            'labels': self.labels,
         }
-        # Attributes list
-        data.update({k: self.__getattribute__(k) for k in self.attributes_list})
+        # Labels and attributes list
+        data.update({k: self.attribute_to_json(k) for k in self.get_derived_attributes()})
+
+        return data
+
+    def to_compact_json(self) -> dict:
+        '''Return the data as a dictionary in the compact schema (version 2).
+
+        Only the primary texture data columns are stored and the partitions are stored as codes of a partitions dictionary. The other columns are derived on loading.'''
+
+        texture_data = convert_texture_data_to_json({k: self.data[k] for k in PRIMARY_COLUMNS if k != 'Partition'})
+        partitions = as_categorical(self.data['Partition']).to_json()
+        partitions_dictionary = partitions['categories']
+        texture_data['Partition'] = partitions['codes']
+
+        data = {
+            'version': 2,
+            'texture_data': texture_data,
+            'partitions_dictionary': partitions_dictionary,
+            'offset_map': {k: fraction_to_string(v) for k, v in self.offset_map.items()},
+            'values_map': self.values_map,
+            'summary': self.get_summary(),
+        }
+        # Labels and attributes list. Partitions are in texture data.
+        data.update({k: self.attribute_to_json(k) for k in self.get_derived_attributes() if k != 'partitions'})
 
         return data
 
     def load_from_file(self) -> None:
-        '''Load data from the file set into `path` attribute and fill the other class attributes with this loaded data.'''
+        '''Load data from the file set into `path` attribute and fill the other class attributes with this loaded data.
+
+        The texture data columns are converted or derived at their first access. The derived attributes stored in the sidecar file override the ones in the JSON file.'''
 
         print('Loading data from {}...'.format(self.path))
-        data = load_json_file(self.path)
-        self.data = convert_texture_data_from_json(data['texture_data'])
+        with open(self.path, 'rb') as fp:
+            content = fp.read()
+        self.base_hash = get_content_hash(content)
+        self.compress = is_gzip_content(content)
+        data = parse_json_content(content, self.path)
+        del content
+
+        self.schema_version = data.get('version', 1)
+        self.summary = data.get('summary')
         self.offset_map = {k: parse_fraction(v) for k, v in data['offset_map'].items()}
         self.values_map = data['values_map']
+        self.data = TextureData(data['texture_data'], self.values_map, data.get('partitions_dictionary'))
 
-        for attr in self.attributes_list:
+        data.update(load_sidecar_entries(self.path, self.base_hash))
+
+        for attr in self.get_derived_attributes():
             if attr in data.keys():
                 _data = data[attr]
             else:
                 _data = []
-            self.__setattr__(attr, _data)
+            self.set_attribute_from_json(attr, _data)
+
+        if 'partitions' not in data.keys():
+            self.partitions = as_categorical(self.data['Partition'])
 
-        self.labels = data['labels']
         self.size = len(self.partitions)
+        self._offset_index = None
 
     def save_to_file(self, filename=None) -> None:
-        '''Save the class data into a JSON file.'''
+        '''Save the class data into a JSON file.
+
+        The full save includes all the derived attributes, so the destination's sidecar file is removed.'''
 
         dest = self.path
         if filename:
             dest = filename
 
         print('Saving into {}...'.format(dest))
-        dump_json_data(dest, self.to_json())
+        content = dump_json_data(dest, self.to_json(), self.compress)
+        remove_sidecar_file(dest)
+        if dest == self.path:
+            self.base_hash = get_content_hash(content)
+
+    def save_attributes(self, attributes: list) -> None:
+        '''Append the given derived attributes to the sidecar file of the JSON file set into `path` attribute.
+
+        The JSON file is not rewritten. If it was not saved or loaded yet, the full data is saved.'''
+
+        if not self.base_hash or not os.path.isfile(self.path):
+            self.save_to_file()
+            return
+
+        print('Saving {} into {}...'.format(', '.join(attributes), get_sidecar_filename(self.path)))
+        data = {attr: self.attribute_to_json(attr) for attr in attributes}
+        append_sidecar_entries(self.path, self.base_hash, data)
 
     def save_to_csv(self, equally_sized=False) -> None:
         '''Save the data into a CSV file.
@@ -517,11 +1408,12 @@ class RPData(object):
         If equally_sized parameter is true, the events are proportionally divided into smaller events of a unique duration.'''
 
         csv_fname = file_rename(self.path, 'csv')
-        data_dic = self.data
+        data_dic = {k: v for k, v in self.data.items()}
         data_dic['Partition'] = list(map(parse_pow, data_dic['Partition']))
 
         if equally_sized:
-            df = pandas.DataFrame(self.data)
+            import pandas
+            df = pandas.DataFrame(data_dic)
             data_dic = convert_to_equal_durations(df, self.offset_map)
 
         save_dict_into_csv_file(data_dic, csv_fname)
@@ -535,27 +1427,47 @@ class RPData(object):
             return self.values_map[partition_str]
         raise CustomException('The partition {} is not in the map.'.format(partition_str))
 
+    def get_summary(self) -> dict:
+        '''Return a summary of the data such as number of events and distinct partitions.
+
+        The summary is stored in compact schema files, so it is available without the events data processing.'''
+
+        if self.summary is None:
+            self.summary = {
+                'size': self.size,
+                'distinct_partitions': len(as_categorical(self.partitions).get_distinct_codes()),
+                'distinct_density_numbers': len(set(self.data['Density-number'])),
+                'highest_agglomeration': get_highest_index(self.data['Agglomeration']),
+                'highest_dispersion': get_highest_index(self.data['Dispersion']),
+            }
+        return self.summary
+
     def get_number_of_parts_and_density_numbers(self) -> list:
         '''Return a list of tuples with the number of parts and density number of each all the partitions in data.'''
 
         return [(len(parts), sum(parts)) if parts != [] else (0, 0) for parts in self.data['Parts']]
 
+    def get_offset_index(self) -> OffsetIndex:
+        '''Return the cached `OffsetIndex` object of the measures and events locations.
+
+        The index is built at the first call from `offset_map` and `Global offset` data.'''
+
+        if self._offset_index is None:
+            self._offset_index = OffsetIndex(self.offset_map, self.data['Global offset'])
+        return self._offset_index
+
     def get_events_location(self, attribute: str) -> dict:
         '''Return a dictionary with the event locations where the measure number is the dictionary key, and the pair "offset, element", the dictionary value. The `element` is the value in the `attribute` list.
 
         If the `attribute` value is `partitions`, the `element` is the partition as string. For instance, `1.3`, `2^2` and so on.'''
 
-        inverted_offset_map = {parse_fraction(v): int(k) for k, v in self.offset_map.items()}
-        offsets = list(inverted_offset_map.keys())
+        offset_index = self.get_offset_index()
+        elements = self.__getattribute__(attribute)
 
         events_location = {}
 
-        for i in range(self.size):
-            global_offset = self.data['Global offset'][i]
-            element = self.__getattribute__(attribute)[i]
-            measure_offset = find_nearest_smaller(global_offset, offsets)
-            measure_number = inverted_offset_map[measure_offset]
-            offset = global_offset - measure_offset
+        for global_offset, element in zip(self.data['Global offset'], elements):
+            measure_number, offset = offset_index.get_location(global_offset)
             if measure_number not in events_location:
                 events_location[measure_number] = []
             events_location[measure_number].append((offset, element))
@@ -565,22 +1477,111 @@ class RPData(object):
     def trim(self, start_pointer: int, end_pointer: int):
         '''Return a new `RPData` object with trimmed attributes' data.
 
-        Only values_map is kept as the original `RPData` object.'''
+        The texture data columns and the attributes of the new object are views of the original ones, so no data is copied. The attributes relative to the previous event (such as operations) are copied, because the first event of the new object has no value. Only values_map is kept as the original `RPData` object.'''
 
+        rows = slice(start_pointer, end_pointer)
         new_rpdata = RPData()
-        new_rpdata.data = {k: v[start_pointer:end_pointer] for k, v in self.data.items()}
+        new_rpdata.data = {k: get_rows_view(v, rows) for k, v in self.data.items()}
 
         for attr in self.attributes_list:
-            trimmed = self.__getattribute__(attr)[start_pointer:end_pointer]
+            trimmed = get_rows_view(self.__getattribute__(attr), rows)
+            if attr in TRANSITION_ATTRIBUTES and len(trimmed):
+                trimmed = CategoricalSequence([''] + list(trimmed)[1:])
             new_rpdata.__setattr__(attr, trimmed)
 
-        new_rpdata.labels = self.labels[start_pointer:end_pointer]
+        new_rpdata.labels = self.labels.trim(rows)
+        new_rpdata.size = len(new_rpdata.data['Index'])
         new_rpdata.offset_map = self.offset_map
         new_rpdata.values_map = self.values_map
+        new_rpdata.schema_version = self.schema_version
+        new_rpdata.compress = self.compress
+
+        return new_rpdata
+
+    def concat(self, others: list, merge_parsemae=True, label_pieces=False):
+        '''Return a new `RPData` object with this object's data followed by the data of the given `RPData` objects.
+
+        The measure numbers and global offsets of each piece are shifted to start after the end of the previous one. If `merge_parsemae` is true, equal partitions at the pieces' boundaries are merged into a single event, as in the calculator. If `label_pieces` is true, each piece is labeled by its filename instead of its own labels. The attributes relative to the whole piece (such as tcontour) or to the previous event (such as operations) are not kept.'''
+
+        columns = {k: [] for k in PRIMARY_COLUMNS}
+        attributes = {attr: [] for attr in self.attributes_list if attr != 'partitions'}
+        offset_map = {}
+        values_map = {}
+        spans = []
+        end_offset = 0
+
+        for piece in [self] + list(others):
+            if not piece.size:
+                continue
+
+            # Only the measures with events (trimmed pieces keep the whole offset map)
+            first_measure = piece.data['Measure number'][0]
+            last_measure = piece.data['Measure number'][-1]
+            piece_offset_map = {int(k): v for k, v in piece.offset_map.items() if first_measure <= int(k) <= last_measure}
+            measure_shift = 0
+            offset_shift = 0
+            if offset_map:
+                measure_shift = max(offset_map.keys()) + 1 - first_measure
+                offset_shift = end_offset - piece_offset_map[first_measure]
+
+            offset_map.update({k + measure_shift: v + offset_shift for k, v in piece_offset_map.items()})
+            values_map.update(piece.values_map)
+
+            partitions = list(piece.data['Partition'])
+            first_row = 0
+            if merge_parsemae and columns['Partition'] and columns['Partition'][-1] == partitions[0]:
+                columns['Duration'][-1] += piece.data['Duration'][0]
+                first_row = 1
+
+            columns['Measure number'].extend(m + measure_shift for m in piece.data['Measure number'][first_row:])
+            columns['Offset'].extend(piece.data['Offset'][first_row:])
+            columns['Global offset'].extend(o + offset_shift for o in piece.data['Global offset'][first_row:])
+            columns['Duration'].extend(piece.data['Duration'][first_row:])
+            columns['Partition'].extend(partitions[first_row:])
+
+            for attr, values in attributes.items():
+                piece_values = piece.__getattribute__(attr)
+                if len(piece_values) == piece.size:
+                    values.append(list(piece_values)[first_row:])
+                else:
+                    values.append(None)
+
+            global_offsets = piece.data['Global offset']
+            piece_end = global_offsets[-1] + piece.data['Duration'][-1]
+            if label_pieces:
+                label = os.path.splitext(os.path.basename(piece.path or ''))[0]
+                spans.append((label, global_offsets[0] + offset_shift, piece_end + offset_shift))
+            else:
+                spans.extend((label, start + offset_shift, end + offset_shift) for label, start, end in piece.labels.get_spans())
+            end_offset = piece_end + offset_shift
+
+        new_rpdata = RPData()
+        new_rpdata.data = TextureData(values_map=values_map)
+        for k, v in columns.items():
+            new_rpdata.data[k] = v
+        new_rpdata.data['Partition'] = CategoricalSequence(columns['Partition'])
+        new_rpdata.partitions = new_rpdata.data['Partition']
+
+        for attr, pieces_values in attributes.items():
+            values = []
+            if all(v is None for v in pieces_values):
+                pass
+            elif attr in PIECE_RELATIVE_ATTRIBUTES or attr in TRANSITION_ATTRIBUTES or None in pieces_values:
+                print('The attribute {} is not kept in the concatenation.'.format(attr))
+            else:
+                values = list(itertools.chain.from_iterable(pieces_values))
+            new_rpdata.__setattr__(attr, CategoricalSequence(values))
+
+        new_rpdata.labels = LabelSpans(spans, new_rpdata.data['Global offset'])
+        new_rpdata.size = len(new_rpdata.partitions)
+        new_rpdata.offset_map = offset_map
+        new_rpdata.values_map = values_map
+        new_rpdata.schema_version = self.schema_version
+        new_rpdata.compress = self.compress
 
         return new_rpdata
 
-    def make_class_graph(self, attribute: str, relations=None) -> graphviz.Digraph:
+    def make_class_graph(self, attribute: str, relations=None) -> 'graphviz.Digraph':
         '''Return a `graphviz.Digraph` with the adjacent values of a list of values stored in the given `attribute`.'''
 
         labels = self.__getattribute__(attribute)
@@ -592,11 +1593,9 @@ class RPData(object):
         if attribute not in self.attributes_list:
             raise CustomException('The given attribute {} is not available'.format(attribute))
 
-        values_list = self.__getattribute__(attribute)
-        values_set = set(values_list)
-        counter = {k: 0 for k in values_set}
-        for value in values_list:
-            counter[value] += 1
+        values = as_categorical(self.__getattribute__(attribute))
+        counts = values.get_counts()
+        counter = {values.categories[code]: int(counts[code]) for code in numpy.flatnonzero(counts)}
         if proportional:
             n = sum(list(counter.values()))
             counter = {k: v / n for k, v in counter.items()}
@@ -609,22 +1608,47 @@ class RPData(object):
         if attribute not in self.attributes_list:
             raise CustomException('The given attribute {} is not available'.format(attribute))
 
-        values_list = self.__getattribute__(attribute)
+        values = as_categorical(self.__getattribute__(attribute))
+        previous_codes = values.codes[:-1].astype(numpy.int64)
+        next_codes = values.codes[1:]
         if exclude_repeats:
-            pairs = [(p, n) for p, n in zip(values_list[:-1], values_list[1:]) if p != n]
-        else:
-            pairs = [(p, n) for p, n in zip(values_list[:-1], values_list[1:])]
-        pairs_set = set(pairs)
+            different = previous_codes != next_codes
+            previous_codes = previous_codes[different]
+            next_codes = next_codes[different]
+
+        size = len(values.categories)
+        pairs, counts = numpy.unique(previous_codes * size + next_codes, return_counts=True)
 
-        counter = {k: 0 for k in pairs_set}
-        for pair in pairs:
-            counter[pair] += 1
+        counter = {}
+        for pair, count in zip(pairs.tolist(), counts.tolist()):
+            p, n = divmod(pair, size)
+            counter[(values.categories[p], values.categories[n])] = count
         if proportional:
             n = sum(list(counter.values()))
             counter = {k: v / n for k, v in counter.items()}
         counter = {k: v for k, v in sorted(counter.items(), key=lambda item: item[1], reverse=True)}
         return counter
 
+    def to_dataframe(self, columns=None) -> 'pandas.DataFrame':
+        '''Return the texture data as a `pandas.DataFrame` object.
+
+        The categorical columns (such as partitions in the compact schema) are converted to `pandas.Categorical` objects.'''
+
+        import pandas
+
+        if columns is None:
+            columns = list(self.data.keys())
+
+        dic = {}
+        for column in columns:
+            values = self.data[column]
+            if isinstance(values, CategoricalSequence):
+                values = values.to_categorical()
+            elif isinstance(values, SequenceView):
+                values = values.tolist()
+            dic[column] = values
+        return pandas.DataFrame(dic)
+
 
 class GeneralSubparser(object):
     '''Argparse subparser abstract class.'''
@@ -632,6 +1656,7 @@ class GeneralSubparser(object):
     def __init__(self, subparser: argparse.ArgumentParser) -> None:
         self.program_name = None
         self.program_help = None
+        self.module_name = None
         self.add_parent = True
         self.setup()
 
@@ -648,15 +1673,18 @@ class GeneralSubparser(object):
     def setup(self) -> None:
         '''Basic setup.
 
-        Set program_name and help message.'''
+        Set program_name, help message and module_name (the subcommand's module in rpscripts package).'''
 
         self.program_name = ''
         self.program_help = ''
+        self.module_name = ''
 
     def handle(self, args) -> None:
-        '''Parse arguments and run the module functions.'''
+        '''Import the subcommand's module and run its `handle` function with the parsed arguments.
 
-        pass
+        The module is imported only here, so the heavy libraries aren't imported to build the command line parser.'''
+
+        importlib.import_module('rpscripts.' + self.module_name).handle(args)
 
     def add_arguments(self) -> None:
         '''Add `argparse.ArgumentParser` arguments.'''
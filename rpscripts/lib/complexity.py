@@ -0,0 +1,144 @@
+'''This module provides the complexity index, a binary table of the textural complexity levels of each density number and dispersion index. For further information, see Daniel Moreira (2015 and 2019).
+
+The complexity level of a partition is its density number plus the position of its dispersion index in the sorted dispersion indexes of the density number (see the lattice map in `partition.get_ryp_map`). The index is stored into a `.npy` file, loaded by memory map and extended on demand.
+'''
+
+import os
+import tempfile
+
+import numpy
+
+from .base import CustomException
+from .partition import get_lattice_map_hash, get_ryp_map
+
+
+COMPLEXITY_INDEX_TYPE = numpy.int32
+
+## Default cardinality of a new complexity index. The same of the built-in lattice map.
+DEFAULT_CARDINALITY = 70
+
+
+def get_density_offset(density_number: int) -> int:
+    '''Return the position of the first level of a given density number in the complexity index array.
+
+    Each density number n has C(n, 2) + 1 positions (dispersions from 0 to C(n, 2)).'''
+
+    n = density_number
+    return n * (n - 1) * (n - 2) // 6 + n - 1
+
+
+def get_index_cardinality(size: int) -> int:
+    '''Return the cardinality of a complexity index array of a given size.'''
+
+    cardinality = 0
+    while get_density_offset(cardinality + 2) <= size:
+        cardinality += 1
+    return cardinality
+
+
+def make_complexity_levels(cardinality: int) -> numpy.ndarray:
+    '''Return the complexity index array of a given cardinality.
+
+    The level of the density number n and dispersion d is at the position `get_density_offset(n) + d`. Dispersions without partition have -1 values.'''
+
+    levels = numpy.full(get_density_offset(cardinality + 1), -1, dtype=COMPLEXITY_INDEX_TYPE)
+    for density_number, dispersions in get_ryp_map(cardinality).items():
+        positions = get_density_offset(density_number) + numpy.array(dispersions)
+        levels[positions] = density_number + numpy.arange(len(dispersions))
+    return levels
+
+
+def get_index_path(path: str) -> str:
+    '''Return the complexity index path of a given base path for the lattice map in use.
+
+    The indexes of user's lattice maps have the map's content hash in the filename, so an index is never reused with another map.'''
+
+    lattice_map_hash = get_lattice_map_hash()
+    if lattice_map_hash is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return '{}-{}{}'.format(root, lattice_map_hash[:12], extension)
+
+
+class ComplexityIndex(object):
+    '''Complexity index class. It maps density numbers and dispersion indexes to complexity levels.
+
+    If a path is given, the index is loaded from this file (see `get_index_path`) by memory map (or created, if it doesn't exist). The index is extended and saved when a larger density number is queried. The file is replaced atomically, so it can be shared by concurrent runs and worker processes.'''
+
+    def __init__(self, path=None, cardinality=DEFAULT_CARDINALITY) -> None:
+        self.path = None
+        self.levels = None
+        self.cardinality = 0
+
+        if path:
+            self.path = get_index_path(path)
+        if self.path and os.path.exists(self.path):
+            self.load_from_file()
+        self.extend(cardinality)
+
+    def __repr__(self) -> str:
+        return '<CI {}>'.format(self.cardinality)
+
+    def load_from_file(self) -> None:
+        '''Load the index from the file set into `path` attribute by memory map.'''
+
+        print('Loading complexity index from {}...'.format(self.path))
+        try:
+            self.levels = numpy.load(self.path, mmap_mode='r')
+        except:
+            raise CustomException('Failure on complexity index loading...')
+        self.cardinality = get_index_cardinality(len(self.levels))
+
+    def save_to_file(self, levels: numpy.ndarray) -> None:
+        '''Save the given levels into the file set into `path` attribute.
+
+        The levels are written into a temporary file that replaces the index file, so readers never find a partial file.'''
+
+        print('Saving complexity index into {}...'.format(self.path))
+        folder = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                numpy.save(fp, levels)
+            os.replace(tmp_path, self.path)
+        except:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def extend(self, cardinality: int) -> None:
+        '''Extend the index up to a given cardinality, if necessary. The index file is replaced or, if it can't be written, the index is kept in memory.'''
+
+        if cardinality <= self.cardinality:
+            return
+
+        print('Creating complexity index with cardinality {}...'.format(cardinality))
+        levels = make_complexity_levels(cardinality)
+        if self.path:
+            try:
+                self.save_to_file(levels)
+                self.load_from_file()
+                return
+            except OSError:
+                # Such as in read-only home folders
+                print('The complexity index could not be saved. It is kept in memory.')
+        self.levels = levels
+        self.cardinality = cardinality
+
+    def get_level(self, density_number: int, dispersion: int) -> int:
+        '''Return the complexity level of a given density number and dispersion index.'''
+
+        if density_number == 0:
+            return 0
+        if density_number > self.cardinality:
+            self.extend(max(density_number, self.cardinality * 2))
+
+        if dispersion < 0 or dispersion > density_number * (density_number - 1) // 2:
+            level = -1
+        else:
+            level = int(self.levels[get_density_offset(density_number) + dispersion])
+        if level < 0:
+            raise CustomException('There is no partition of density number {} with dispersion {}'.format(density_number, dispersion))
+        return level
@@ -0,0 +1,230 @@
+'''This module provides the Young lattice graph of partitional operations. For further information, see Gentil-Nunes 2017.
+
+The graph nodes are the partitions up to a given density number, identified by their `PartitionCodec` IDs, and the edges are typed by the partitional operation (resize, revariance, transfer and concurrence, positive or negative). The graph is stored as compressed sparse row (CSR) arrays in a folder of `.npy` files, loaded by memory map.
+
+Gentil-Nunes, Pauxy. 2017. "Nestings and Intersections Between Partitional Complexes." MusMat - Brazilian Journal of Music and Mathematics I (2): 93--108. Available at https://musmat.org/wp-content/uploads/2018/06/09-Pauxy.pdf.
+'''
+
+import itertools
+import os
+
+import numpy
+
+from ..config import LATTICE_GRAPH_PATH
+from .base import CustomException
+from .partition import Partition, PartitionCodec, iter_lexset
+
+
+## Edge types. Their codes are their positions.
+OPERATIONS = [
+    'resize+',
+    'resize-',
+    'revariance+',
+    'revariance-',
+    'transfer+',
+    'transfer-',
+    'concurrence+',
+    'concurrence-',
+]
+
+## Reverse operation of each positive operation. Transfers are enumerated in both directions.
+REVERSE_OPERATIONS = {
+    'resize+': 'resize-',
+    'revariance+': 'revariance-',
+    'concurrence+': 'concurrence-',
+}
+
+LATTICE_GRAPH_ARRAYS = [
+    'cardinality',
+    'indptr',
+    'indices',
+    'types',
+]
+
+
+def replace_part(parts: list, old, new) -> tuple:
+    '''Return the sorted parts tuple replacing one `old` part by a `new` one. Zero and `None` values mean no part.'''
+
+    parts = list(parts)
+    if old:
+        parts.remove(old)
+    if new:
+        parts.append(new)
+    return tuple(sorted(parts, reverse=True))
+
+
+def get_positive_neighbors(parts: tuple) -> list:
+    '''Return a list of (parts, operation) tuples of the resize+, revariance+ and concurrence+ operations, and of the transfers of a given partition's parts.
+
+    Resize changes a part's size by one, revariance adds or removes a unitary part, concurrence applies both with the same signal (a unitary part is added and a part is enlarged) and transfer applies both with opposite signals (a sounding component is moved between parts). Positive transfers increase the dispersion index.'''
+
+    distinct = sorted(set(parts), reverse=True)
+    neighbors = []
+
+    for part in distinct:
+        neighbors.append((replace_part(parts, part, part + 1), 'resize+'))
+
+    added = replace_part(parts, None, 1)
+    neighbors.append((added, 'revariance+'))
+    for part in set(added):
+        neighbors.append((replace_part(added, part, part + 1), 'concurrence+'))
+
+    # A component moved from part `a` to part `b` (or a new part, if zero)
+    # changes the agglomeration index by b - a + 1
+    for a in distinct:
+        for b in distinct + [0]:
+            if b == a and parts.count(a) < 2:
+                continue
+            variation = b - a + 1
+            if variation == 0:
+                continue
+            target = replace_part(replace_part(parts, a, a - 1), b, b + 1)
+            neighbors.append((target, 'transfer+' if variation < 0 else 'transfer-'))
+
+    return neighbors
+
+
+class LatticeGraph(object):
+    '''Young lattice graph class. It stores the partitional operations between the partitions up to a given density number.
+
+    The neighbors of the node `i` are `indices[indptr[i]:indptr[i + 1]]` and their operations codes (positions in `OPERATIONS`) are in the same slice of `types`.'''
+
+    def __init__(self, path=None) -> None:
+        self.path = None
+        self.cardinality = 0
+        self.codec = None
+        self.indptr = None
+        self.indices = None
+        self.types = None
+
+        if path:
+            self.path = path
+            self.load_from_dir()
+
+    def __repr__(self) -> str:
+        return '<LG {}: {} nodes, {} edges>'.format(self.cardinality, len(self.indptr) - 1, len(self.indices))
+
+    def set_arrays(self, cardinality: int, indptr, indices, types) -> None:
+        '''Set the graph's arrays and codec.'''
+
+        self.cardinality = int(cardinality)
+        self.codec = PartitionCodec(self.cardinality)
+        self.indptr = indptr
+        self.indices = indices
+        self.types = types
+
+    def load_from_dir(self) -> None:
+        '''Load the arrays from the folder set into `path` attribute by memory map.'''
+
+        print('Loading lattice graph from {}...'.format(self.path))
+        arrays = {}
+        for name in LATTICE_GRAPH_ARRAYS:
+            filename = os.path.join(self.path, '{}.npy'.format(name))
+            if not os.path.exists(filename):
+                raise CustomException('There is no lattice graph in {}.'.format(self.path))
+            arrays[name] = numpy.load(filename, mmap_mode='r')
+        self.set_arrays(arrays['cardinality'][0], arrays['indptr'], arrays['indices'], arrays['types'])
+
+    def save_to_dir(self, path=None) -> None:
+        '''Save the arrays into a folder of `.npy` files.'''
+
+        dest = self.path
+        if path:
+            dest = path
+
+        print('Saving lattice graph into {}...'.format(dest))
+        if not os.path.exists(dest):
+            os.makedirs(dest)
+        arrays = {
+            'cardinality': numpy.array([self.cardinality], dtype=numpy.int64),
+            'indptr': self.indptr,
+            'indices': self.indices,
+            'types': self.types,
+        }
+        for name, array in arrays.items():
+            numpy.save(os.path.join(dest, '{}.npy'.format(name)), numpy.asarray(array))
+
+    def get_node(self, partition) -> int:
+        '''Return the node ID of a given partition (`Partition` object, string or sequence of parts).'''
+
+        return self.codec.rank(Partition(partition).parts)
+
+    def get_neighbors_ids(self, node: int, operation=None) -> list:
+        '''Return the neighbors' IDs of a given node ID, optionally filtered by operation.'''
+
+        start, stop = self.indptr[node], self.indptr[node + 1]
+        indices = self.indices[start:stop]
+        if operation is None:
+            return indices.tolist()
+        code = OPERATIONS.index(operation)
+        return indices[self.types[start:stop] == code].tolist()
+
+    def get_neighbors(self, partition, operation=None) -> list:
+        '''Return the neighbor partitions of a given partition, optionally filtered by operation.'''
+
+        node = self.get_node(partition)
+        return [Partition(self.codec.unrank(i)) for i in self.get_neighbors_ids(node, operation)]
+
+    def get_operation(self, source, target):
+        '''Return the operation between given source and target partitions or `None` if they are not neighbors.'''
+
+        node = self.get_node(source)
+        target_node = self.get_node(target)
+        start, stop = self.indptr[node], self.indptr[node + 1]
+        positions = numpy.flatnonzero(self.indices[start:stop] == target_node)
+        if len(positions) == 0:
+            return None
+        return OPERATIONS[self.types[start + positions[0]]]
+
+
+## Lattice graphs shared by the process, by folder path (`None` if there is no graph). See `get_lattice_graph`.
+_LATTICE_GRAPHS = {}
+
+
+def get_lattice_graph(cardinality: int, path=None):
+    '''Return the saved lattice graph (see `utils -sg` command) if it covers a given cardinality or `None`, otherwise.
+
+    The default folder is the one in `rps_aux` folder. The graph is loaded at the first call and shared by the next ones.'''
+
+    if path is None:
+        path = LATTICE_GRAPH_PATH
+    if path not in _LATTICE_GRAPHS:
+        _LATTICE_GRAPHS[path] = None
+        if os.path.exists(os.path.join(path, '{}.npy'.format(LATTICE_GRAPH_ARRAYS[0]))):
+            _LATTICE_GRAPHS[path] = LatticeGraph(path)
+
+    graph = _LATTICE_GRAPHS[path]
+    if graph is None or cardinality > graph.cardinality:
+        return None
+    return graph
+
+
+def make_lattice_graph(cardinality: int) -> LatticeGraph:
+    '''Return a `LatticeGraph` object with the partitions up to a given density number.'''
+
+    print('Creating lattice graph with cardinality {}.'.format(cardinality))
+    codec = PartitionCodec(cardinality)
+    edges = [set() for _ in range(len(codec))]
+
+    # The node IDs follow the codec's order: the empty partition and the lexical set
+    for node, parts in enumerate(itertools.chain([()], iter_lexset(cardinality))):
+        for target, operation in get_positive_neighbors(parts):
+            if sum(target) > cardinality:
+                continue
+            target_node = codec.rank(target)
+            edges[node].add((target_node, OPERATIONS.index(operation)))
+            if operation in REVERSE_OPERATIONS:
+                edges[target_node].add((node, OPERATIONS.index(REVERSE_OPERATIONS[operation])))
+
+    indptr = numpy.zeros(len(edges) + 1, dtype=numpy.int64)
+    indptr[1:] = numpy.cumsum([len(node_edges) for node_edges in edges])
+    indices = numpy.zeros(indptr[-1], dtype=numpy.int64)
+    types = numpy.zeros(indptr[-1], dtype=numpy.int8)
+    for node, node_edges in enumerate(edges):
+        node_edges = sorted(node_edges)
+        indices[indptr[node]:indptr[node + 1]] = [e[0] for e in node_edges]
+        types[indptr[node]:indptr[node + 1]] = [e[1] for e in node_edges]
+
+    graph = LatticeGraph()
+    graph.set_arrays(cardinality, indptr, indices, types)
+    return graph
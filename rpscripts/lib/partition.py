@@ -5,34 +5,34 @@ Gentil-Nunes, Pauxy. 2009. "Análise Particional: uma Mediação entre Composiç
 Gentil-Nunes, Pauxy. 2017. "Nestings and Intersections Between Partitional Complexes." MusMat - Brazilian Journal of Music and Mathematics I (2): 93--108. Available at https://musmat.org/wp-content/uploads/2018/06/09-Pauxy.pdf.
 '''
 
+import bisect
 from collections import Counter
-from copy import deepcopy
+import importlib.resources
 import itertools
 import json
+import numpy
+import os
 import re
 
 
-from ..config import ENCODING
-from .base import get_number_combinations_pairs
+from ..config import ENCODING, LATTICE_MAP_PATH, LATTICE_MAP_VARIABLE, lattice_map_filename
+from .base import CustomException, get_content_hash, get_number_combinations_pairs, memoize
 
 
-def make_subseq(partition, n) -> list:
-    '''Return a subset array from a given partition from 0 to `n` element.'''
+def iter_partitions(number: int):
+    '''Yield the partitions of a given `number` as tuples of parts in descending order.
 
-    return [partition[i] for i in range(n)]
+    The partitions are yielded in reverse lexicographic order, from `(number,)` to `(1, 1, ..., 1)`, with no list of partitions in memory.'''
 
-
-def get_partitions(number: int) -> list:
-    '''Return the partitions of a given `number` as a list of lists.'''
-
-    partitions_list = []
+    if number < 1:
+        return
 
     partition = [0] * number
     last_pos = 0
     partition[last_pos] = number
 
     while True:
-        partitions_list.append(make_subseq(partition, last_pos + 1))
+        yield tuple(partition[:last_pos + 1])
 
         rem_val = 0
         while last_pos >= 0 and partition[last_pos] == 1:
@@ -40,7 +40,7 @@ def get_partitions(number: int) -> list:
             last_pos -= 1
 
         if last_pos < 0:
-            return partitions_list
+            return
 
         partition[last_pos] -= 1
         rem_val += 1
@@ -54,50 +54,338 @@ def get_partitions(number: int) -> list:
         last_pos += 1
 
 
+def iter_lexset(number: int):
+    '''Yield the lexical set of a given `number` (all partitions from 1 to number) as tuples.'''
+
+    for n in range(1, number + 1):
+        yield from iter_partitions(n)
+
+
+def get_partitions(number: int) -> list:
+    '''Return the partitions of a given `number` as a list of lists.'''
+
+    return [list(partition) for partition in iter_partitions(number)]
+
+
 def get_lexset(number: int) -> list:
     '''Return the lexical set of a given `number`. The lexical set is the list of all partitions from 1 to number.'''
-    partitions = []
-    for n in range(1, number + 1):
-        partitions.extend(get_partitions(n))
-    return partitions
+
+    return [list(partition) for partition in iter_lexset(number)]
+
+
+class PartitionCodec(object):
+    '''Partition codec class. It maps the partitions up to a given cardinality to dense integer IDs and back.
+
+    The IDs follow the lexical set order (see `iter_lexset`) and the ID 0 is the empty partition (`0`). The codec uses a table of the number of partitions of n with parts no larger than k, so no partition is enumerated. The IDs are the node IDs of the lattice graph (see `lattice` module).'''
+
+    def __init__(self, cardinality=70) -> None:
+        self.cardinality = cardinality
+
+        # counts[n][k]: number of partitions of n with parts no larger than k
+        self.counts = [[1] * (cardinality + 1)]
+        for n in range(1, cardinality + 1):
+            row = [0] * (cardinality + 1)
+            for k in range(1, cardinality + 1):
+                row[k] = row[k - 1]
+                if k <= n:
+                    row[k] += self.counts[n - k][k]
+            self.counts.append(row)
+
+        # first IDs of each density number
+        self.offsets = [0, 1]
+        for n in range(1, cardinality + 1):
+            self.offsets.append(self.offsets[-1] + self.counts[n][n])
+
+    def __repr__(self) -> str:
+        return '<PC {}: {} IDs>'.format(self.cardinality, len(self))
+
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    def count_partitions(self, number: int, higher_part=None) -> int:
+        '''Return the number of partitions of `number` with parts no larger than `higher_part`.'''
+
+        if higher_part is None or higher_part > number:
+            higher_part = number
+        return self.counts[number][higher_part]
+
+    def rank(self, parts) -> int:
+        '''Return the ID of a given partition (a sequence of parts).'''
+
+        parts = sorted(parts, reverse=True)
+        if not parts:
+            return 0
+
+        number = sum(parts)
+        if number > self.cardinality:
+            raise CustomException('Partition {} exceeds the codec cardinality {}.'.format(parts, self.cardinality))
+
+        position = 0
+        remaining = number
+        bound = number
+        for part in parts:
+            position += self.counts[remaining][bound] - self.counts[remaining][part]
+            remaining -= part
+            bound = part
+        return self.offsets[number] + position
+
+    def unrank(self, partition_id: int) -> tuple:
+        '''Return the partition (a tuple of parts in descending order) of a given ID.'''
+
+        if partition_id < 0 or partition_id >= len(self):
+            raise CustomException('Invalid partition ID {} for the codec cardinality {}.'.format(partition_id, self.cardinality))
+        if partition_id == 0:
+            return ()
+
+        number = bisect.bisect_right(self.offsets, partition_id) - 1
+        position = partition_id - self.offsets[number]
+
+        parts = []
+        remaining = number
+        bound = number
+        while remaining > 0:
+            part = min(remaining, bound)
+            while True:
+                # partitions of the remaining with `part` as first part
+                amount = self.counts[remaining - part][part]
+                if position < amount:
+                    break
+                position -= amount
+                part -= 1
+            parts.append(part)
+            remaining -= part
+            bound = part
+        return tuple(parts)
+
+
+def get_agglomeration_bitsets(higher_cardinality: int) -> list:
+    '''Return the achievable agglomeration indexes of the partitions of each number from 0 to `higher_cardinality` as bitsets (integers).
+
+    The bit `a` of the n-th bitset is set if there is a partition of n with agglomeration index `a`. The bitsets are calculated by dynamic programming with no partitions enumeration: a partition of n is a part k added to a partition of n - k, so the n-th bitset is the union of the (n - k)-th bitsets shifted by C(k, 2).'''
+
+    bitsets = [1]
+    for n in range(1, higher_cardinality + 1):
+        bitset = 0
+        for k in range(1, n + 1):
+            bitset |= bitsets[n - k] << (k * (k - 1) // 2)
+        bitsets.append(bitset)
+    return bitsets
+
+
+def get_bitset_values(bitset: int) -> list:
+    '''Return the positions of the set bits of a given bitset.'''
+
+    return [i for i, bit in enumerate(reversed(bin(bitset)[2:])) if bit == '1']
 
 
 def make_ryp_map(higher_cardinality: int) -> dict:
-    '''Make a rhythmic partitioning Young lattice of a given cardinality.'''
+    '''Make a rhythmic partitioning Young lattice of a given cardinality.
+
+    The map has the sorted dispersion indexes of each density number. Since the dispersion is C(n, 2) minus the agglomeration, they are calculated from the agglomeration bitsets.'''
 
-    partitions = get_lexset(higher_cardinality)
+    bitsets = get_agglomeration_bitsets(higher_cardinality)
     dic = {}
-    for p in partitions:
-        obj = Partition(p)
-        dispersion = obj.get_dispersion_index()
-        dn = obj.get_density_number()
-        if dn not in dic.keys():
-            dic[dn] = []
-        if dispersion not in dic[dn]:
-            dic[dn].append(dispersion)
-    return {k: sorted(v) for k, v in dic.items()}
+    for dn in range(1, higher_cardinality + 1):
+        binary_relations = dn * (dn - 1) // 2
+        dic[dn] = sorted(binary_relations - a for a in get_bitset_values(bitsets[dn]))
+    return dic
+
+
+## Lattice maps shared by the process, by source path (`None` for the built-in one). See `get_lattice_map`.
+_LATTICE_MAPS = {}
+
+
+def get_builtin_lattice_map():
+    '''Return the built-in lattice map resource, read in place from the package data.'''
+
+    return importlib.resources.files('rpscripts').joinpath('data', lattice_map_filename)
+
+
+def get_lattice_map_path():
+    '''Return the user's lattice map path or `None`, if there is no user's map.
+
+    The path is given by the `RPSCRIPTS_LATTICE_MAP` environment variable or is the default one in `rps_aux` folder (see `utils -sm` command).'''
+
+    path = os.environ.get(LATTICE_MAP_VARIABLE)
+    if path:
+        return path
+    if os.path.isfile(LATTICE_MAP_PATH):
+        return LATTICE_MAP_PATH
+    return None
+
+
+def load_lattice_map(path=None) -> dict:
+    '''Load and return a lattice map (see `make_ryp_map`) from a given JSON file or, if no path is given, from the built-in one.'''
+
+    if path:
+        print('Loading lattice map from {}...'.format(path))
+        try:
+            with open(path, 'r', encoding=ENCODING) as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            raise CustomException('Failure on lattice map loading from {}.'.format(path))
+    else:
+        data = json.loads(get_builtin_lattice_map().read_text(encoding=ENCODING))
+    return {int(k): v for k, v in data.items()}
+
+
+def get_lattice_map() -> dict:
+    '''Return the lattice map. It is loaded at the first call for each source (the user's map overrides the built-in one) and shared by the next ones, so it must not be changed.'''
+
+    path = get_lattice_map_path()
+    if path not in _LATTICE_MAPS:
+        _LATTICE_MAPS[path] = load_lattice_map(path)
+    return _LATTICE_MAPS[path]
+
+
+def get_lattice_map_hash():
+    '''Return the content hash of the user's lattice map or `None`, if the built-in map is used.'''
+
+    path = get_lattice_map_path()
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as fp:
+            return get_content_hash(fp.read())
+    except OSError:
+        raise CustomException('Failure on lattice map loading from {}.'.format(path))
+
+
+def get_ryp_map(higher_cardinality: int) -> dict:
+    '''Return the rhythmic partitioning Young lattice of a given cardinality from the lattice map or, if the map is smaller, calculated by `make_ryp_map`.'''
+
+    lattice_map = get_lattice_map()
+    if higher_cardinality <= max(lattice_map.keys(), default=0):
+        return {dn: lattice_map[dn] for dn in range(1, higher_cardinality + 1)}
+    return make_ryp_map(higher_cardinality)
+
+
+def make_ragged_parts(partitions) -> tuple:
+    '''Return the flat parts and offsets arrays of a given sequence of partitions (`Partition` objects, strings or sequences of parts).
+
+    The parts of the i-th partition are `parts[offsets[i]:offsets[i + 1]]`.'''
+
+    partitions = [parse_partition_parts(p) for p in partitions]
+    offsets = numpy.zeros(len(partitions) + 1, dtype=numpy.int64)
+    offsets[1:] = numpy.cumsum([len(p) for p in partitions])
+    parts = numpy.fromiter(itertools.chain.from_iterable(partitions), dtype=numpy.int64, count=int(offsets[-1]))
+    return parts, offsets
+
+
+def get_ragged_indexes(parts: numpy.ndarray, offsets: numpy.ndarray) -> tuple:
+    '''Return the density numbers, parts counts, agglomeration and dispersion indexes arrays of the partitions of given ragged arrays (see `make_ragged_parts`).
+
+    The indexes are calculated in bulk with integer sums by segment (`numpy.add.reduceat`). Empty partitions have zero density number and parts count and, as their `Partition` indexes are `None`, `nan` agglomeration and dispersion (so these arrays are of float type).'''
+
+    parts = numpy.asarray(parts, dtype=numpy.int64)
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+
+    parts_counts = numpy.diff(offsets)
+    density_numbers = numpy.zeros(len(parts_counts), dtype=numpy.int64)
+    agglomerations = numpy.full(len(parts_counts), numpy.nan)
+    dispersions = numpy.full(len(parts_counts), numpy.nan)
+
+    # reduceat does not handle empty segments
+    filled = parts_counts > 0
+    starts = offsets[:-1][filled]
+    if len(starts) > 0:
+        density_numbers[filled] = numpy.add.reduceat(parts, starts)
+        filled_agglomerations = numpy.add.reduceat(parts * (parts - 1) // 2, starts)
+        filled_density_numbers = density_numbers[filled]
+        agglomerations[filled] = filled_agglomerations
+        dispersions[filled] = filled_density_numbers * (filled_density_numbers - 1) // 2 - filled_agglomerations
+
+    return density_numbers, parts_counts, agglomerations, dispersions
+
+
+def get_covering_lattice_graph(cardinality: int):
+    '''Return the saved lattice graph if it covers a given cardinality or `None`, otherwise (see `lattice.get_lattice_graph`).'''
+
+    # Local import to avoid circular import (lattice module imports this one)
+    from .lattice import get_lattice_graph
+
+    return get_lattice_graph(cardinality)
+
+
+## Intern table of the partitions, keyed by class and parts. See Partition.__new__.
+_INTERNED_PARTITIONS = {}
+
+
+@memoize
+def parse_partition_string(string: str) -> tuple:
+    '''Return the sorted parts tuple of a given partition string such as "1^3.2".'''
+
+    parts = []
+    for el in string.split('.'):
+        if '^' in el:
+            part, n = el.split('^')
+            parts.extend([int(part)] * int(n))
+        else:
+            parts.append(int(el))
+    return tuple(sorted(p for p in parts if p > 0))
+
+
+def parse_partition_parts(parts) -> tuple:
+    '''Return the sorted parts tuple of a given partition string (such as "1^3.2"), `Partition` object or sequence of parts.
+
+    The string "0" and `None` are the empty partition.'''
+
+    if parts is None:
+        return ()
+    if isinstance(parts, str):
+        return parse_partition_string(parts)
+    if isinstance(parts, Partition):
+        return parts.parts
+    return tuple(sorted(p for p in parts if p > 0))
 
 
 class Partition(object):
-    '''Main partition class.'''
-
-    def __init__(self, parts=None) -> None:
-        self.parts = None
-        self.parts_map = None
-        if isinstance(parts, list):
-            self.parts = sorted(parts)
-        elif isinstance(parts, str):
-            self.parts = []
-            for el in parts.split('.'):
-                if '^' in el:
-                    part, n = el.split('^')
-                    self.parts.extend([int(part)] * int(n))
-                else:
-                    self.parts.append(int(el))
-        self.counter = Counter(self.parts)
+    '''Main partition class.
+
+    Partitions are immutable and interned: identical partitions share a single object, so their string form and indexes are calculated once.'''
+
+    __slots__ = ('parts', 'multiplicities', 'density_number', 'agglomeration', 'dispersion', 'string')
+
+    def __new__(cls, parts=None):
+        parts = parse_partition_parts(parts)
+        key = (cls, parts)
+        if key in _INTERNED_PARTITIONS:
+            return _INTERNED_PARTITIONS[key]
+
+        multiplicities = tuple(sorted(Counter(parts).items()))
+        density_number = sum(parts)
+        agglomeration = None
+        dispersion = None
+        if parts:
+            agglomeration = sum([get_number_combinations_pairs(n) for n in parts])
+            dispersion = get_number_combinations_pairs(density_number) - agglomeration
+        string = '.'.join([str(k) if v < 2 else '{}^{}'.format(k, v) for k, v in multiplicities]) or '0'
+
+        obj = object.__new__(cls)
+        for attr, value in zip(Partition.__slots__, (parts, multiplicities, density_number, agglomeration, dispersion, string)):
+            object.__setattr__(obj, attr, value)
+        _INTERNED_PARTITIONS[key] = obj
+        return obj
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError('Partition objects are immutable.')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('Partition objects are immutable.')
+
+    def __reduce__(self):
+        return (self.__class__, (self.parts,))
 
     def __eq__(self, __value: object) -> bool:
-        self.parts == __value.parts
+        if isinstance(__value, Partition):
+            return self.parts == __value.parts
+        return False
+
+    def __ne__(self, __value: object) -> bool:
+        return not self == __value
+
+    def __hash__(self) -> int:
+        return hash(self.parts)
 
     def __repr__(self) -> str:
         return '<P {}>'.format(self.as_string())
@@ -105,18 +393,7 @@ class Partition(object):
     def as_string(self) -> str:
         '''Return the partition as a string such as "1^3.2".'''
 
-        if not self.parts:
-            return '0'
-        dic = {}
-        for el in self.parts:
-            if el not in dic.keys():
-                dic[el] = 0
-            dic[el] += 1
-
-        str_repr =  '.'.join([str(k) if v < 2 else '{}^{}'.format(k, v)
-            for k, v in sorted(dic.items())
-        ])
-        return str_repr
+        return self.string
 
     def get_parts_size(self) -> int:
         '''Count the partition's number of parts.'''
@@ -126,30 +403,27 @@ class Partition(object):
     def get_density_number(self) -> int:
         '''Return the partition's density number.'''
 
-        return int(sum(self.parts))
+        return self.density_number
 
     def count_binary_relations(self):
         '''Count binary relations of partition's parts.'''
 
-        density_number = self.get_density_number()
-        return get_number_combinations_pairs(density_number)
+        return get_number_combinations_pairs(self.density_number)
 
     def get_agglomeration_index(self) -> int:
         '''Return the partition's agglomeration index.'''
 
-        if self.parts == []:
-            return None
-        return int(sum([get_number_combinations_pairs(n) for n in self.parts]))
+        return self.agglomeration
 
     def get_dispersion_index(self) -> int:
         '''Return the partition's dispersion index.'''
 
-        if self.parts == []:
-            return None
-        return int(self.count_binary_relations() - self.get_agglomeration_index())
+        return self.dispersion
 
     def resize(self) -> list:
-        '''Return the list of current's resized partitions.'''
+        '''Return the list of current's resized partitions.
+
+        If a saved lattice graph covers the resized partitions, they are read from the graph (see `lattice` module).'''
 
         # Resizing (m) a part means to change its thickness. The positive
         # resizing implies the inclusion of more sounding components to a
@@ -157,10 +431,14 @@ class Partition(object):
         # the thickening of a part, subtracting a sounding component from a
         # block. (Gentil-Nunes, 2017)
 
+        graph = get_covering_lattice_graph(self.density_number + 1)
+        if graph:
+            return sorted(graph.get_neighbors(self, 'resize+'), key=lambda p: p.get_agglomeration_index())
+
         resized = []
 
-        for part in self.counter.keys():
-            _parts = deepcopy(self.parts)
+        for part, _ in self.multiplicities:
+            _parts = list(self.parts)
             ind = _parts.index(part)
             _parts[ind] += 1
             _parts.sort()
@@ -168,17 +446,25 @@ class Partition(object):
         return list(map(Partition, resized))
 
     def revariate(self) -> list:
-        '''Return the list of current's revariated partitions.'''
+        '''Return the list of current's revariated partitions.
+
+        If a saved lattice graph covers the revariated partition, it is read from the graph (see `lattice` module).'''
 
         # Revariance (v) is the changing of variety (number of parts) inside a
         # textural configuration. Positive revariance implies adding an unitary
         # part to the partition and negative revariance means subtracting an
         # unitary part from it. (Gentil-Nunes, 2017)
 
-        return Partition(self.parts + [1])
+        graph = get_covering_lattice_graph(self.density_number + 1)
+        if graph:
+            return graph.get_neighbors(self, 'revariance+')[0]
+
+        return Partition(list(self.parts) + [1])
 
     def transfer(self, default=True) -> list:
-        '''Return the list of current's transfered partitions.'''
+        '''Return the list of current's transfered partitions.
+
+        If a saved lattice graph covers the partition, the transfered partitions are read from the graph (see `lattice` module).'''
 
         # Transference (t) arises when resizing and revariance are applied
         # together, but with opposite signals (positive resizing with negative
@@ -188,7 +474,7 @@ class Partition(object):
         # traditional concert music. (Gentil-Nunes, 2017)
 
         def swap(part_1, part_2):
-            _parts = deepcopy(self.parts)
+            _parts = list(self.parts)
 
             i1 = _parts.index(part_1)
             _parts.pop(i1)
@@ -204,7 +490,7 @@ class Partition(object):
 
         def subtract(part):
             if part > 1:
-                _parts = deepcopy(self.parts)
+                _parts = list(self.parts)
                 ind = _parts.index(part)
                 _parts[ind] -= 1
                 _parts.append(1)
@@ -224,39 +510,45 @@ class Partition(object):
             return low_pos, high_neg
 
 
-        partitions = []
-
-        for part, quantity in self.counter.items():
-            # subtract from an existing part and move to a new part
-            p = subtract(part)
-            if p:
+        graph = get_covering_lattice_graph(self.density_number)
+        if graph:
+            partitions = graph.get_neighbors(self, 'transfer+') + graph.get_neighbors(self, 'transfer-')
+            for p in partitions:
                 low_pos, high_neg = update_pos_neg(p, low_pos, high_neg)
-                partitions.append(p)
+        else:
+            partitions = []
 
-            # transfer between parts with equal values
-            if quantity > 1:
-                p = swap(part, part)
+            for part, quantity in self.multiplicities:
+                # subtract from an existing part and move to a new part
+                p = subtract(part)
                 if p:
                     low_pos, high_neg = update_pos_neg(p, low_pos, high_neg)
                     partitions.append(p)
 
+                # transfer between parts with equal values
+                if quantity > 1:
+                    p = swap(part, part)
+                    if p:
+                        low_pos, high_neg = update_pos_neg(p, low_pos, high_neg)
+                        partitions.append(p)
 
-        # transfer/swap between parts with different values
-        distinct = list(self.counter.keys())
-        for part_1, part_2 in itertools.combinations(distinct, 2):
-            p = swap(part_1, part_2)
-            if p.parts != self.parts and p not in partitions:
-                low_pos, high_neg = update_pos_neg(p, low_pos, high_neg)
-                partitions.append(p)
 
-            p = swap(part_2, part_1)
-            if p.parts != self.parts and p not in partitions:
-                low_pos, high_neg = update_pos_neg(p, low_pos, high_neg)
-                partitions.append(p)
+            # transfer/swap between parts with different values
+            distinct = [part for part, _ in self.multiplicities]
+            for part_1, part_2 in itertools.combinations(distinct, 2):
+                p = swap(part_1, part_2)
+                if p.parts != self.parts and p not in partitions:
+                    low_pos, high_neg = update_pos_neg(p, low_pos, high_neg)
+                    partitions.append(p)
+
+                p = swap(part_2, part_1)
+                if p.parts != self.parts and p not in partitions:
+                    low_pos, high_neg = update_pos_neg(p, low_pos, high_neg)
+                    partitions.append(p)
 
         result = {'positive': [], 'negative': []}
 
-        partitions = sorted(partitions, key=lambda p: p.get_agglomeration_index())
+        partitions = sorted(partitions, key=lambda p: (p.get_agglomeration_index(), p.parts))
 
         for p in partitions:
             p_disp_ind = p.get_dispersion_index()
@@ -0,0 +1,132 @@
+'''This module provides the pass manager. It calculates several derived attributes of a `RPData` object (see `RPDATA_ATTRIBUTES`) in a single traversal of its distinct partitions.
+
+Each analysis stage is an `AttributePass` object. It declares the attribute it produces and the attributes it requires, calculates a value for each distinct partition and makes the attribute from these values, by default broadcasting them to the events through the partitions' codes. The manager runs the passes in dependency order and saves all the produced attributes at once.
+'''
+
+import numpy
+
+from .base import CategoricalSequence, CustomException, RPData, as_categorical, encode_categories
+from .partition import Partition
+
+
+def broadcast_values(partitions: CategoricalSequence, values: list) -> CategoricalSequence:
+    '''Return a `CategoricalSequence` with the given values (one for each partitions' category) broadcast to the events through the partitions' codes.'''
+
+    if len(partitions) == 0:
+        return CategoricalSequence([])
+    categories, codes = encode_categories(values)
+    return CategoricalSequence(categories=categories, codes=numpy.asarray(codes, dtype=int)[partitions.codes])
+
+
+class AttributePass(object):
+    '''Abstract derived attribute pass.
+
+    The extended classes set the `attribute` and `requires` attributes in `setup` method and implement `map_partition` and/or `make_attribute` methods.'''
+
+    def __init__(self) -> None:
+        self.attribute = None
+        self.requires = []
+        self.setup()
+
+    def __repr__(self) -> str:
+        return '<AP {}>'.format(self.attribute)
+
+    def setup(self) -> None:
+        '''Set the produced attribute name and the required attributes. Depends on the extended classes implementation.'''
+
+        raise CustomException('Not implemented')
+
+    def prepare(self, rpdata: RPData) -> None:
+        '''Prepare the pass before the partitions' traversal, such as loading auxiliary data.'''
+
+        pass
+
+    def map_partition(self, partition: Partition):
+        '''Return the pass value of a given distinct partition. The default is no value.'''
+
+        return None
+
+    def make_attribute(self, rpdata: RPData, partitions: CategoricalSequence, values: list):
+        '''Return the attribute data from the values of each distinct partition (in `partitions` categories order). The required attributes are already set into `rpdata`.
+
+        The default broadcasts the values to the events.'''
+
+        return broadcast_values(partitions, values)
+
+
+class PassManager(object):
+    '''Pass manager class. It stores the registered passes by attribute name and runs them.'''
+
+    def __init__(self, passes=None) -> None:
+        self.passes = {}
+
+        for attribute_pass in passes or []:
+            self.register(attribute_pass)
+
+    def __repr__(self) -> str:
+        return '<PM: {}>'.format(', '.join(self.passes.keys()))
+
+    def register(self, attribute_pass: AttributePass) -> None:
+        '''Register a given pass. Each attribute has only one pass.'''
+
+        if attribute_pass.attribute in self.passes:
+            raise CustomException('There is already a pass for the attribute {}.'.format(attribute_pass.attribute))
+        self.passes[attribute_pass.attribute] = attribute_pass
+
+    def get_passes_order(self, attributes: list) -> list:
+        '''Return the passes of the given attributes and of their requirements, sorted in dependency order.
+
+        Requirements without a registered pass must be available in the `RPData` object.'''
+
+        order = []
+        visiting = set()
+
+        def visit(attribute):
+            if attribute not in self.passes or self.passes[attribute] in order:
+                return
+            if attribute in visiting:
+                raise CustomException('There is a circular requirement in the attribute {}.'.format(attribute))
+            visiting.add(attribute)
+            for required in self.passes[attribute].requires:
+                visit(required)
+            visiting.remove(attribute)
+            order.append(self.passes[attribute])
+
+        for attribute in attributes:
+            if attribute not in self.passes:
+                raise CustomException('There is no pass for the attribute {}.'.format(attribute))
+            visit(attribute)
+        return order
+
+    def run(self, rpdata: RPData, attributes=None, save=True) -> list:
+        '''Calculate the given attributes (default: all the registered ones) into a given `RPData` object, in a single traversal of its distinct partitions, and return the produced attributes' names.
+
+        If `save` is true, all the produced attributes are saved at once into the sidecar file.'''
+
+        if attributes is None:
+            attributes = list(self.passes.keys())
+        order = self.get_passes_order(attributes)
+        produced = [attribute_pass.attribute for attribute_pass in order]
+
+        for attribute_pass in order:
+            for required in attribute_pass.requires:
+                if required not in produced and len(rpdata.__getattribute__(required)) == 0:
+                    raise CustomException('The attribute {} demands {} data. Check the available passes.'.format(attribute_pass.attribute, required))
+
+        partitions = as_categorical(rpdata.partitions).compact()
+        for attribute_pass in order:
+            attribute_pass.prepare(rpdata)
+
+        print('Calculating {} of {} distinct partitions...'.format(', '.join(produced), len(partitions.categories)))
+        values = {attribute: [] for attribute in produced}
+        for category in partitions.categories:
+            partition = Partition(category)
+            for attribute_pass in order:
+                values[attribute_pass.attribute].append(attribute_pass.map_partition(partition))
+
+        for attribute_pass in order:
+            rpdata.__setattr__(attribute_pass.attribute, attribute_pass.make_attribute(rpdata, partitions, values[attribute_pass.attribute]))
+
+        if save:
+            rpdata.save_attributes(produced)
+        return produced
@@ -0,0 +1,121 @@
+'''This module provides smoothing functions of time series, such as the textural complexity in time. For further information about LOWESS, see Cleveland (1979 and 1981).
+
+Each event of a time series lasts from its start (global offset) to its end, so the series is a step function. The binned and rolling smoothings are calculated from the cumulative integral of this step function: the duration-weighted mean of any time window is the difference of two cumulative values divided by the window's duration.
+
+statsmodels is imported only inside the `lowess` function, because its import is slow.
+'''
+
+import numpy
+
+from .base import CustomException
+
+
+## Smoothing methods. See `smooth` function.
+SMOOTHING_METHODS = [
+    'lowess',
+    'binned',
+    'rolling',
+]
+
+## Minimum number of events to set LOWESS delta automatically.
+LOWESS_DELTA_THRESHOLD = 1000
+
+## LOWESS delta as a fraction of the series' time range.
+LOWESS_DELTA_FRACTION = 0.01
+
+## Default number of bins of the binned smoothing.
+DEFAULT_BINS = 512
+
+
+def get_lowess_delta(x_values) -> float:
+    '''Return the LOWESS delta of the given X values: the distance within which the linear interpolation is used instead of weighted regression.
+
+    Small series have no delta. Larger ones have 1% of their time range, as suggested in statsmodels' documentation.'''
+
+    if len(x_values) < LOWESS_DELTA_THRESHOLD:
+        return 0.0
+    return LOWESS_DELTA_FRACTION * float(x_values[-1] - x_values[0])
+
+
+def lowess(x_values, y_values, frac=0.05, delta=None) -> numpy.ndarray:
+    '''Return the LOWESS of the given Y values. The X values must be sorted. If no delta is given, it is set by `get_lowess_delta` function.'''
+
+    import statsmodels.nonparametric.smoothers_lowess
+
+    x_values = numpy.asarray(x_values, dtype=float)
+    y_values = numpy.asarray(y_values, dtype=float)
+    if delta is None:
+        delta = get_lowess_delta(x_values)
+    return statsmodels.nonparametric.smoothers_lowess.lowess(y_values, x_values, frac=frac, delta=delta, is_sorted=True, return_sorted=False)
+
+
+def make_step_integral(starts, ends, values) -> tuple:
+    '''Return the knots' times and the cumulative integral values of the step function of the given events' starts, ends and values.
+
+    The integral is linear between knots, so it is evaluated at any time by linear interpolation. Gaps between events have zero value.'''
+
+    starts = numpy.asarray(starts, dtype=float)
+    ends = numpy.asarray(ends, dtype=float)
+    values = numpy.asarray(values, dtype=float)
+
+    times = numpy.empty(len(starts) * 2)
+    times[0::2] = starts
+    times[1::2] = ends
+
+    areas = numpy.zeros(len(times))
+    areas[1::2] = values * (ends - starts)
+    return times, numpy.cumsum(areas)
+
+
+def get_windows_means(times, integral, windows_starts, windows_ends) -> numpy.ndarray:
+    '''Return the duration-weighted means of the step function in the given time windows, from its cumulative integral (see `make_step_integral` function).'''
+
+    windows_starts = numpy.asarray(windows_starts, dtype=float)
+    windows_ends = numpy.asarray(windows_ends, dtype=float)
+    areas = numpy.interp(windows_ends, times, integral) - numpy.interp(windows_starts, times, integral)
+    durations = windows_ends - windows_starts
+    return numpy.divide(areas, durations, out=numpy.zeros(len(areas)), where=durations > 0)
+
+
+def binned_smoothing(starts, ends, values, bins=DEFAULT_BINS) -> tuple:
+    '''Return the centers and the duration-weighted means of a given number of bins of a regular time grid.'''
+
+    if bins < 1:
+        raise CustomException('The number of bins must be positive.')
+
+    times, integral = make_step_integral(starts, ends, values)
+    edges = numpy.linspace(times[0], times[-1], bins + 1)
+    means = get_windows_means(times, integral, edges[:-1], edges[1:])
+    return (edges[:-1] + edges[1:]) / 2, means
+
+
+def rolling_smoothing(starts, ends, values, window: float) -> numpy.ndarray:
+    '''Return the duration-weighted means of windows of a given duration centered at each event's start. The windows are clipped to the series' time range.'''
+
+    if window <= 0:
+        raise CustomException('The rolling window must be positive.')
+
+    times, integral = make_step_integral(starts, ends, values)
+    centers = numpy.asarray(starts, dtype=float)
+    windows_starts = numpy.maximum(centers - window / 2, times[0])
+    windows_ends = numpy.minimum(centers + window / 2, times[-1])
+    return get_windows_means(times, integral, windows_starts, windows_ends)
+
+
+def smooth(starts, ends, values, method='lowess', frac=0.05, bins=DEFAULT_BINS) -> tuple:
+    '''Return the X and Y values of a given smoothing method (see `SMOOTHING_METHODS`) of the given events' starts, ends and values.
+
+    The `frac` argument is the fraction of the series used in each local estimate: the LOWESS' fraction of events, and the fraction of the time range of the rolling window. The binned smoothing is the LOWESS of the bins' means.'''
+
+    if len(values) == 0:
+        return numpy.array([]), numpy.array([])
+
+    if method == 'lowess':
+        return numpy.asarray(starts, dtype=float), lowess(starts, values, frac)
+    if method == 'binned':
+        centers, means = binned_smoothing(starts, ends, values, bins)
+        return centers, lowess(centers, means, frac)
+    if method == 'rolling':
+        window = frac * (float(numpy.max(ends)) - float(numpy.min(starts)))
+        return numpy.asarray(starts, dtype=float), rolling_smoothing(starts, ends, values, window)
+    raise CustomException('Invalid smoothing method: {}. Choose one of {}.'.format(method, ', '.join(SMOOTHING_METHODS)))
@@ -0,0 +1,346 @@
+'''This module provides the parts table, a compact table with the events of each part (or voice) of a score, saved by the calculator.
+
+The rhythmic partitions of any subset of parts are recalculated from this table without the digital score parsing.'''
+
+import itertools
+
+from .base import CategoricalSequence, CustomException, EventLocation, OffsetIndex, RPData, dump_json_data, file_rename, fraction_to_string, load_json_file, parse_fraction
+from .partition import Partition
+
+
+PARTS_TABLE_SUFFIX = 'parts'
+
+## Sections of the music21's instrument classes. See calculator's get_instrument_section function.
+SECTIONS = [
+    'strings',
+    'woodwinds',
+    'brass',
+    'percussion',
+    'keyboards',
+    'voices',
+    'others',
+]
+
+## Grouping specifications of the parts' sweep. User-defined groupings are given in JSON files.
+GROUPINGS = [
+    'parts',
+    'sections',
+    'section-pairs',
+]
+
+
+def get_parts_table_filename(filename: str) -> str:
+    '''Return the parts table filename of a given score or JSON filename.'''
+
+    suffix = '-{}.json'.format(PARTS_TABLE_SUFFIX)
+    if filename.endswith(suffix):
+        return filename
+    return file_rename(filename, 'json', PARTS_TABLE_SUFFIX)
+
+
+def make_partition_parts(states: list) -> tuple:
+    '''Return the duration and the partition parts of the given parts' states at an attack point.
+
+    Each state is a tuple of remaining duration, sounding flag and number of pitches (zero for rests), or `None` if the part has no event. As in the calculator's parsemae, the duration is the smallest remaining duration and the parts are the sums of the pitches grouped by sounding flag and remaining duration.'''
+
+    durations = [state[0] for state in states if state is not None]
+    if not durations:
+        return None, None
+
+    groups = {}
+    for state in states:
+        if state is None:
+            continue
+        remaining, sounding, pitches = state
+        if pitches > 0:
+            key = (sounding, remaining)
+            groups[key] = groups.get(key, 0) + pitches
+
+    return min(durations), sorted(groups.values())
+
+
+def merge_partitions(attacks: list, durations: list, parts_list: list) -> list:
+    '''Return a list of (global offset, duration, parts) tuples, merging adjacent equal partitions.'''
+
+    merged = []
+    for attack, duration, parts in zip(attacks, durations, parts_list):
+        if parts is None:
+            continue
+        if merged and merged[-1][2] == parts:
+            merged[-1][1] += duration
+        else:
+            merged.append([attack, duration, parts])
+    return [tuple(row) for row in merged]
+
+
+class PartEvents(object):
+    '''Events of a single part (or voice) of a score.
+
+    The events are stored as columns of start global offsets, durations and number of pitches (zero for rests).'''
+
+    def __init__(self, name='', instrument='', section='others', starts=None, durations=None, pitches=None) -> None:
+        self.name = name
+        self.instrument = instrument
+        self.section = section
+        self.starts = starts or []
+        self.durations = durations or []
+        self.pitches = pitches or []
+        self.ends = [start + duration for start, duration in zip(self.starts, self.durations)]
+
+    def __repr__(self) -> str:
+        return '<PE {}: {} events>'.format(self.name, len(self.starts))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def get_states(self, attacks: list) -> list:
+        '''Return the part's state at each given attack point (sorted global offsets).
+
+        The state is a tuple of remaining duration, sounding flag and number of pitches, or `None` if the part has no event at the attack point.'''
+
+        states = []
+        size = len(self.starts)
+        position = -1
+        for attack in attacks:
+            while position + 1 < size and self.starts[position + 1] <= attack:
+                position += 1
+            if position > -1 and attack < self.ends[position]:
+                pitches = self.pitches[position]
+                sounding = pitches > 0 and attack > self.starts[position]
+                states.append((self.ends[position] - attack, sounding, pitches))
+            else:
+                states.append(None)
+        return states
+
+    def to_json(self) -> dict:
+        '''Return the part's data formated to json.'''
+
+        return {
+            'name': self.name,
+            'instrument': self.instrument,
+            'section': self.section,
+            'starts': list(map(fraction_to_string, self.starts)),
+            'durations': list(map(fraction_to_string, self.durations)),
+            'pitches': self.pitches,
+        }
+
+
+def make_part_events_from_json(data: dict) -> PartEvents:
+    '''Return a `PartEvents` object from json data.'''
+
+    return PartEvents(
+        name=data['name'],
+        instrument=data['instrument'],
+        section=data['section'],
+        starts=list(map(parse_fraction, data['starts'])),
+        durations=list(map(parse_fraction, data['durations'])),
+        pitches=data['pitches'],
+    )
+
+
+class PartsTable(object):
+    '''Parts table class. It stores the measures offsets and the events of each part of a score.'''
+
+    def __init__(self, path=None) -> None:
+        self.path = None
+        self.offset_map = {}
+        self.parts = []
+        self.compress = False
+
+        if path:
+            self.path = path
+            self.load_from_file()
+
+    def __repr__(self) -> str:
+        return '<PT: {} parts>'.format(len(self.parts))
+
+    def to_json(self) -> dict:
+        '''Return the table formated to json.'''
+
+        return {
+            'offset_map': {k: fraction_to_string(v) for k, v in self.offset_map.items()},
+            'parts': [part.to_json() for part in self.parts],
+        }
+
+    def load_from_file(self) -> None:
+        '''Load data from the file set into `path` attribute.'''
+
+        print('Loading parts table from {}...'.format(self.path))
+        data = load_json_file(self.path)
+        self.offset_map = {int(k): parse_fraction(v) for k, v in data['offset_map'].items()}
+        self.parts = [make_part_events_from_json(part) for part in data['parts']]
+
+    def save_to_file(self, filename=None) -> None:
+        '''Save the table into a JSON file.'''
+
+        dest = self.path
+        if filename:
+            dest = filename
+
+        print('Saving parts table into {}...'.format(dest))
+        dump_json_data(dest, self.to_json(), self.compress)
+
+    def get_description(self) -> str:
+        '''Return a description of the table's parts, one in each line.'''
+
+        rows = []
+        for i, part in enumerate(self.parts, 1):
+            rows.append('{}: {} ({}, {}), {} events'.format(i, part.name, part.instrument, part.section, len(part)))
+        return '\n'.join(rows)
+
+    def get_parts_indexes(self, numbers=None, sections=None, instruments=None) -> list:
+        '''Return the indexes of the parts selected by their numbers (starting at 1), sections or instruments.
+
+        If no selection is given, return all the parts' indexes.'''
+
+        if not numbers and not sections and not instruments:
+            return list(range(len(self.parts)))
+
+        indexes = set()
+        for number in numbers or []:
+            if number < 1 or number > len(self.parts):
+                raise CustomException('There is no part number {}.'.format(number))
+            indexes.add(number - 1)
+
+        sections = [s.lower() for s in sections or []]
+        instruments = [i.lower() for i in instruments or []]
+        for i, part in enumerate(self.parts):
+            if part.section.lower() in sections or part.instrument.lower() in instruments:
+                indexes.add(i)
+
+        if not indexes:
+            raise CustomException('There is no part in the given selection.')
+        return sorted(indexes)
+
+    def get_selector_indexes(self, selector) -> list:
+        '''Return the indexes of the parts selected by a given part number (starting at 1), section or instrument.'''
+
+        if isinstance(selector, int) and not isinstance(selector, bool):
+            return self.get_parts_indexes([selector])
+        if isinstance(selector, str):
+            indexes = [i for i, part in enumerate(self.parts) if selector.lower() in (part.section.lower(), part.instrument.lower())]
+            if indexes:
+                return indexes
+        raise CustomException('There is no part matching {}.'.format(selector))
+
+    def get_attacks(self, indexes: list) -> list:
+        '''Return the sorted attack points (global offsets) of the given parts.'''
+
+        attacks = set()
+        for i in indexes:
+            attacks.update(self.parts[i].starts)
+        return sorted(attacks)
+
+    def make_rpdata(self, indexes: list) -> RPData:
+        '''Return a `RPData` object with the rhythmic partitions of the given parts.'''
+
+        return self.make_groups_rpdata({'': indexes})['']
+
+    def make_groups_rpdata(self, groups: dict) -> dict:
+        '''Return a dictionary with a `RPData` object for each given group of parts (group name and parts' indexes).
+
+        All the groups are calculated in a single sweep: the parts' states are calculated once, at the attack points of all the groups' parts, and shared by the groups.'''
+
+        used_indexes = sorted(set(itertools.chain.from_iterable(groups.values())))
+        attacks = self.get_attacks(used_indexes)
+        attacks_positions = {attack: position for position, attack in enumerate(attacks)}
+
+        parts_states = {i: self.parts[i].get_states(attacks) for i in used_indexes}
+        parts_attacks = {i: [attacks_positions[start] for start in self.parts[i].starts] for i in used_indexes}
+
+        groups_rpdata = {}
+        for name, indexes in groups.items():
+            positions = sorted(set(itertools.chain.from_iterable(parts_attacks[i] for i in indexes)))
+
+            durations = []
+            parts_list = []
+            for position in positions:
+                duration, parts = make_partition_parts([parts_states[i][position] for i in indexes])
+                durations.append(duration)
+                parts_list.append(parts)
+
+            group_attacks = [attacks[position] for position in positions]
+            rows = merge_partitions(group_attacks, durations, parts_list)
+            groups_rpdata[name] = make_rpdata_from_partitions(rows, self.offset_map)
+        return groups_rpdata
+
+    def make_groups(self, grouping: str) -> dict:
+        '''Return a dictionary of groups of parts (group name and parts' indexes) from a given grouping specification.
+
+        The grouping is one of `GROUPINGS` (each part, each section, each pair of sections) or a JSON filename with a dictionary of group names and lists of parts' numbers, sections or instruments. Each group must have at least one selector and each selector must match a part.'''
+
+        sections = {}
+        for i, part in enumerate(self.parts):
+            sections.setdefault(part.section, []).append(i)
+
+        if grouping == 'parts':
+            return {'{}-{}'.format(i + 1, part.name): [i] for i, part in enumerate(self.parts)}
+        if grouping == 'sections':
+            return sections
+        if grouping == 'section-pairs':
+            return {
+                '{}+{}'.format(a, b): sorted(sections[a] + sections[b])
+                for a, b in itertools.combinations(sections.keys(), 2)
+            }
+
+        groups = {}
+        for name, selectors in load_json_file(grouping).items():
+            if not selectors:
+                raise CustomException('The group {} has no parts selection.'.format(name))
+            indexes = set()
+            for selector in selectors:
+                indexes.update(self.get_selector_indexes(selector))
+            groups[name] = sorted(indexes)
+        return groups
+
+
+def make_rpdata_from_partitions(rows: list, offset_map: dict) -> RPData:
+    '''Return a `RPData` object from a given list of (global offset, duration, parts) tuples and a measures offset map.'''
+
+    data = {
+        'Index': [], # 0
+        'Measure number': [], # 1
+        'Offset': [], # 2
+        'Global offset': [], # 3
+        'Duration': [], # 4
+        'Partition': [], # 5
+        'Density-number': [], # 6
+        'Agglomeration': [], # 7
+        'Dispersion': [], # 8
+        'Parts': [], # 9
+    }
+    values_map = {}
+
+    offset_index = OffsetIndex(offset_map, [])
+
+    for global_offset, duration, parts in rows:
+        partition = Partition(parts)
+
+        measure_number, offset = offset_index.get_location(global_offset)
+        event_location = EventLocation(measure_number=measure_number, offset=offset)
+
+        partition_str = partition.as_string()
+        agglomeration = partition.get_agglomeration_index()
+        dispersion = partition.get_dispersion_index()
+
+        data['Index'].append(event_location.str_index)
+        data['Measure number'].append(measure_number)
+        data['Offset'].append(offset)
+        data['Global offset'].append(global_offset)
+        data['Duration'].append(duration)
+        data['Partition'].append(partition_str)
+        data['Density-number'].append(partition.get_density_number())
+        data['Agglomeration'].append(agglomeration)
+        data['Dispersion'].append(dispersion)
+        data['Parts'].append(list(partition.parts))
+
+        if partition_str not in values_map.keys():
+            values_map[partition_str] = (agglomeration, dispersion)
+
+    rpdata = RPData()
+    rpdata.data = data
+    rpdata.values_map = values_map
+    rpdata.partitions = CategoricalSequence(data['Partition'])
+    rpdata.size = len(rpdata.partitions)
+    rpdata.offset_map = dict(offset_map)
+    return rpdata
@@ -0,0 +1,155 @@
+'''This module classifies the transitions between consecutive partitions by partitional operation (resize, revariance, transfer and concurrence). For further information, see Gentil-Nunes 2017.
+
+Gentil-Nunes, Pauxy. 2017. "Nestings and Intersections Between Partitional Complexes." MusMat - Brazilian Journal of Music and Mathematics I (2): 93--108. Available at https://musmat.org/wp-content/uploads/2018/06/09-Pauxy.pdf.
+'''
+
+import multiprocessing
+import os
+
+import numpy
+
+from .lib.base import CategoricalSequence, CustomException, RPData, as_categorical, encode_categories
+from .lib.partition import Partition, get_covering_lattice_graph
+from .lib.passes import AttributePass
+from .lib.sounding import PARTS_TABLE_SUFFIX
+
+
+## Label of the event without previous partition (the first one)
+NO_OPERATION = ''
+
+## Label of the events with an equal previous partition (such as in concatenations without merging)
+IDENTITY = 'identity'
+
+
+def get_sign(value) -> str:
+    '''Return the operation sign of a given value.'''
+
+    if value > 0:
+        return '+'
+    if value < 0:
+        return '-'
+    return ''
+
+
+def get_partitional_operation(previous, following) -> str:
+    '''Return the partitional operation between two given partitions (`Partition` objects, strings or sequences of parts).
+
+    The transition is decomposed into revariance (the variation of the number of parts) and resizing (the density-number variation not explained by the revariance). Resizing or revariance alone are resize and revariance operations. Both together with the same signal are a concurrence and with opposite signals (or none, if the parts exchange components) are a transfer, signed by the dispersion variation.
+
+    If a saved lattice graph (see `lattice` module) covers both partitions, the operation between neighbor partitions is read from the graph. The other transitions are decomposed as above, which gives the same operations to neighbor partitions.'''
+
+    previous = Partition(previous)
+    following = Partition(following)
+    if previous == following:
+        return IDENTITY
+
+    graph = get_covering_lattice_graph(max(previous.density_number, following.density_number))
+    if graph:
+        operation = graph.get_operation(previous, following)
+        if operation:
+            return operation
+
+    revariance = len(following.parts) - len(previous.parts)
+    resize = following.density_number - previous.density_number - revariance
+
+    if revariance == 0 and resize != 0:
+        return 'resize' + get_sign(resize)
+    if resize == 0 and revariance != 0:
+        return 'revariance' + get_sign(revariance)
+    if resize * revariance > 0:
+        return 'concurrence' + get_sign(revariance)
+
+    previous_dispersion = previous.dispersion or 0
+    following_dispersion = following.dispersion or 0
+    sign = get_sign(following_dispersion - previous_dispersion) or get_sign(revariance)
+    return 'transfer' + sign
+
+
+def make_operations(partitions) -> CategoricalSequence:
+    '''Return the partitional operations of the transitions between the given consecutive partitions.
+
+    Each operation is calculated once for each distinct pair of consecutive partitions. The first event has no operation.'''
+
+    partitions = as_categorical(partitions)
+    if len(partitions) == 0:
+        return CategoricalSequence([])
+
+    codes = partitions.codes.astype(numpy.int64)
+    number_of_categories = len(partitions.categories)
+    pairs, inverse = numpy.unique(codes[:-1] * number_of_categories + codes[1:], return_inverse=True)
+
+    operations = [NO_OPERATION]
+    operations.extend(
+        get_partitional_operation(partitions.categories[pair // number_of_categories], partitions.categories[pair % number_of_categories])
+        for pair in pairs.tolist()
+    )
+    categories, operations_codes = encode_categories(operations)
+    rows = numpy.concatenate([[0], numpy.ravel(inverse) + 1])
+    return CategoricalSequence(categories=categories, codes=numpy.asarray(operations_codes)[rows])
+
+
+class ExtendedRPData(RPData):
+    '''Extend RPData class to add partitional operations data.'''
+
+    def set_operations(self) -> None:
+        '''Set partitional operations into RPData.'''
+
+        self.operations = make_operations(self.partitions)
+
+    def get_operations_description(self) -> str:
+        '''Return the number of events of each partitional operation, one in each line.'''
+
+        counter = self.get_frequency_counter('operations', proportional=False)
+        return '\n'.join('{}: {}'.format(k, v) for k, v in counter.items() if k != NO_OPERATION)
+
+
+class OperationsPass(AttributePass):
+    '''Partitional operations pass. See `passes` module.
+
+    The operations depend on consecutive partitions, so they are made from the whole partitions sequence.'''
+
+    def setup(self) -> None:
+        self.attribute = 'operations'
+
+    def make_attribute(self, rpdata: RPData, partitions: CategoricalSequence, values: list) -> CategoricalSequence:
+        return make_operations(partitions)
+
+
+def main(filename: str) -> None:
+    '''Classify the partitional operations of the given JSON file and save them into its sidecar file.'''
+
+    rpdata = ExtendedRPData(filename)
+    print('Classifying partitional operations of {} events...'.format(rpdata.size))
+    rpdata.set_operations()
+    rpdata.save_attributes(['operations'])
+    print(rpdata.get_operations_description())
+
+
+def get_json_files(folder: str) -> list:
+    '''Return the calculator's JSON files of a given folder. Parts tables are discarded.'''
+
+    if not os.path.isdir(folder):
+        raise CustomException('The given filename is not of directory type.')
+
+    parts_table_suffix = '-{}.json'.format(PARTS_TABLE_SUFFIX)
+    return [
+        f for f in map(lambda x: os.path.join(folder, x), sorted(os.listdir(folder)))
+        if os.path.isfile(f) and f.endswith('.json') and not f.endswith(parts_table_suffix)
+    ]
+
+
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
+
+    if args.dir:
+        files = get_json_files(args.filename)
+        total_cpus = multiprocessing.cpu_count()
+
+        if args.multiprocessing and total_cpus > 3:
+            with multiprocessing.Pool(total_cpus - 2) as p:
+                p.map(main, files)
+        else:
+            for f in files:
+                main(f)
+    else:
+        main(args.filename)
@@ -0,0 +1,178 @@
+'''This module runs the standard processing steps (calculator, derived attributes, charts and statistics) of a given digital score in a single process.
+
+The `RPData` object is kept in memory across the steps, the derived attributes are calculated in a single traversal of the distinct partitions (see `passes` module) and the data is written once, at the end: the full JSON file if the calc step runs, otherwise the derived attributes are appended to the sidecar file. The time of each stage is printed.
+'''
+
+import time
+
+from matplotlib import pyplot as plt
+
+from . import calculator
+from .config import DEFAULT_STEPS, STEPS
+from .lib.base import INDEX_COLUMNS, CustomException, RPData, convert_texture_column_from_json
+from .lib.passes import PassManager
+from .lib.smoothing import DEFAULT_BINS
+from .operations import OperationsPass
+from .plotter import CombinedIndexogramPlotter, SimpleIndexogramPlotter, SimplePartDensityNumberInTimePlotter, SimplePartDensityNumberScatterPlotter, SimplePartitiogramPlotter, StairsIndexogramPlotter, StemIndexogramPlotter, StepIndexogramPlotter
+from .stats import AgglomerationDispersionStatistics, PartsDensityNumberStatistics
+from .tclass import TexturalClassPass, TexturalClassPlot
+from .tcontour import ContourPass, ContourPlot
+
+
+## Derived attribute of each step
+STEPS_ATTRIBUTES = {
+    'tclass': 'tclass',
+    'tcontour': 'tcontour',
+    'ops': 'operations',
+}
+
+
+def parse_steps(steps: str) -> list:
+    '''Return the given comma separated steps sorted in running order.'''
+
+    steps = [step.strip() for step in steps.split(',') if step.strip()]
+    for step in steps:
+        if step not in STEPS:
+            raise CustomException('Invalid step: {}. Choose among {}.'.format(step, ', '.join(STEPS)))
+    return [step for step in STEPS if step in steps]
+
+
+class Pipeline(object):
+    '''Pipeline class. It runs the given steps on a digital score (or on a JSON file, if the calc step is omitted) and stores the stages' timings.'''
+
+    def __init__(self, filename: str, steps: list, compact=False, compress=False, smoothing=None, smoothing_degree=0.05, smoothing_bins=DEFAULT_BINS) -> None:
+        if (compact or compress) and 'calc' not in steps:
+            raise CustomException('The compact schema and gzip compression demand the calc step.')
+        if smoothing and ('tcontour' not in steps or 'plot' not in steps):
+            raise CustomException('The contour smoothing demands the tcontour and plot steps.')
+
+        self.filename = filename
+        self.steps = steps
+        self.compact = compact
+        self.compress = compress
+        self.smoothing = smoothing
+        self.smoothing_degree = smoothing_degree
+        self.smoothing_bins = smoothing_bins
+        self.rpdata = None
+        self.contour_pass = None
+        self.attributes = []
+        self.timings = []
+
+    def __repr__(self) -> str:
+        return '<PL {}: {}>'.format(self.filename, ', '.join(self.steps))
+
+    def run_stage(self, name: str, function) -> None:
+        '''Run a given stage function and store its timing.'''
+
+        start = time.perf_counter()
+        function()
+        self.timings.append((name, time.perf_counter() - start))
+
+    def calculate(self) -> None:
+        '''Calculate the rhythmic partitions of the digital score.
+
+        The null indexes are converted to `nan`, as in the JSON file loading.'''
+
+        score = calculator.split_score(self.filename)
+        segment = calculator.ParsemaeSegment()
+        segment.make_from_music21_score(score)
+        self.rpdata = segment.make_rpdata(self.filename)
+        for column in INDEX_COLUMNS:
+            self.rpdata.data[column] = convert_texture_column_from_json(column, self.rpdata.data[column])
+
+    def load(self) -> None:
+        '''Load the JSON file.'''
+
+        self.rpdata = RPData(self.filename)
+
+    def make_attributes(self) -> None:
+        '''Calculate the derived attributes of the attribute steps in a single traversal.'''
+
+        manager = PassManager()
+        for step in self.steps:
+            if step == 'tclass':
+                manager.register(TexturalClassPass())
+            elif step == 'tcontour':
+                self.contour_pass = ContourPass()
+                manager.register(self.contour_pass)
+            elif step == 'ops':
+                manager.register(OperationsPass())
+        self.attributes = manager.run(self.rpdata, save=False)
+
+    def make_charts(self) -> None:
+        '''Save all the charts (such as `plot -a`) and the charts of the calculated derived attributes. The contour chart has the given smoothing, if any (see `smoothing` module).
+
+        Each chart is plotted and saved before the next one is made, because the plotters save the current figure.'''
+
+        plotters = [SimplePartitiogramPlotter, SimpleIndexogramPlotter, StemIndexogramPlotter, StairsIndexogramPlotter, StepIndexogramPlotter, CombinedIndexogramPlotter, SimplePartDensityNumberInTimePlotter, SimplePartDensityNumberScatterPlotter]
+        if 'tclass' in self.steps:
+            plotters.append(TexturalClassPlot)
+        if 'tcontour' in self.steps:
+            plotters.append(lambda rpdata, image_format: ContourPlot(self.contour_pass.contour, rpdata, image_format, run_lowess=bool(self.smoothing), lowess_degree=self.smoothing_degree, smoothing_method=self.smoothing or 'lowess', smoothing_bins=self.smoothing_bins))
+
+        for cls in plotters:
+            plotter = cls(self.rpdata, 'svg')
+            plotter.plot()
+            plotter.save()
+
+    def make_statistics(self) -> None:
+        '''Print the statistical summaries and save their histograms.'''
+
+        for cls in [AgglomerationDispersionStatistics, PartsDensityNumberStatistics]:
+            statistics = cls(self.rpdata, 'svg')
+            statistics.get_histograms(False, False)
+            plt.close('all')
+
+    def save(self) -> None:
+        '''Save the JSON file with all the calculated attributes, if the calc step runs. Otherwise, append the calculated attributes to the sidecar file of the loaded JSON file.'''
+
+        if 'calc' not in self.steps:
+            self.rpdata.save_attributes(self.attributes)
+            return
+
+        if self.compact:
+            self.rpdata.schema_version = 2
+        self.rpdata.compress = self.compress
+        self.rpdata.save_to_file()
+
+    def run(self) -> None:
+        '''Run the steps.'''
+
+        if 'calc' in self.steps:
+            self.run_stage('calc', self.calculate)
+        else:
+            self.run_stage('load', self.load)
+
+        attributes_steps = [step for step in self.steps if step in STEPS_ATTRIBUTES]
+        if attributes_steps:
+            self.run_stage(', '.join(attributes_steps), self.make_attributes)
+        if 'plot' in self.steps:
+            self.run_stage('plot', self.make_charts)
+        if 'stats' in self.steps:
+            self.run_stage('stats', self.make_statistics)
+        if 'calc' in self.steps or attributes_steps:
+            self.run_stage('save', self.save)
+
+    def get_timings_description(self) -> str:
+        '''Return the time of each stage, one in each line, and the total time.'''
+
+        rows = ['{}: {:.2f}s'.format(name, seconds) for name, seconds in self.timings]
+        rows.append('Total: {:.2f}s'.format(sum(seconds for _, seconds in self.timings)))
+        return '\n'.join(rows)
+
+
+def main(filename: str, steps=DEFAULT_STEPS, compact=False, compress=False, smoothing=None, smoothing_degree=0.05, smoothing_bins=DEFAULT_BINS) -> Pipeline:
+    '''Run the given comma separated steps on a given file and print the stages' timings.'''
+
+    pipeline = Pipeline(filename, parse_steps(steps), compact, compress, smoothing, smoothing_degree, smoothing_bins)
+    print('Running {} on {} file...'.format(', '.join(pipeline.steps), filename))
+    pipeline.run()
+    print('Stage timings:')
+    print(pipeline.get_timings_description())
+    return pipeline
+
+
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
+
+    main(args.filename, args.steps, args.compact, args.gzip, args.smoothing, args.smoothing_degree, args.smoothing_bins)
@@ -6,7 +6,8 @@ from matplotlib import pyplot as plt
 import numpy
 
 
-from .lib.base import CustomException, EventLocation, GeneralSubparser, RPData, aux_sum_if_none, clean_filename, file_rename, find_nearest_smaller, parse_fraction, parse_pow
+from .lib.base import CustomException, EventLocation, RPData, aux_sum_if_none, clean_filename, file_rename, parse_fraction, parse_pow
+from .lib.smoothing import DEFAULT_BINS, smooth
 
 
 # Constants
@@ -98,19 +99,15 @@ class AbstractTimePlotter(AbstractPlotter):
         self.show_labels = show_labels
         self.labels_vertical_lines = []
         if self.show_labels and self.rpdata.labels:
-            previous_label = self.rpdata.labels[0]
-            self.labels_vertical_lines = [{
-                'label': previous_label,
-                'offset': self.rpdata.data['Global offset'][0]
-            }]
-            for i in range(1, len(self.rpdata.labels)):
-                current_label = self.rpdata.labels[i]
-                if current_label != previous_label:
+            label_spans = self.rpdata.labels
+            previous_label = None
+            for position, label in enumerate(label_spans.labels):
+                if label != previous_label:
                     self.labels_vertical_lines.append({
-                        'label': current_label,
-                        'offset': self.rpdata.data['Global offset'][i]
+                        'label': label,
+                        'offset': self.rpdata.data['Global offset'][label_spans.rows_starts[position]]
                     })
-                previous_label = current_label
+                previous_label = label
 
     def xticks_adjust(self):
         '''Extend AbstractPlotter's xticks_adjust method.
@@ -125,23 +122,28 @@ class AbstractTimePlotter(AbstractPlotter):
     def make_xticks(self) -> None:
         # get original xticks values
         original_xticks_values = self.axis.get_xticks()
-        inverted_map = {v: k for k, v in self.rpdata.offset_map.items()}
-        offset_points = list(inverted_map.keys())
+        offset_index = self.rpdata.get_offset_index()
 
         new_ticks = list(original_xticks_values)[1:-1]
 
         new_labels = []
         for value in new_ticks:
-            go  = find_nearest_smaller(int(value), offset_points)
-            measure_number = inverted_map[go]
+            measure_number, local_offset = offset_index.get_location(Fraction(value))
             # TODO: improve local offset (as fraction)
-            local_offset = Fraction(value - go)
-
             event_location = EventLocation(measure_number=measure_number, offset=local_offset)
             new_labels.append(event_location.get_str_index())
 
         self.axis.set_xticks(ticks=new_ticks, labels=new_labels)
 
+    def plot_smoothing(self, y_values, method='lowess', frac=0.05, bins=DEFAULT_BINS) -> str:
+        '''Plot the smoothing of the given Y values (one for each event) and return its legend label. See `smoothing.smooth` function.'''
+
+        starts = numpy.array(self.x_values[:-1])
+        ends = starts + numpy.array(list(map(float, self.duration)))
+        x_smoothed, y_smoothed = smooth(starts, ends, y_values, method, frac, bins)
+        self.axis.plot(x_smoothed, y_smoothed)
+        return '{} {}'.format(method.capitalize(), frac)
+
     def plot(self):
         '''Extend AbstractPlotter's method. Set X-axis label and add optional vertical lines for labels if they are available in RPData.'''
 
@@ -441,10 +443,9 @@ class ComparativePartitiogramPlotter(AbstractPartitiogramPlotter):
             self.column_2: set([]),
         }
 
-        for i in range(self.rpdata.size):
-            label = self.labels[i]
-            if label in dic.keys():
-                dic[label].add(self.rpdata.partitions[i])
+        for label in dic.keys():
+            for rows in self.labels.get_label_rows_slices(label):
+                dic[label].update(self.rpdata.partitions[rows])
 
         g1 = dic[self.column_1] - dic[self.column_2]
         g1_label = 'Only in {}'.format(self.column_1)
@@ -637,7 +638,7 @@ class ComparativePartitiogramMaker(AbstractPartitiogramPlotter):
         if not rpdata.labels:
             raise CustomException('There is no label in the given input file.')
 
-        self.section_labels = sorted(list(set(self.rpdata.labels)))
+        self.section_labels = sorted(self.rpdata.labels.get_distinct_labels())
 
         for a, b in itertools.combinations(self.section_labels, 2):
             cpp = ComparativePartitiogramPlotter(self.rpdata, a, b, self.image_format, self.with_labels)
@@ -817,140 +818,109 @@ class SimplePartDensityNumberInTimePlotter(AbstractTimePlotter):
         return super().plot()
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
-
-    def setup(self) -> None:
-        self.program_name = 'plot'
-        self.program_help = 'Charts plotter'
-
-    def add_arguments(self) -> None:
-        self.parser.add_argument('-f', '--img_format', help="Charts output format (svg, png, or jpg)", default='svg', type=str)
-        self.parser.add_argument("-r", "--resolution", help = "PNG image resolution. Default=300", default=300, type=int)
-        self.parser.add_argument("-a", "--all", help = "Plot all available charts", action='store_true')
-        self.parser.add_argument("-u", "--bubble_partitiogram", help = "Partitiogram as a bubble chart", default=False, action='store_true')
-        self.parser.add_argument("-w", "--without_labels", help = "Partitiogram as a bubble chart without labels", default=False, action='store_true')
-        self.parser.add_argument("-q", "--parts_density_numbers_time", help = "Parts and density number in time", default=False, action='store_true')
-        self.parser.add_argument("-v", "--parts_density_numbers_scatter", help = "Parts and density number scatter", default=False, action='store_true')
-        self.parser.add_argument("-m", "--comparative_partitiogram", help = "Comparative partitiogram. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
-        self.parser.add_argument("-fl", "--show_form_labels", help = "Draw vertical lines to display given form labels. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
-        self.parser.add_argument("-c", "--close_bubbles", help = "Indexogram with bubbles' closing lines", default=False, action='store_true')
-        self.parser.add_argument("-e", "--stem", help = "Indexogram as a stem chart", action='store_true')
-        self.parser.add_argument("-t", "--stairs", help = "Indexogram as a stair chart", action='store_true')
-        self.parser.add_argument("-p", "--step", help = "Indexogram as a step chart", action='store_true')
-        self.parser.add_argument("-b", "--combined", help = "Indexogram as a combination of aglomeration and dispersion", action='store_true')
-        self.parser.add_argument("--minimum_dispersion", help = "Partitiogram minimum dispersion value to render", default=None, type=float)
-        self.parser.add_argument("--maximum_dispersion", help = "Partitiogram maximum dispersion value to render", default=None, type=float)
-        self.parser.add_argument("--minimum_agglomeration", help = "Partitiogram minimum agglomeration value to render", default=None, type=float)
-        self.parser.add_argument("--maximum_agglomeration", help = "Partitiogram maximum agglomeration value to render", default=None, type=float)
-        self.parser.add_argument("--maximum_points_to_label", help = "Maximum number of points to label in bubble partitiogram chart. Default=50", default=50, type=int)
-        self.parser.add_argument("--dots_size", help = "Dots size in simple partitiogram chart. Default=15", default=15, type=float)
-        self.parser.add_argument("--labels_size", help = "Labels size in partitiogram chart. Default=15", default=15, type=float)
-        self.parser.add_argument("--labels_distance", help = "Distance between points and labels in partitiogram chart. Default=1.025", default=1.025, type=float)
-        self.parser.add_argument("--indexogram_slope", help = "Slope's X-distance. Default=1/4 (use always rational numbers)", default='1/4', type=str)
-        self.parser.add_argument("--figure_dimensions", help = "Figure dimensions. Default=6.4,4.8 (comma separated values)", default='6.4,4.8', type=str)
-
-    def handle(self, args):
-        if args.resolution < 0 or args.resolution > 1200:
-            raise CustomException('Resolution must be an integer from 0 to 1200')
-
-        global MAXIMUM_POINTS_TO_LABEL
-        global DOTS_SIZE
-        global LABELS_SIZE
-        global LABELS_DISTANCE
-        global IMG_SIZE
-        global INDEXOGRAM_SLOPE_LIMIT
-
-        MAXIMUM_POINTS_TO_LABEL = args.maximum_points_to_label
-        DOTS_SIZE = args.dots_size
-        LABELS_SIZE = args.labels_size
-        LABELS_DISTANCE = args.labels_distance
-        IMG_SIZE = list(map(float, args.figure_dimensions.split(',')))
-        INDEXOGRAM_SLOPE_LIMIT = parse_fraction(args.indexogram_slope)
-
-        plt.rcParams['figure.figsize'] = IMG_SIZE
-
-        close_bubbles = args.close_bubbles
-        if close_bubbles:
-            close_bubbles = True
-
-        with_labels = not args.without_labels
-        if with_labels:
-            with_labels = True
-
-        show_form_labels = args.show_form_labels
-        if show_form_labels:
-            show_form_labels = True
-
-        partitiogram_filters = {
-            'min_dispersion': args.minimum_dispersion,
-            'max_dispersion': args.maximum_dispersion,
-            'min_agglomeration': args.minimum_agglomeration,
-            'max_agglomeration': args.maximum_agglomeration,
-        }
-
-        image_format = args.img_format.lower()
-        if image_format not in ['svg', 'jpg', 'png']:
-            raise CustomException('Image format must be svg, jpg or png.')
-
-        indexogram_classes = [
-            SimpleIndexogramPlotter,
-            StemIndexogramPlotter,
-            StairsIndexogramPlotter,
-            StepIndexogramPlotter,
-            CombinedIndexogramPlotter
-        ]
-
-        try:
-            rp_data = RPData(args.filename)
-
-            ## Partitiograms
-            if args.comparative_partitiogram:
-                part_obj = ComparativePartitiogramMaker(rp_data, image_format, with_labels, **partitiogram_filters)
-            elif args.bubble_partitiogram:
-                part_obj = BubblePartitiogramPlotter(rp_data, image_format, with_labels, **partitiogram_filters)
-            else:
-                part_obj = SimplePartitiogramPlotter(rp_data, image_format, with_labels, **partitiogram_filters)
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
+
+    if args.resolution < 0 or args.resolution > 1200:
+        raise CustomException('Resolution must be an integer from 0 to 1200')
+
+    global MAXIMUM_POINTS_TO_LABEL
+    global DOTS_SIZE
+    global LABELS_SIZE
+    global LABELS_DISTANCE
+    global IMG_SIZE
+    global INDEXOGRAM_SLOPE_LIMIT
+
+    MAXIMUM_POINTS_TO_LABEL = args.maximum_points_to_label
+    DOTS_SIZE = args.dots_size
+    LABELS_SIZE = args.labels_size
+    LABELS_DISTANCE = args.labels_distance
+    IMG_SIZE = list(map(float, args.figure_dimensions.split(',')))
+    INDEXOGRAM_SLOPE_LIMIT = parse_fraction(args.indexogram_slope)
+
+    plt.rcParams['figure.figsize'] = IMG_SIZE
+
+    close_bubbles = args.close_bubbles
+    if close_bubbles:
+        close_bubbles = True
+
+    with_labels = not args.without_labels
+    if with_labels:
+        with_labels = True
+
+    show_form_labels = args.show_form_labels
+    if show_form_labels:
+        show_form_labels = True
+
+    partitiogram_filters = {
+        'min_dispersion': args.minimum_dispersion,
+        'max_dispersion': args.maximum_dispersion,
+        'min_agglomeration': args.minimum_agglomeration,
+        'max_agglomeration': args.maximum_agglomeration,
+    }
+
+    image_format = args.img_format.lower()
+    if image_format not in ['svg', 'jpg', 'png']:
+        raise CustomException('Image format must be svg, jpg or png.')
+
+    indexogram_classes = [
+        SimpleIndexogramPlotter,
+        StemIndexogramPlotter,
+        StairsIndexogramPlotter,
+        StepIndexogramPlotter,
+        CombinedIndexogramPlotter
+    ]
+
+    try:
+        rp_data = RPData(args.filename)
+
+        ## Partitiograms
+        if args.comparative_partitiogram:
+            part_obj = ComparativePartitiogramMaker(rp_data, image_format, with_labels, **partitiogram_filters)
+        elif args.bubble_partitiogram:
+            part_obj = BubblePartitiogramPlotter(rp_data, image_format, with_labels, **partitiogram_filters)
+        else:
+            part_obj = SimplePartitiogramPlotter(rp_data, image_format, with_labels, **partitiogram_filters)
+
+        part_obj.plot()
+        part_obj.save()
+
+        ## Indexograms
+        ind_objs = []
+        if args.all:
+            for cls in indexogram_classes:
+                ind_objs.append(cls(rp_data, image_format, close_bubbles, show_form_labels))
+
+            ind_objs.append(SimplePartDensityNumberInTimePlotter(rp_data, image_format, show_form_labels))
+            ind_objs.append(SimplePartDensityNumberScatterPlotter(rp_data, image_format, show_form_labels))
+
+        elif args.stem:
+            ind_objs.append(StemIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
+        elif args.stairs:
+            ind_objs.append(StairsIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
+        elif args.step:
+            ind_objs.append(StepIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
+        elif args.combined:
+            ind_objs.append(CombinedIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
+        else:
+            close_bubbles = False
+            if args.close_bubbles:
+                close_bubbles = True
+            ind_objs.append(SimpleIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
+        for ind_obj in ind_objs:
+            ind_obj.plot()
+            ind_obj.save()
+
+        ## Parts x density number
+        if args.parts_density_numbers_time:
+            part_obj = SimplePartDensityNumberInTimePlotter(rp_data, image_format, show_form_labels)
+            part_obj.plot()
+            part_obj.save()
 
+        if args.parts_density_numbers_scatter:
+            part_obj = SimplePartDensityNumberScatterPlotter(rp_data, image_format, show_form_labels)
             part_obj.plot()
             part_obj.save()
 
-            ## Indexograms
-            ind_objs = []
-            if args.all:
-                for cls in indexogram_classes:
-                    ind_objs.append(cls(rp_data, image_format, close_bubbles, show_form_labels))
-
-                ind_objs.append(SimplePartDensityNumberInTimePlotter(rp_data, image_format, show_form_labels))
-                ind_objs.append(SimplePartDensityNumberScatterPlotter(rp_data, image_format, show_form_labels))
-
-            elif args.stem:
-                ind_objs.append(StemIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
-            elif args.stairs:
-                ind_objs.append(StairsIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
-            elif args.step:
-                ind_objs.append(StepIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
-            elif args.combined:
-                ind_objs.append(CombinedIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
-            else:
-                close_bubbles = False
-                if args.close_bubbles:
-                    close_bubbles = True
-                ind_objs.append(SimpleIndexogramPlotter(rp_data, image_format, close_bubbles, show_form_labels))
-            for ind_obj in ind_objs:
-                ind_obj.plot()
-                ind_obj.save()
-
-            ## Parts x density number
-            if args.parts_density_numbers_time:
-                part_obj = SimplePartDensityNumberInTimePlotter(rp_data, image_format, show_form_labels)
-                part_obj.plot()
-                part_obj.save()
-
-            if args.parts_density_numbers_scatter:
-                part_obj = SimplePartDensityNumberScatterPlotter(rp_data, image_format, show_form_labels)
-                part_obj.plot()
-                part_obj.save()
-
-        except:
-            raise CustomException('Something wrong with given JSON file.')
+    except:
+        raise CustomException('Something wrong with given JSON file.')
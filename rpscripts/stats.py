@@ -2,8 +2,9 @@
 
 from copy import deepcopy
 from matplotlib import pyplot as plt
+import numpy
 import pandas
-from .lib.base import GeneralSubparser, RPData, file_rename
+from .lib.base import RPData, file_rename
 
 
 class Statistics(object):
@@ -15,7 +16,7 @@ class Statistics(object):
         self.name = name
         self.outname = file_rename(self.rpdata.path, self.image_format, self.name)
         self.subplots = None
-        self.dataframe = pandas.DataFrame(rpdata.data)
+        self.dataframe = rpdata.to_dataframe()
         self.data = None
         self.columns = None
         self.is_index = False
@@ -42,12 +43,14 @@ class Statistics(object):
             plt.savefig(self.outname)
 
         if split_labels and self.rpdata.labels:
-            self.data['Label'] = self.rpdata.labels
+            self.data['Label'] = list(self.rpdata.labels)
             new_cols = self.columns[:]
             new_cols.append('Label')
 
-            _df = self.data[new_cols].groupby('Label')
-            for label, _df in _df:
+            label_spans = self.rpdata.labels
+            for label in sorted(label_spans.get_distinct_labels()):
+                rows = numpy.concatenate([numpy.arange(r.start, r.stop) for r in label_spans.get_label_rows_slices(label)])
+                _df = self.data[new_cols].iloc[rows]
                 print('\nLabel: {}'.format(label))
                 print(_df.describe().round(2))
 
@@ -95,23 +98,13 @@ class PartsDensityNumberStatistics(Statistics):
         super().get_histograms(no_plot, split_labels)
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-    def setup(self) -> None:
-        self.program_name = 'stats'
-        self.program_help = 'Statistical tools'
+    rpdata = RPData(args.filename)
 
-    def add_arguments(self) -> None:
-        pass
-        self.parser.add_argument("-np", "--no_plot", help = "No plot charts", action='store_true')
-        self.parser.add_argument("-l", "--labels", help = "Split labels", action='store_true')
+    ad_statistics = AgglomerationDispersionStatistics(rpdata, 'svg')
+    ad_statistics.get_histograms(args.no_plot, args.labels)
 
-    def handle(self, args):
-        rpdata = RPData(args.filename)
-
-        ad_statistics = AgglomerationDispersionStatistics(rpdata, 'svg')
-        ad_statistics.get_histograms(args.no_plot, args.labels)
-
-        pc_statistics = PartsDensityNumberStatistics(rpdata, 'svg')
-        pc_statistics.get_histograms(args.no_plot, args.labels)
\ No newline at end of file
+    pc_statistics = PartsDensityNumberStatistics(rpdata, 'svg')
+    pc_statistics.get_histograms(args.no_plot, args.labels)
@@ -0,0 +1,305 @@
+'''This module provides the subcommands' command line arguments.
+
+It imports no subcommand module, so the command line parser is built without music21, matplotlib and pandas. Each subparser's handler imports its subcommand module (see `GeneralSubparser.handle`) and calls its `handle` function.'''
+
+from .config import DEFAULT_STEPS, STEPS
+from .lib.base import RPDATA_ATTRIBUTES, GeneralSubparser
+from .lib.smoothing import DEFAULT_BINS, SMOOTHING_METHODS
+from .lib.sounding import GROUPINGS
+from .utils import MAX_CARDINALITY, MAX_GRAPH_CARDINALITY
+
+
+class CalculatorSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'calc'
+        self.module_name = 'calculator'
+        self.program_help = 'Calculator'
+        self.add_parent = False
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('filename', help='digital score filename (XML, MXL, and KRN)', type=str)
+        self.parser.add_argument('-d', '--dir', help='folder with digital score files', default=False, action='store_true')
+        self.parser.add_argument('-m', '--multiprocessing', help='multiprocessing', default=False, action='store_true')
+        self.parser.add_argument('-c', '--csv', help='output data in a CSV file.', default=False, action='store_true')
+        self.parser.add_argument('-e', '--equally_sized', help='generate equally-sized events', default=False, action='store_true')
+        self.parser.add_argument('-z', '--compact', help='save JSON data in the compact schema (derived columns are omitted)', default=False, action='store_true')
+        self.parser.add_argument('-g', '--gzip', help='gzip-compress the JSON file', default=False, action='store_true')
+        self.parser.add_argument('-t', '--parts_table', help='save the parts events table for parts subsets (see subset command)', default=False, action='store_true')
+
+
+class PlotterSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'plot'
+        self.module_name = 'plotter'
+        self.program_help = 'Charts plotter'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('-f', '--img_format', help="Charts output format (svg, png, or jpg)", default='svg', type=str)
+        self.parser.add_argument("-r", "--resolution", help = "PNG image resolution. Default=300", default=300, type=int)
+        self.parser.add_argument("-a", "--all", help = "Plot all available charts", action='store_true')
+        self.parser.add_argument("-u", "--bubble_partitiogram", help = "Partitiogram as a bubble chart", default=False, action='store_true')
+        self.parser.add_argument("-w", "--without_labels", help = "Partitiogram as a bubble chart without labels", default=False, action='store_true')
+        self.parser.add_argument("-q", "--parts_density_numbers_time", help = "Parts and density number in time", default=False, action='store_true')
+        self.parser.add_argument("-v", "--parts_density_numbers_scatter", help = "Parts and density number scatter", default=False, action='store_true')
+        self.parser.add_argument("-m", "--comparative_partitiogram", help = "Comparative partitiogram. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
+        self.parser.add_argument("-fl", "--show_form_labels", help = "Draw vertical lines to display given form labels. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
+        self.parser.add_argument("-c", "--close_bubbles", help = "Indexogram with bubbles' closing lines", default=False, action='store_true')
+        self.parser.add_argument("-e", "--stem", help = "Indexogram as a stem chart", action='store_true')
+        self.parser.add_argument("-t", "--stairs", help = "Indexogram as a stair chart", action='store_true')
+        self.parser.add_argument("-p", "--step", help = "Indexogram as a step chart", action='store_true')
+        self.parser.add_argument("-b", "--combined", help = "Indexogram as a combination of aglomeration and dispersion", action='store_true')
+        self.parser.add_argument("--minimum_dispersion", help = "Partitiogram minimum dispersion value to render", default=None, type=float)
+        self.parser.add_argument("--maximum_dispersion", help = "Partitiogram maximum dispersion value to render", default=None, type=float)
+        self.parser.add_argument("--minimum_agglomeration", help = "Partitiogram minimum agglomeration value to render", default=None, type=float)
+        self.parser.add_argument("--maximum_agglomeration", help = "Partitiogram maximum agglomeration value to render", default=None, type=float)
+        self.parser.add_argument("--maximum_points_to_label", help = "Maximum number of points to label in bubble partitiogram chart. Default=50", default=50, type=int)
+        self.parser.add_argument("--dots_size", help = "Dots size in simple partitiogram chart. Default=15", default=15, type=float)
+        self.parser.add_argument("--labels_size", help = "Labels size in partitiogram chart. Default=15", default=15, type=float)
+        self.parser.add_argument("--labels_distance", help = "Distance between points and labels in partitiogram chart. Default=1.025", default=1.025, type=float)
+        self.parser.add_argument("--indexogram_slope", help = "Slope's X-distance. Default=1/4 (use always rational numbers)", default='1/4', type=str)
+        self.parser.add_argument("--figure_dimensions", help = "Figure dimensions. Default=6.4,4.8 (comma separated values)", default='6.4,4.8', type=str)
+
+
+class AnnotatorSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'annotate'
+        self.module_name = 'annotator'
+        self.program_help = 'Digital score annotator'
+
+    def add_arguments(self) -> None:
+        attributes = ', '.join(RPDATA_ATTRIBUTES)
+
+        self.parser.add_argument('-s', '--score_filename', help="digital score filename (XML, MXL, and KRN)", type=str, required=True)
+        self.parser.add_argument('-t', '--type', help="type of annotation ({})".format(attributes), type=str, default='partitions')
+
+
+class LabelerSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'label'
+        self.module_name = 'labeler'
+        self.program_help = 'JSON file labeler. Annotate JSON file with given labels'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('-t', '--txt_filename', help="TXT filename (labels map)", type=str)
+
+
+class InfoSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'info'
+        self.module_name = 'info'
+        self.program_help = 'JSON data info.'
+
+
+class UtilsSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'utils'
+        self.module_name = 'utils'
+        self.program_help = 'Auxiliary tools'
+        self.add_parent = False
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument("-sm", "--save_map", help = "Create a lattice map with a given cardinality. Limited to {}".format(MAX_CARDINALITY), type=int)
+        self.parser.add_argument("-sg", "--save_graph", help = "Create a lattice graph of partitional operations with a given cardinality. Limited to {}".format(MAX_GRAPH_CARDINALITY), type=int)
+        self.parser.add_argument("-s", "--setup", help = "Copy the built-in lattice map to the user's folder", action='store_true')
+
+
+class StatsSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'stats'
+        self.module_name = 'stats'
+        self.program_help = 'Statistical tools'
+
+    def add_arguments(self) -> None:
+        pass
+        self.parser.add_argument("-np", "--no_plot", help = "No plot charts", action='store_true')
+        self.parser.add_argument("-l", "--labels", help = "Split labels", action='store_true')
+
+
+class ConverterSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'convert'
+        self.module_name = 'converter'
+        self.program_help = 'JSON file converter. Convert JSON to CSV file'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('-e', '--equally_sized', help='generate equally-sized events', default=False, action='store_true')
+        self.parser.add_argument('-j', '--json_schema', help='rewrite the JSON file in the given schema (1: full, 2: compact) instead of CSV conversion', choices=[1, 2], type=int)
+        self.parser.add_argument('-g', '--gzip', help='gzip-compress the rewritten JSON file', default=False, action='store_true')
+
+
+class TrimmerSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'trim'
+        self.module_name = 'trimmer'
+        self.program_help = 'JSON file trimmer. Trim given measures'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('-s', '--start', help='Start measure. Blank means "from the beginning"', type=int)
+        self.parser.add_argument('-e', '--end', help='End measure. Blank means "to the end"', type=int)
+        self.parser.add_argument('-r', '--range', help='Measures range such as "1:8" or "17:". Blank start or end means "from the beginning" or "to the end". Repeat the option for multiple ranges', dest='ranges', metavar='RANGE', action='append', default=[])
+        self.parser.add_argument('-l', '--by_labels', help='One excerpt for each label span. It demands a previous labeled file', default=False, action='store_true')
+        self.parser.add_argument('-m', '--multiprocessing', help='multiprocessing', default=False, action='store_true')
+
+
+class FinderSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'find'
+        self.module_name = 'finder'
+        self.program_help = 'Events finder. Find events in the given JSON file'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('-p', '--partition', help="Partition (between quotation marks)", type=str)
+        self.parser.add_argument('-d', '--density_number', help="Density-number", type=int)
+        self.parser.add_argument('-n', '--number_of_parts', help="Number of parts", type=int)
+        self.parser.add_argument('-tcl', '--tclass', help="Textural class", type=str)
+        self.parser.add_argument('-tcn', '--tcontour', help="Textural contour", type=str)
+
+        self.parser.add_argument('-md', '--max_density_number', help="Maximum density-number", action='store_true', default=False)
+        self.parser.add_argument('-mn', '--max_number_of_parts', help="Maximum density-number", action='store_true', default=False)
+
+
+class ConcatenatorSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'concat'
+        self.module_name = 'concatenator'
+        self.program_help = 'JSON files concatenator. Join the given JSON files in the given order'
+        self.add_parent = False
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('filenames', help='JSON filenames (calc\'s output) in the concatenation order', nargs='+', type=str)
+        self.parser.add_argument('-o', '--output', help='output JSON filename. Default: first filename with "concat" suffix', type=str)
+        self.parser.add_argument('-n', '--no_merge', help='do not merge equal partitions at the files\' boundaries', default=False, action='store_true')
+        self.parser.add_argument('-p', '--label_pieces', help='label each file\'s events by its filename', default=False, action='store_true')
+
+
+class SubsetterSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'subset'
+        self.module_name = 'subsetter'
+        self.program_help = 'Parts subset calculator. It demands the parts table (check calc -t option)'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('-l', '--list', help='list the available parts', default=False, action='store_true')
+        self.parser.add_argument('-p', '--parts', help='parts numbers (see -l option)', nargs='+', type=int, default=[])
+        self.parser.add_argument('-s', '--sections', help='sections such as strings, woodwinds, brass, percussion, keyboards, voices and others', nargs='+', default=[])
+        self.parser.add_argument('-i', '--instruments', help='instruments names (see -l option)', nargs='+', default=[])
+        self.parser.add_argument('-w', '--sweep', help='calculate each group of parts of a grouping: {} or a JSON file with group names and lists of parts numbers, sections or instruments'.format(', '.join(GROUPINGS)), type=str)
+        self.parser.add_argument('-k', '--stacked', help='save the sweep groups into a single CSV file', default=False, action='store_true')
+        self.parser.add_argument('-o', '--output', help='output JSON filename (the output filenames prefix in sweep mode). Default: given filename with "subset" suffix', type=str)
+        self.parser.add_argument('-z', '--compact', help='save JSON data in the compact schema (derived columns are omitted)', default=False, action='store_true')
+        self.parser.add_argument('-g', '--gzip', help='gzip-compress the JSON file', default=False, action='store_true')
+
+
+class TclassSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'tclass'
+        self.module_name = 'tclass'
+        self.program_help = 'Textural class calculator and plotter'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument("-np", "--no_plot", help='No textural class chart', default=False, action='store_true')
+        self.parser.add_argument("-ng", "--no_graph", help='No graph chart', default=False, action='store_true')
+        self.parser.add_argument("-fl", "--show_form_labels", help = "Draw vertical lines to display given form labels. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
+        self.parser.add_argument("-s", "--as_step", help='Step chart', default=False, action='store_true')
+        self.parser.add_argument("-c", "--counting_chart", help = "Counting chart", default=False, action='store_true')
+        self.parser.add_argument("-r", "--radar_chart", help = "Radar chart", default=False, action='store_true')
+
+
+class TcontourSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'tcontour'
+        self.module_name = 'tcontour'
+        self.program_help = 'Textural contour calculator and plotter'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument("-fl", "--show_form_labels", help = "Draw vertical lines to display given form labels. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
+
+        self.parser.add_argument("-np", "--no_plot", help='No Plot chart', default=False, action='store_true')
+        self.parser.add_argument("-o", "--lowess", help='Plot LOWESS (or another smoothing, see --smoothing)', default=False, action='store_true')
+        self.parser.add_argument("--lowess_degree", help='Lowess degree (fraction of the data used in each local estimate). Default=0.05', default=0.05, type=float)
+        self.parser.add_argument("--smoothing", help='Smoothing method: {}. Default=lowess'.format(', '.join(SMOOTHING_METHODS)), default='lowess', choices=SMOOTHING_METHODS)
+        self.parser.add_argument("--smoothing_bins", help='Number of bins of the binned smoothing. Default={}'.format(DEFAULT_BINS), default=DEFAULT_BINS, type=int)
+        self.parser.add_argument("-s", "--as_step", help='Step chart', default=False, action='store_true')
+        self.parser.add_argument("-r", "--reduction", help='Contour reduction (Morris algorithm). Save each point\'s reduction depth and plot the reduced contour', default=False, action='store_true')
+        self.parser.add_argument("--reduction_depth", help='Depth of the plotted reduced contour. Default: maximum depth', type=int)
+
+
+class OperationsSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'ops'
+        self.module_name = 'operations'
+        self.program_help = 'Partitional operations classifier'
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('-d', '--dir', help='folder with JSON files', default=False, action='store_true')
+        self.parser.add_argument('-m', '--multiprocessing', help='multiprocessing', default=False, action='store_true')
+
+
+class PipelineSubparser(GeneralSubparser):
+    '''Implements argparser.'''
+
+    def setup(self) -> None:
+        self.program_name = 'pipeline'
+        self.module_name = 'pipeline'
+        self.program_help = 'Standard processing in a single process (calc, tclass, tcontour, ops, plot and stats)'
+        self.add_parent = False
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument('filename', help='digital score filename (XML, MXL, and KRN) or JSON filename, if calc step is omitted', type=str)
+        self.parser.add_argument('-s', '--steps', help='comma separated steps: {}. Default={}'.format(', '.join(STEPS), DEFAULT_STEPS), default=DEFAULT_STEPS, type=str)
+        self.parser.add_argument('-z', '--compact', help='save JSON data in the compact schema (derived columns are omitted)', default=False, action='store_true')
+        self.parser.add_argument('-g', '--gzip', help='gzip-compress the JSON file', default=False, action='store_true')
+        self.parser.add_argument('--smoothing', help='plot the contour smoothing by a given method: {}. It demands tcontour and plot steps'.format(', '.join(SMOOTHING_METHODS)), choices=SMOOTHING_METHODS)
+        self.parser.add_argument('--smoothing_degree', help='fraction of the data used in each local estimate of the smoothing. Default=0.05', default=0.05, type=float)
+        self.parser.add_argument('--smoothing_bins', help='number of bins of the binned smoothing. Default={}'.format(DEFAULT_BINS), default=DEFAULT_BINS, type=int)
+
+
+## Subcommands in the help order. Add new custom subcommands here.
+SUBPARSERS = [
+    CalculatorSubparser,
+    PlotterSubparser,
+    AnnotatorSubparser,
+    LabelerSubparser,
+    InfoSubparser,
+    UtilsSubparser,
+    StatsSubparser,
+    ConverterSubparser,
+    TrimmerSubparser,
+    FinderSubparser,
+    ConcatenatorSubparser,
+    SubsetterSubparser,
+    TclassSubparser,
+    TcontourSubparser,
+    OperationsSubparser,
+    PipelineSubparser,
+]
@@ -0,0 +1,85 @@
+'''This module calculates the rhythmic partitions of a subset of the score's parts (such as the strings only) from the parts table saved by the calculator (option `-t`), without the digital score parsing.'''
+
+from .lib.base import CustomException, clean_filename, file_rename, parse_pow, save_dict_into_csv_file
+from .lib.sounding import PartsTable, get_parts_table_filename
+
+
+def get_subset_suffix(numbers=None, sections=None, instruments=None) -> str:
+    '''Return the output filename suffix of the given parts selection.'''
+
+    elements = [str(n) for n in numbers or []]
+    elements.extend(sections or [])
+    elements.extend(instruments or [])
+    if not elements:
+        return 'subset-all'
+    return clean_filename('subset-{}'.format('-'.join(elements)))
+
+
+def main(filename: str, numbers=None, sections=None, instruments=None, output=None, compact=False, compress=False) -> None:
+    '''Calculate the rhythmic partitions of the selected parts of the given file's parts table and save them into a JSON file.'''
+
+    parts_table = PartsTable(get_parts_table_filename(filename))
+    indexes = parts_table.get_parts_indexes(numbers, sections, instruments)
+    print('Calculating the partitions of {} parts...'.format(len(indexes)))
+
+    rpdata = parts_table.make_rpdata(indexes)
+    rpdata.path = output or file_rename(filename, 'json', get_subset_suffix(numbers, sections, instruments))
+    if compact:
+        rpdata.schema_version = 2
+    rpdata.compress = compress
+    rpdata.save_to_file()
+
+
+def save_stacked_csv(groups_rpdata: dict, filename: str) -> None:
+    '''Save the data of the given groups' `RPData` objects into a single CSV file with a group column.'''
+
+    dic = {'Group': []}
+    for name, rpdata in groups_rpdata.items():
+        dic['Group'].extend([name] * rpdata.size)
+        for k, v in rpdata.data.items():
+            dic.setdefault(k, []).extend(v)
+    dic['Partition'] = list(map(parse_pow, dic['Partition']))
+
+    print('Saving into {}...'.format(filename))
+    save_dict_into_csv_file(dic, filename)
+
+
+def sweep_main(filename: str, grouping: str, stacked=False, output=None, compact=False, compress=False) -> None:
+    '''Calculate the rhythmic partitions of each group of parts of the given grouping specification in a single sweep.
+
+    Save one JSON file for each group, or a single CSV file with all the groups if `stacked` is true. The output filenames start with the given `output` prefix (default: the given filename without extension).'''
+
+    if stacked and (compact or compress):
+        raise CustomException('The stacked CSV file can\'t be saved in the compact schema or gzip-compressed. Remove -z and -g options.')
+
+    prefix = output or filename
+    parts_table = PartsTable(get_parts_table_filename(filename))
+    groups = parts_table.make_groups(grouping)
+    print('Calculating the partitions of {} groups...'.format(len(groups)))
+
+    groups_rpdata = parts_table.make_groups_rpdata(groups)
+
+    if stacked:
+        save_stacked_csv(groups_rpdata, file_rename(prefix, 'csv', 'sweep'))
+        return
+
+    for name, rpdata in groups_rpdata.items():
+        rpdata.path = file_rename(prefix, 'json', clean_filename('subset-{}'.format(name)))
+        if compact:
+            rpdata.schema_version = 2
+        rpdata.compress = compress
+        rpdata.save_to_file()
+
+
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
+
+    if args.list:
+        print(PartsTable(get_parts_table_filename(args.filename)).get_description())
+        return
+
+    if args.sweep:
+        sweep_main(args.filename, args.sweep, args.stacked, args.output, args.compact, args.gzip)
+        return
+
+    main(args.filename, args.parts, args.sections, args.instruments, args.output, args.compact, args.gzip)
@@ -5,14 +5,15 @@ For further information about textural classes, see Daniel Moreira (2019).
 Moreira, Daniel. 2019. "Textural Design: A Compositional Theory for the Organization of Musical Texture." Ph.D. Thesis, Universidade Federal do Rio de Janeiro.
 '''
 
-from collections import Counter
 import itertools
 import matplotlib.pyplot as plt
+import numpy
 
 from rpscripts.plotter import AbstractRadarPlotter, AbstractTimePlotter
 
-from .lib.base import GeneralSubparser, RPData, file_rename
+from .lib.base import CategoricalSequence, RPData, as_categorical, encode_categories, file_rename, memoize
 from .lib.partition import Partition
+from .lib.passes import AttributePass
 
 
 FACTOR = 2000
@@ -23,6 +24,7 @@ TEXTURAL_CLASSES = ['R', 'L', 'B', 'Lx', 'LB', 'By', 'LxB', 'LBy', 'LxBy']
 
 # Auxiliary functions
 
+@memoize
 def get_partition_texture_class(str_partition: str) -> str:
     '''Get the textural class of a given partition.'''
 
@@ -42,25 +44,14 @@ def are_classes_neighbors(class1: str, class2: str) -> bool:
 class ExtendedPartition(Partition):
     '''Extend Partition class to handle partition classes.'''
 
+    __slots__ = ()
+
     def get_texture_class(self):
         '''Get the partition's textural class.'''
 
-        lines = 0
-        blocks = 0
-
-        if self.parts:
-            for el in sorted(self.parts):
-                if el == 1:
-                    lines += 1
-                elif el > 1:
-                    blocks += 1
-
-            if lines > 2:
-                lines = 2
-            if blocks > 2:
-                blocks = 2
-        else:
-            lines, blocks = 0, 0
+        # Lines are the unitary parts and blocks are the other ones
+        lines = dict(self.multiplicities).get(1, 0)
+        blocks = len(self.parts) - lines
 
         dic = {
             (0, 0): 'R',
@@ -74,29 +65,56 @@ class ExtendedPartition(Partition):
             (2, 2): 'LxBy',
         }
 
-        return dic[(lines, blocks)]
+        return dic[(min(lines, 2), min(blocks, 2))]
+
+
+def get_classes_counts(tclass, groups=None) -> numpy.ndarray:
+    '''Return the number of events of each textural class (in `TEXTURAL_CLASSES` order) of a given tclass sequence.
+
+    If a sequence of groups (such as labels) of the same size is given, return a matrix with the counts of each group (rows, in categories order) and class (columns).'''
+
+    tclass = as_categorical(tclass)
+    positions = [TEXTURAL_CLASSES.index(t) for t in tclass.categories]
+    counts = tclass.get_counts(groups)
+    classes_counts = numpy.zeros(counts.shape[:-1] + (len(TEXTURAL_CLASSES),), dtype=counts.dtype)
+    classes_counts[..., positions] = counts
+    return classes_counts
 
 
 class ExtendedRPData(RPData):
     '''Extend RPData class to add tclass data.'''
 
     def set_textural_classes(self) -> None:
-        '''Set textural class into RPData.'''
+        '''Set textural class into RPData.
 
-        self.tclass = list(map(get_partition_texture_class, self.partitions))
+        The classes are calculated once for each distinct partition and broadcast through the partitions' codes.'''
+
+        partitions = as_categorical(self.partitions)
+        categories, classes_codes = encode_categories([get_partition_texture_class(p) for p in partitions.categories])
+        self.tclass = CategoricalSequence(categories=categories, codes=numpy.asarray(classes_codes, dtype=int)[partitions.codes])
 
     def make_counting_chart(self, filename=None) -> None:
         '''Save counting chart into given filename.'''
 
-        counter = Counter(self.tclass)
-        data = [counter[t] for t in TEXTURAL_CLASSES]
-        self.axis.bar(TEXTURAL_CLASSES, data)
-        self.axis.ylabel('Number of events')
-        self.axis.xlabel('Textural class')
-        self.axis.grid()
+        figure, axis = plt.subplots()
+        axis.bar(TEXTURAL_CLASSES, get_classes_counts(self.tclass))
+        axis.set_ylabel('Number of events')
+        axis.set_xlabel('Textural class')
+        axis.grid()
         if not filename:
             filename = file_rename(self.path, 'svg', 'classes-counter')
-        plt.savefig(filename)
+        figure.savefig(filename)
+        plt.close(figure)
+
+
+class TexturalClassPass(AttributePass):
+    '''Textural class pass. See `passes` module.'''
+
+    def setup(self) -> None:
+        self.attribute = 'tclass'
+
+    def map_partition(self, partition: Partition) -> str:
+        return get_partition_texture_class(partition.as_string())
 
 
 class TexturalClassPlot(AbstractTimePlotter):
@@ -108,7 +126,9 @@ class TexturalClassPlot(AbstractTimePlotter):
         super().__init__(rpdata, image_format, show_labels)
 
     def plot(self):
-        y_values = [TEXTURAL_CLASSES.index(x) for x in self.rpdata.tclass]
+        tclass = as_categorical(self.rpdata.tclass)
+        positions = numpy.array([TEXTURAL_CLASSES.index(t) for t in tclass.categories], dtype=int)
+        y_values = positions[tclass.codes]
 
         # plot or step function
         if self.as_step:
@@ -141,24 +161,16 @@ class TexturalClassRadarPlotter(AbstractRadarPlotter):
 
         # Make data
         if self.rpdata.labels:
-            dic = {label: [0] * len(TEXTURAL_CLASSES) for label in set(self.rpdata.labels)}
-
-            ordered_labels = []
-
-            for tclass, label in zip(self.rpdata.tclass, self.rpdata.labels):
-                ind = TEXTURAL_CLASSES.index(tclass)
-                dic[label][ind] += 1
-                if label not in ordered_labels:
-                    ordered_labels.append(label)
+            labels = as_categorical(self.rpdata.labels)
+            counts = get_classes_counts(self.rpdata.tclass, labels)
+            ordered_labels = labels.get_distinct_values()
         else:
             label = 'All sections'
-            dic = {label: [0] * len(TEXTURAL_CLASSES)}
-
+            counts = get_classes_counts(self.rpdata.tclass)[None, :]
             ordered_labels = [label]
+            labels = CategoricalSequence(categories=[label], codes=[])
 
-            for tclass in self.rpdata.tclass:
-                ind = TEXTURAL_CLASSES.index(tclass)
-                dic[label][ind] += 1
+        dic = {label: counts[labels.get_code(label)].tolist() for label in ordered_labels}
 
         # order dic itemss
         _items = []
@@ -168,54 +180,41 @@ class TexturalClassRadarPlotter(AbstractRadarPlotter):
         self.data.insert(0, TEXTURAL_CLASSES)
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
-
-    def setup(self) -> None:
-        self.program_name = 'tclass'
-        self.program_help = 'Textural class calculator and plotter'
-
-    def add_arguments(self) -> None:
-        self.parser.add_argument("-np", "--no_plot", help='No textural class chart', default=False, action='store_true')
-        self.parser.add_argument("-ng", "--no_graph", help='No graph chart', default=False, action='store_true')
-        self.parser.add_argument("-fl", "--show_form_labels", help = "Draw vertical lines to display given form labels. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
-        self.parser.add_argument("-s", "--as_step", help='Step chart', default=False, action='store_true')
-        self.parser.add_argument("-c", "--counting_chart", help = "Counting chart", default=False, action='store_true')
-        self.parser.add_argument("-r", "--radar_chart", help = "Radar chart", default=False, action='store_true')
-
-    def handle(self, args):
-        rpdata = ExtendedRPData(args.filename)
-        rpdata.set_textural_classes()
-        rpdata.save_to_file()
-
-        if not args.no_plot:
-            figname = file_rename(args.filename, 'svg', 'classes')
-            print('Saving textural classes plot in {}...'.format(figname))
-
-            tclass_plot = TexturalClassPlot(rpdata, 'svg', args.show_form_labels, args.as_step)
-            tclass_plot.plot()
-            tclass_plot.save()
-
-        # Colors: https://digitalsynopsis.com/design/minimal-web-color-palettes-combination-hex-code/
-        if not args.no_graph:
-            relations = {
-                (a, b): 'solid' if are_classes_neighbors(a, b) else 'dashed'
-             for a, b in itertools.permutations(TEXTURAL_CLASSES, 2)}
-            # relations = {
-            #     (a, b): '#C06C84' if are_classes_neighbors(a, b) else '#355C7D'
-            #  for a, b in itertools.permutations(TEXTURAL_CLASSES, 2)}
-
-            figname = file_rename(args.filename, 'gv', 'classes-graph')
-            print('Saving textural classes graph in {}...'.format(figname))
-            dot = rpdata.make_class_graph('tclass', relations)
-            dot.render(figname, format='svg')
-
-        if args.counting_chart:
-            figname = file_rename(args.filename, 'svg', 'classes-counter')
-            print('Saving textural classes counting chart in {}...'.format(figname))
-            rpdata.make_counting_chart(figname)
-
-        if args.radar_chart:
-            radar_plot = TexturalClassRadarPlotter(rpdata)
-            radar_plot.plot()
-            radar_plot.save()
\ No newline at end of file
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
+
+    rpdata = ExtendedRPData(args.filename)
+    rpdata.set_textural_classes()
+    rpdata.save_attributes(['tclass'])
+
+    if not args.no_plot:
+        figname = file_rename(args.filename, 'svg', 'classes')
+        print('Saving textural classes plot in {}...'.format(figname))
+
+        tclass_plot = TexturalClassPlot(rpdata, 'svg', args.show_form_labels, args.as_step)
+        tclass_plot.plot()
+        tclass_plot.save()
+
+    # Colors: https://digitalsynopsis.com/design/minimal-web-color-palettes-combination-hex-code/
+    if not args.no_graph:
+        relations = {
+            (a, b): 'solid' if are_classes_neighbors(a, b) else 'dashed'
+         for a, b in itertools.permutations(TEXTURAL_CLASSES, 2)}
+        # relations = {
+        #     (a, b): '#C06C84' if are_classes_neighbors(a, b) else '#355C7D'
+        #  for a, b in itertools.permutations(TEXTURAL_CLASSES, 2)}
+
+        figname = file_rename(args.filename, 'gv', 'classes-graph')
+        print('Saving textural classes graph in {}...'.format(figname))
+        dot = rpdata.make_class_graph('tclass', relations)
+        dot.render(figname, format='svg')
+
+    if args.counting_chart:
+        figname = file_rename(args.filename, 'svg', 'classes-counter')
+        print('Saving textural classes counting chart in {}...'.format(figname))
+        rpdata.make_counting_chart(figname)
+
+    if args.radar_chart:
+        radar_plot = TexturalClassRadarPlotter(rpdata)
+        radar_plot.plot()
+        radar_plot.save()
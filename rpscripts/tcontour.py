@@ -8,30 +8,27 @@ Moreira, Daniel. 2019. "Textural Design: A Compositional Theory for the Organiza
 '''
 
 
-import statsmodels.nonparametric.smoothers_lowess
+import numpy
 
-from rpscripts.config import LATTICE_MAP_PATH
+from rpscripts.config import COMPLEXITY_INDEX_PATH
 from rpscripts.plotter import AbstractTimePlotter
 
-from .lib.base import CustomException, GeneralSubparser, RPData, file_rename, load_json_file
+from .lib.base import CategoricalSequence, CustomException, RPData, as_categorical, encode_categories, file_rename
+from .lib.complexity import ComplexityIndex
 from .lib.partition import Partition
+from .lib.passes import AttributePass
+from .lib.smoothing import DEFAULT_BINS
 
 
 class ExtendedPartition(Partition):
     '''Extend Partition class to handle textural contour.'''
 
-    def get_complexity_level(self, complexity_map: dict) -> int:
+    __slots__ = ()
+
+    def get_complexity_level(self, complexity_index: ComplexityIndex) -> int:
         '''Return partition's complexity level.'''
 
-        density_number = self.get_density_number()
-        if density_number == 0:
-            return 0
-        try:
-            m = complexity_map[str(density_number)]
-        except:
-            raise CustomException('The lattice map has not the density number {}'.format(density_number))
-        ind = m.index(int(self.get_dispersion_index()))
-        return density_number + ind
+        return complexity_index.get_level(self.get_density_number(), self.get_dispersion_index())
 
 class ContourPoint(object):
     '''Contour point class. It handles complexity level and sublevel'''
@@ -84,116 +81,286 @@ class ContourPoint(object):
         return '<CP {} ({})>'.format(label, self.partition_str)
 
 
+def collapse_repetitions(values: list, positions: list) -> list:
+    '''Return the given positions' subsequence with a single position for each string of equal and adjacent values.
+
+    The first position of each string is kept, except in the string with the last position (and not the first one), which keeps the last position. So the first and last positions are kept, unless all the values are equal.'''
+
+    collapsed = []
+    for j, position in enumerate(positions):
+        if j > 0 and values[position] == values[positions[j - 1]]:
+            if j == len(positions) - 1 and collapsed[-1] != positions[0]:
+                collapsed[-1] = position
+            continue
+        collapsed.append(position)
+    return collapsed
+
+
+def get_contour_extrema(values: list, positions: list, maxima=True) -> list:
+    '''Return the positions of the maxima (or minima) of the given values in the given positions' subsequence.
+
+    The strings of equal and adjacent values are collapsed first (see `collapse_repetitions`). The first and last positions are always extrema.'''
+
+    positions = collapse_repetitions(values, positions)
+    size = len(positions)
+    if size < 3:
+        return positions
+
+    extrema = [positions[0]]
+    for j in range(1, size - 1):
+        value = values[positions[j]]
+        previous_value = values[positions[j - 1]]
+        next_value = values[positions[j + 1]]
+        if maxima and value > previous_value and value > next_value:
+            extrema.append(positions[j])
+        elif not maxima and value < previous_value and value < next_value:
+            extrema.append(positions[j])
+    extrema.append(positions[-1])
+    return extrema
+
+
+def merge_positions(positions_a: list, positions_b: list) -> list:
+    '''Return the sorted union of two sorted lists of positions.'''
+
+    merged = []
+    i, j = 0, 0
+    while i < len(positions_a) and j < len(positions_b):
+        if positions_a[i] < positions_b[j]:
+            merged.append(positions_a[i])
+            i += 1
+        elif positions_a[i] > positions_b[j]:
+            merged.append(positions_b[j])
+            j += 1
+        else:
+            merged.append(positions_a[i])
+            i += 1
+            j += 1
+    merged.extend(positions_a[i:])
+    merged.extend(positions_b[j:])
+    return merged
+
+
+def make_morris_reduction(values: list) -> list:
+    '''Return the reduction depth of each point of a given contour by Morris' reduction algorithm.
+
+    The strings of repeated adjacent values are collapsed (see `collapse_repetitions`), the maxima and minima are flagged and the other points are deleted, increasing the depth. The maxima of the maxima and the minima of the minima are flagged again until all the remaining points are flagged. Each pass is linear on the remaining points. The depth of a point is the number of deletion passes it survived, so the contour reduced to a depth d is made of the points with depths equal or greater than d.'''
+
+    positions = list(range(len(values)))
+    depths = [0] * len(values)
+    maxima = get_contour_extrema(values, positions, True)
+    minima = get_contour_extrema(values, positions, False)
+    depth = 0
+
+    while True:
+        flagged = merge_positions(maxima, minima)
+        if len(flagged) == len(positions):
+            return depths
+        positions = flagged
+        depth += 1
+        for position in positions:
+            depths[position] = depth
+        maxima = get_contour_extrema(values, maxima, True)
+        minima = get_contour_extrema(values, minima, False)
+
+
+def get_partition_contour_info(partition: Partition, complexity_index: ComplexityIndex) -> tuple:
+    '''Return the complexity level and the number of parts of a given partition.'''
+
+    return ExtendedPartition(partition.parts).get_complexity_level(complexity_index), len(partition.parts)
+
+
+def get_tcontour_values(tcontour) -> list:
+    '''Return the contour points of a given tcontour sequence (such as "3-1") as integers that keep the order of the levels and sublevels.'''
+
+    tcontour = as_categorical(tcontour)
+    pairs = [list(map(int, str(representation).split('-'))) + [0] for representation in tcontour.categories]
+    sublevels_max = max([pair[1] for pair in pairs] + [0])
+    categories_values = numpy.array([pair[0] * (sublevels_max + 1) + pair[1] for pair in pairs], dtype=int)
+    return categories_values[tcontour.codes].tolist()
+
+
 class Contour(object):
-    '''Contour class. It handles the contour points.'''
+    '''Contour class. It handles the contour levels and sublevels.
+
+    The levels and sublevels are calculated once for each distinct partition and broadcast to the events through the partitions' codes as arrays. The contour points (`ContourPoint` objects) are only made on demand.'''
 
-    def __init__(self, str_partitions, complexity_map, locations, indexes) -> None:
-        self.str_partitions = str_partitions
-        self.str_partitions_set = list(set(self.str_partitions))
-        self.partitions_set = [ExtendedPartition(p) for p in self.str_partitions_set]
+    def __init__(self, str_partitions, complexity_index, locations, indexes, partitions_info=None) -> None:
+        self.str_partitions = as_categorical(str_partitions).compact()
+        self.partitions_set = [ExtendedPartition(p) for p in self.str_partitions.categories]
         self.partitions_info = {}
         self.indexes = indexes
         self.locations = locations
         self.contour_map = {}
         self.levels_map = {}
         self.levels_keys = []
-        self.levels_seq = []
-        self.sublevels_seq = []
+        self.levels_seq = numpy.zeros(0, dtype=int)
+        self.sublevels_seq = numpy.zeros(0, dtype=int)
         self.sublevels_max = None
-        self.cseg = []
-        self.complexity_map = complexity_map
-        self.complexity_data = []
-        self.level_sublevel_seq = []
-        self.reduction_check = []
+        self.complexity_index = complexity_index
+        self.level_sublevel_seq = CategoricalSequence([])
+        self.reduction_depths = None
 
-        self.make_maps(complexity_map)
+        self.make_maps(complexity_index, partitions_info)
         self.make_contour()
-        self.make_complexity_data()
 
     def __repr__(self) -> str:
-        return '<C {}>'.format(', '.join(map(lambda el: '{}-{} ({})'.format(*el), self.cseg)))
+        return '<C {} points, {} levels>'.format(len(self.levels_seq), len(self.levels_keys))
 
-    def make_maps(self, complexity_map: dict) -> None:
-        '''Make and set levels map and partitions info about complexity level and number of parts.'''
+    def __len__(self) -> int:
+        return len(self.levels_seq)
 
-        self.partitions_info = {}
-        self.levels_map = {}
+    def make_maps(self, complexity_index: ComplexityIndex, partitions_info=None) -> None:
+        '''Make and set levels map (sorted numbers of parts of each complexity level) and partitions info about complexity level and number of parts.
 
-        for partition in self.partitions_set:
-            n_parts = len(partition.parts)
-            str_partition = partition.as_string()
-            complexity_level = partition.get_complexity_level(complexity_map)
+        The partitions info (a dictionary of string partitions and tuples of complexity level and number of parts) can be given, such as calculated by `ContourPass`.'''
 
-            if complexity_level not in self.levels_map.keys():
-                self.levels_map[complexity_level] = set([])
-            self.levels_map[complexity_level].add(n_parts)
+        if partitions_info is None:
+            partitions_info = {}
+            for partition in self.partitions_set:
+                partitions_info[partition.as_string()] = get_partition_contour_info(partition, complexity_index)
 
-            self.partitions_info.update({
-                str_partition: (complexity_level, n_parts)
-            })
+        self.partitions_info = partitions_info
+        levels_map = {}
+        for complexity_level, n_parts in partitions_info.values():
+            levels_map.setdefault(complexity_level, set()).add(n_parts)
 
-        self.levels_map = {k: self.levels_map[k] for k in sorted(self.levels_map.keys())}
+        self.levels_map = {k: sorted(levels_map[k]) for k in sorted(levels_map.keys())}
         self.levels_keys = list(self.levels_map.keys())
 
     def make_contour(self) -> None:
-        '''Make the contour from the available complexity levels and partitions information.'''
+        '''Make the contour levels and sublevels arrays from the available complexity levels and partitions information.
+
+        The contour level is the position of the complexity level among the piece's ones. If a complexity level has partitions with distinct numbers of parts, the sublevels are their positions (starting at 1) in the sorted numbers of parts.'''
+
+        levels_positions = {level: i for i, level in enumerate(self.levels_keys)}
+        sublevels_positions = {
+            (level, n_parts): (i + 1 if len(n_parts_list) > 1 else 0)
+            for level, n_parts_list in self.levels_map.items()
+            for i, n_parts in enumerate(n_parts_list)
+        }
 
         self.contour_map = {}
         for str_partition, (level, n_parts) in self.partitions_info.items():
-            n_parts_set = self.levels_map[level]
-            contour_level = self.levels_keys.index(level)
-            contour_sublevel = 0
-            if len(n_parts_set) > 1:
-                contour_sublevel = list(n_parts_set).index(n_parts) + 1
-
-            self.contour_map.update({
-                str_partition: (contour_level, contour_sublevel)
-            })
-
-        self.cseg = []
-        for str_partition in self.str_partitions:
-            (contour_level, contour_sublevel) = self.contour_map[str_partition]
-            cp = ContourPoint(contour_level, contour_sublevel, str_partition)
-            self.cseg.append(cp)
-            self.levels_seq.append(contour_level)
-            self.sublevels_seq.append(contour_sublevel)
-        self.sublevels_max = max(self.sublevels_seq)
-        self.reduction_check = [True] * len(self.cseg)
-
-    def make_complexity_data(self) -> None:
-        '''Make the complexity data from the available sequences of complexity levels and sublevels.'''
-
-        self.complexity_data = []
-        for level, sublevel in zip(self.levels_seq, self.sublevels_seq):
-            contour_repr = str(level)
-            if int(sublevel) != 0:
-                contour_repr = '{}-{}'.format(level, sublevel)
-            self.level_sublevel_seq.append(contour_repr)
-            self.complexity_data.append([
-                level,
-                sublevel,
-                contour_repr
-            ])
+            self.contour_map[str_partition] = (levels_positions[level], sublevels_positions[(level, n_parts)])
+
+        categories_levels = numpy.array([self.contour_map[p][0] for p in self.str_partitions.categories], dtype=int)
+        categories_sublevels = numpy.array([self.contour_map[p][1] for p in self.str_partitions.categories], dtype=int)
+        self.levels_seq = categories_levels[self.str_partitions.codes]
+        self.sublevels_seq = categories_sublevels[self.str_partitions.codes]
+        self.sublevels_max = int(self.sublevels_seq.max()) if len(self.sublevels_seq) > 0 else 0
+
+        representations = [
+            str(level) if sublevel == 0 else '{}-{}'.format(level, sublevel)
+            for level, sublevel in zip(categories_levels.tolist(), categories_sublevels.tolist())
+        ]
+        categories, codes = encode_categories(representations)
+        self.level_sublevel_seq = CategoricalSequence(categories=categories, codes=numpy.asarray(codes, dtype=int)[self.str_partitions.codes])
+
+    def get_values(self) -> list:
+        '''Return the contour points as integers that keep the order of the levels and sublevels.'''
+
+        return (self.levels_seq * (self.sublevels_max + 1) + self.sublevels_seq).tolist()
+
+    def make_reduction(self) -> None:
+        '''Make and set the reduction depth of each contour point (see `make_morris_reduction`).'''
+
+        self.reduction_depths = numpy.array(make_morris_reduction(self.get_values()), dtype=int)
+
+    def get_reduction_positions(self, depth=None) -> numpy.ndarray:
+        '''Return the positions of the contour points of the contour reduced to a given depth, from 0 to the maximum depth. The default is the maximum depth.'''
+
+        if self.reduction_depths is None:
+            self.make_reduction()
+        max_depth = int(self.reduction_depths.max()) if len(self.reduction_depths) > 0 else 0
+        if depth is None:
+            depth = max_depth
+        if depth < 0 or depth > max_depth:
+            raise CustomException('Reduction depth must be an integer from 0 to {}.'.format(max_depth))
+        return numpy.flatnonzero(self.reduction_depths >= depth)
+
+    def get_contour_points(self) -> list:
+        '''Return the contour as a list of `ContourPoint` objects.'''
+
+        return [
+            ContourPoint(level, sublevel, str_partition)
+            for level, sublevel, str_partition in zip(self.levels_seq.tolist(), self.sublevels_seq.tolist(), self.str_partitions)
+        ]
+
+    def get_complexity_data(self) -> list:
+        '''Return the complexity data as a list of level, sublevel and representation (such as "3-1") of each event.'''
+
+        return [
+            [level, sublevel, contour_repr]
+            for level, sublevel, contour_repr in zip(self.levels_seq.tolist(), self.sublevels_seq.tolist(), self.level_sublevel_seq)
+        ]
 
 
 class ExtendedRPData(RPData):
     '''Extend RPData class to add complexity (contour) data.'''
 
     def add_complexity_data(self, contour: Contour):
-        rows = contour.level_sublevel_seq
-        self.tcontour = rows
-        self.save_to_file()
+        self.tcontour = contour.level_sublevel_seq
+        self.save_attributes(['tcontour'])
+
+    def add_reduction_data(self, contour: Contour):
+        if contour.reduction_depths is None:
+            contour.make_reduction()
+        self.reduction = CategoricalSequence(contour.reduction_depths.tolist())
+        self.save_attributes(['reduction'])
+
+
+class ContourPass(AttributePass):
+    '''Textural contour pass. See `passes` module.
+
+    The complexity level of each distinct partition is calculated in the traversal. The `Contour` object is kept into `contour` attribute.'''
+
+    def __init__(self, complexity_index=None) -> None:
+        super().__init__()
+        self.complexity_index = complexity_index
+        self.contour = None
+
+    def setup(self) -> None:
+        self.attribute = 'tcontour'
+
+    def prepare(self, rpdata: RPData) -> None:
+        if self.complexity_index is None:
+            self.complexity_index = ComplexityIndex(COMPLEXITY_INDEX_PATH)
+
+    def map_partition(self, partition: Partition) -> tuple:
+        return get_partition_contour_info(partition, self.complexity_index)
+
+    def make_attribute(self, rpdata: RPData, partitions: CategoricalSequence, values: list) -> CategoricalSequence:
+        partitions_info = dict(zip(partitions.categories, values))
+        self.contour = Contour(partitions, self.complexity_index, rpdata.data['Global offset'], rpdata.data['Index'], partitions_info)
+        return self.contour.level_sublevel_seq
+
+
+class ReductionPass(AttributePass):
+    '''Contour reduction pass. See `passes` module.
+
+    The reduction depths are calculated from the tcontour attribute.'''
+
+    def setup(self) -> None:
+        self.attribute = 'reduction'
+        self.requires = ['tcontour']
+
+    def make_attribute(self, rpdata: RPData, partitions: CategoricalSequence, values: list) -> CategoricalSequence:
+        return CategoricalSequence(make_morris_reduction(get_tcontour_values(rpdata.tcontour)))
 
 
 class ContourPlot(AbstractTimePlotter):
     '''Contour Plot class.'''
 
-    def __init__(self, contour: Contour, rpdata: RPData, image_format='svg', show_labels=False, run_lowess=False, lowess_degree=0.05, as_step=False) -> None:
+    def __init__(self, contour: Contour, rpdata: RPData, image_format='svg', show_labels=False, run_lowess=False, lowess_degree=0.05, as_step=False, reduction=False, reduction_depth=None, smoothing_method='lowess', smoothing_bins=DEFAULT_BINS) -> None:
         self.name = 'complexity'
         self.contour = contour
         self.run_lowess = run_lowess
         self.lowess_degree = lowess_degree
+        self.smoothing_method = smoothing_method
+        self.smoothing_bins = smoothing_bins
         self.as_step = as_step
+        self.reduction = reduction
+        self.reduction_depth = reduction_depth
         super().__init__(rpdata, image_format, show_labels)
 
     def plot(self):
@@ -202,7 +369,7 @@ class ContourPlot(AbstractTimePlotter):
         sublevel_max = self.contour.sublevels_max
 
         if sublevel_max > 0:
-            y_values = [level + sublevel / (sublevel_max * 2) for level, sublevel in zip(level_seq, sublevel_seq)]
+            y_values = level_seq + sublevel_seq / (sublevel_max * 2)
         else:
             y_values = level_seq
 
@@ -212,10 +379,20 @@ class ContourPlot(AbstractTimePlotter):
         else:
             self.axis.plot(self.x_values[:-1], y_values)
 
+        legend = ['Contour']
+
         if self.run_lowess:
-            lowess = statsmodels.nonparametric.smoothers_lowess.lowess(y_values, self.x_values[:-1], frac=self.lowess_degree)[:, 1]
-            self.axis.plot(self.x_values[:-1], lowess)
-            self.axis.legend(['Contour', 'Lowess {}'.format(self.lowess_degree)])
+            legend.append(self.plot_smoothing(y_values, self.smoothing_method, self.lowess_degree, self.smoothing_bins))
+
+        if self.reduction:
+            positions = self.contour.get_reduction_positions(self.reduction_depth)
+            depth = int(self.contour.reduction_depths[positions].min()) if len(positions) > 0 else 0
+            x_values = numpy.array(self.x_values[:-1])[positions]
+            self.axis.plot(x_values, numpy.asarray(y_values)[positions], marker='o')
+            legend.append('Reduction depth {}'.format(depth))
+
+        if len(legend) > 1:
+            self.axis.legend(legend)
 
         # Show only integer yticks
         ypositions = []
@@ -235,54 +412,39 @@ class ContourPlot(AbstractTimePlotter):
         return super().plot()
 
 
-def make_contour_object(rpdata: RPData, complexity_map: dict) -> Contour:
+def make_contour_object(rpdata: RPData, complexity_index: ComplexityIndex) -> Contour:
     '''Return a contour object.'''
 
     partitions = rpdata.partitions
     locations = rpdata.data['Global offset']
     indexes = rpdata.data['Index']
 
-    return Contour(partitions, complexity_map, locations, indexes)
-
-
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
-
-    def setup(self) -> None:
-        self.program_name = 'tcontour'
-        self.program_help = 'Textural contour calculator and plotter'
-
-    def add_arguments(self) -> None:
-        self.parser.add_argument("-fl", "--show_form_labels", help = "Draw vertical lines to display given form labels. It demands a previous labeled file. Check rpscripts labels -h' column", default=False, action='store_true')
+    return Contour(partitions, complexity_index, locations, indexes)
 
-        self.parser.add_argument("-np", "--no_plot", help='No Plot chart', default=False, action='store_true')
-        self.parser.add_argument("-o", "--lowess", help='Plot LOWESS', default=False, action='store_true')
-        self.parser.add_argument("--lowess_degree", help='Lowess degree', default=0.05, type=float)
-        self.parser.add_argument("-s", "--as_step", help='Step chart', default=False, action='store_true')
 
-    def handle(self, args):
-        json_filename = args.filename
-        cdic_filename = LATTICE_MAP_PATH
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-        print('Loading complexity_map in {}...'.format(cdic_filename))
-        try:
-            complexity_map = load_json_file(cdic_filename)
-        except:
-            raise CustomException('Failure on complexity map loading...')
+    json_filename = args.filename
+    complexity_index = ComplexityIndex(COMPLEXITY_INDEX_PATH)
 
-        print('Generating texture contour...')
+    print('Generating texture contour...')
 
-        rpdata = ExtendedRPData(args.filename)
+    rpdata = ExtendedRPData(args.filename)
 
-        contour = make_contour_object(rpdata, complexity_map)
+    contour = make_contour_object(rpdata, complexity_index)
 
-        rpdata.add_complexity_data(contour)
+    rpdata.add_complexity_data(contour)
 
+    if args.reduction:
+        print('Reducing texture contour...')
+        contour.make_reduction()
+        rpdata.add_reduction_data(contour)
 
-        if not args.no_plot:
-            figname = file_rename(json_filename, 'svg', 'complexity')
-            print('Saving texture contour plot in {}...'.format(figname))
+    if not args.no_plot:
+        figname = file_rename(json_filename, 'svg', 'complexity')
+        print('Saving texture contour plot in {}...'.format(figname))
 
-            contour_plot = ContourPlot(contour, rpdata, 'svg', args.show_form_labels, args.lowess, lowess_degree=args.lowess_degree, as_step=args.as_step)
-            contour_plot.plot()
-            contour_plot.save()
+        contour_plot = ContourPlot(contour, rpdata, 'svg', args.show_form_labels, args.lowess, lowess_degree=args.lowess_degree, as_step=args.as_step, reduction=args.reduction, reduction_depth=args.reduction_depth, smoothing_method=args.smoothing, smoothing_bins=args.smoothing_bins)
+        contour_plot.plot()
+        contour_plot.save()
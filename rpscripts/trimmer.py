@@ -1,77 +1,138 @@
-'''This module cuts off a given calc's JSON output file by given start and end measure numbers and return a new JSON file.'''
+'''This module cuts off a given calc's JSON output file by given start and end measure numbers and return a new JSON file.
 
+Multiple excerpts (measure ranges or labels' spans) can be cut off from a single loading of the JSON file.'''
 
-from .lib.base import CustomException, GeneralSubparser, RPData, file_rename
+import multiprocessing
 
+from .lib.base import CustomException, RPData, clean_filename, file_rename
 
-def main(rpdata: RPData, start_measure, end_measure) -> None:
-    '''Trim the given RPData between the given start and end measures.'''
 
-    global_offsets = sorted(list(rpdata.offset_map.values()))
-    measures = sorted(list(map(int, list(rpdata.offset_map.keys()))))
+def parse_measures_range(value: str) -> tuple:
+    '''Return the start and end measures of a given range string such as `3:8`, `:8` or `3:`.
+
+    Blank start or end measures are returned as `None`.'''
 
+    if ':' not in value:
+        raise CustomException('Invalid measures range {}. Use the format start:end.'.format(value))
+
+    start, end = [v.strip() for v in value.split(':', 1)]
     try:
-        start_offset = global_offsets[0]
-        start_label = 'init'
-        if start_measure:
-            if start_measure in measures:
-                start_offset = rpdata.offset_map[str(start_measure)]
-                start_label = int(start_measure)
-
-        end_offset = global_offsets[-1] + 1
-        end_label = 'end'
-        if end_measure:
-            if end_measure in measures:
-                next_measure = str(end_measure + 1)
-                if next_measure in rpdata.offset_map.keys():
-                    end_offset = rpdata.offset_map[next_measure]
-                    end_label = str(end_measure)
-    except:
-        raise CustomException('Given start or end measure out of piece')
+        start_measure = int(start) if start else None
+        end_measure = int(end) if end else None
+    except ValueError:
+        raise CustomException('Invalid measures range {}. Use the format start:end.'.format(value))
+    return start_measure, end_measure
+
+
+def make_measures_excerpt(rpdata: RPData, start_measure, end_measure):
+    '''Return a new `RPData` object trimmed between the given start and end measures or `None` if both measures are out of the piece.'''
+
+    offset_index = rpdata.get_offset_index()
+
+    start_label = 'init'
+    if start_measure and offset_index.has_measure(start_measure):
+        start_label = int(start_measure)
+    else:
+        start_measure = None
+
+    end_label = 'end'
+    if end_measure and offset_index.has_measure(end_measure) and offset_index.has_measure(end_measure + 1):
+        end_label = str(end_measure)
+    else:
+        end_measure = None
 
     if start_label == 'init' and end_label == 'end':
         print('Given start and end measure out of the piece. Nothing done.')
         return
 
-    new_rpdata = RPData()
-
     # Get limits
-    start_pointer = None
-    i = 0
-    while i < rpdata.size and rpdata.data['Global offset'][i] < end_offset:
-        if rpdata.data['Global offset'][i] >= start_offset:
-            if start_pointer == None:
-                start_pointer = i
-        i += 1
-    end_pointer = i
-
-    new_rpdata = rpdata.trim(start_pointer, end_pointer)
+    rows = offset_index.get_measures_rows_slice(start_measure, end_measure)
+    if rows.start == rows.stop:
+        raise CustomException('Given start or end measure out of piece')
+
+    new_rpdata = rpdata.trim(rows.start, rows.stop)
     new_rpdata.path = file_rename(rpdata.path, 'json', 'excerpt-{}-{}'.format(start_label, end_label))
-    new_rpdata.save_to_file()
+    return new_rpdata
+
+
+def make_labels_excerpts(rpdata: RPData) -> list:
+    '''Return a list of new `RPData` objects, one for each label span.'''
+
+    if not rpdata.labels:
+        raise CustomException('There is no label in the given input file.')
+
+    excerpts = []
+    for position, label in enumerate(rpdata.labels.labels):
+        rows = rpdata.labels.get_span_rows_slice(position)
+        new_rpdata = rpdata.trim(rows.start, rows.stop)
+        suffix = 'excerpt-{}'.format(position + 1)
+        if label:
+            suffix = '{}-{}'.format(suffix, clean_filename(label))
+        new_rpdata.path = file_rename(rpdata.path, 'json', suffix)
+        excerpts.append(new_rpdata)
+    return excerpts
+
+
+def save_excerpt(rpdata: RPData) -> None:
+    '''Save the given excerpt into its JSON file.'''
+
+    rpdata.save_to_file()
+
+
+def save_excerpts(excerpts: list, multiprocessing_flag=False) -> None:
+    '''Save the given excerpts into their JSON files, optionally in parallel.'''
+
+    total_cpus = multiprocessing.cpu_count()
+
+    if multiprocessing_flag and total_cpus > 3 and len(excerpts) > 1:
+        with multiprocessing.Pool(min(total_cpus - 2, len(excerpts))) as p:
+            p.map(save_excerpt, excerpts)
+    else:
+        for excerpt in excerpts:
+            save_excerpt(excerpt)
+
+
+def main(rpdata: RPData, start_measure, end_measure) -> None:
+    '''Trim the given RPData between the given start and end measures.'''
+
+    new_rpdata = make_measures_excerpt(rpdata, start_measure, end_measure)
+    if new_rpdata:
+        new_rpdata.save_to_file()
+
+
+def multiple_main(rpdata: RPData, ranges: list, by_labels=False, multiprocessing_flag=False) -> None:
+    '''Trim the given RPData into multiple excerpts, by the given measures ranges and/or by labels.'''
+
+    excerpts = []
+    for value in ranges:
+        start_measure, end_measure = parse_measures_range(value)
+        new_rpdata = make_measures_excerpt(rpdata, start_measure, end_measure)
+        if new_rpdata:
+            excerpts.append(new_rpdata)
+
+    if by_labels:
+        excerpts.extend(make_labels_excerpts(rpdata))
 
+    save_excerpts(excerpts, multiprocessing_flag)
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
 
-    def setup(self) -> None:
-        self.program_name = 'trim'
-        self.program_help = 'JSON file trimmer. Trim given measures'
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-    def add_arguments(self) -> None:
-        self.parser.add_argument('-s', '--start', help='Start measure. Blank means "from the beginning"', type=int)
-        self.parser.add_argument('-e', '--end', help='End measure. Blank means "to the end"', type=int)
+    if args.ranges or args.by_labels:
+        rpdata = RPData(args.filename)
 
-    def handle(self, args):
-        if not args.start and not args.end:
-            print('No given start or end measure')
-        else:
-            start_measure = None
-            end_measure = None
-            if args.start:
-                start_measure = int(args.start)
-            if args.end:
-                end_measure = int(args.end)
+        multiple_main(rpdata, args.ranges, args.by_labels, args.multiprocessing)
+    elif not args.start and not args.end:
+        print('No given start or end measure')
+    else:
+        start_measure = None
+        end_measure = None
+        if args.start:
+            start_measure = int(args.start)
+        if args.end:
+            end_measure = int(args.end)
 
-            rpdata = RPData(args.filename)
+        rpdata = RPData(args.filename)
 
-            main(rpdata, start_measure, end_measure)
+        main(rpdata, start_measure, end_measure)
@@ -1,23 +1,24 @@
 '''This module contains helpful tools for the rhythmic partitioning task.'''
 
+import importlib.resources
 import os
 import shutil
-from rpscripts.config import LATTICE_MAP_PATH
-from .lib.partition import PartitionLattice
-from .lib.base import CustomException, GeneralSubparser
-import rpscripts
+from rpscripts.config import AUX_DIR, LATTICE_GRAPH_PATH, LATTICE_MAP_PATH
+from .lib.lattice import make_lattice_graph
+from .lib.partition import PartitionLattice, get_builtin_lattice_map
+from .lib.base import CustomException
 
-MAX_CARDINALITY = 70
+MAX_CARDINALITY = 300
+MAX_GRAPH_CARDINALITY = 40
 
 
 def copy_default_lattice_map() -> None:
     '''Copy lattice map to the default path.'''
 
     print('Copying built-in lattice map to {}'.format(LATTICE_MAP_PATH))
-    ppath = os.path.abspath(rpscripts.__file__)
-    folder = os.path.dirname(os.path.dirname(ppath))
-    lattice_path = os.path.join(folder, 'lattice_map.json')
-    shutil.copy(lattice_path, LATTICE_MAP_PATH)
+    os.makedirs(AUX_DIR, exist_ok=True)
+    with importlib.resources.as_file(get_builtin_lattice_map()) as lattice_path:
+        shutil.copy(lattice_path, LATTICE_MAP_PATH)
 
 
 def save_map(lexset: int) -> None:
@@ -27,28 +28,28 @@ def save_map(lexset: int) -> None:
         raise CustomException('Map is limited to cardinality {}'.format(MAX_CARDINALITY))
     lattice_map = PartitionLattice(lexset)
     lattice_map.filename = LATTICE_MAP_PATH
+    os.makedirs(AUX_DIR, exist_ok=True)
     lattice_map.save_file()
 
 
-class Subparser(GeneralSubparser):
-    '''Implements argparser.'''
+def save_graph(cardinality: int) -> None:
+    '''Create a lattice graph of partitional operations up to a given cardinality and save into the program's default path.'''
 
-    def setup(self) -> None:
-        self.program_name = 'utils'
-        self.program_help = 'Auxiliary tools'
-        self.add_parent = False
+    if cardinality > MAX_GRAPH_CARDINALITY:
+        raise CustomException('Graph is limited to cardinality {}'.format(MAX_GRAPH_CARDINALITY))
+    graph = make_lattice_graph(cardinality)
+    graph.save_to_dir(LATTICE_GRAPH_PATH)
 
-    def add_arguments(self) -> None:
-        self.parser.add_argument("-sm", "--save_map", help = "Create a lattice map with a given cardinality. Limited to {}".format(MAX_CARDINALITY), type=int)
-        self.parser.add_argument("-s", "--setup", help = "Setup", action='store_true')
 
-    def handle(self, args):
-        global MAX_CARDINALITY
-        MAX_CARDINALITY = 70
+def handle(args) -> None:
+    '''Run the module functions with the parsed command line arguments.'''
 
-        if args.setup:
-            copy_default_lattice_map()
+    if args.setup:
+        copy_default_lattice_map()
 
-        elif args.save_map:
-            cardinality = args.save_map
-            save_map(cardinality)
+    elif args.save_map:
+        cardinality = args.save_map
+        save_map(cardinality)
+
+    elif args.save_graph:
+        save_graph(args.save_graph)
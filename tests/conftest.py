@@ -0,0 +1,27 @@
+'''Shared fixtures of the tests.'''
+
+import os
+import shutil
+
+import pytest
+
+from rpscripts.lib.sounding import PartsTable, get_parts_table_filename
+
+
+SCORE_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'schumann-opus48no2.mxl')
+
+
+@pytest.fixture(scope='session')
+def calc_filename(tmp_path_factory) -> str:
+    '''Calculate the example score with the parts table.'''
+
+    calculator = pytest.importorskip('rpscripts.calculator')
+    filename = str(tmp_path_factory.mktemp('calc') / 'example.mxl')
+    shutil.copyfile(SCORE_FILENAME, filename)
+    calculator.main(filename, False, False, parts_table=True)
+    return filename.replace('.mxl', '.json')
+
+
+@pytest.fixture(scope='session')
+def parts_table(calc_filename) -> PartsTable:
+    return PartsTable(get_parts_table_filename(calc_filename))
@@ -0,0 +1,51 @@
+'''Tests of the complexity index and the lattice map override.'''
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from rpscripts.config import LATTICE_MAP_VARIABLE
+from rpscripts.lib import partition
+from rpscripts.lib.complexity import ComplexityIndex
+
+
+class ComplexityIndexOverrideTest(unittest.TestCase):
+    '''The persistent index must follow the lattice map in use.'''
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.folder.name, 'complexity_index.npy')
+        self.map_path = os.path.join(self.folder.name, 'lattice_map.json')
+
+        # A user's map with reversed dispersions changes the levels
+        reversed_map = {dn: list(reversed(dispersions)) for dn, dispersions in partition.make_ryp_map(70).items()}
+        with open(self.map_path, 'w') as fp:
+            json.dump(reversed_map, fp)
+
+        # No default user's map in the home folder
+        patcher = mock.patch.object(partition, 'LATTICE_MAP_PATH', os.path.join(self.folder.name, 'missing.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.folder.cleanup)
+
+    def test_override_after_index_exists(self) -> None:
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(LATTICE_MAP_VARIABLE, None)
+            builtin_level = ComplexityIndex(self.index_path).get_level(6, 5)
+            self.assertTrue(os.path.exists(self.index_path))
+
+        with mock.patch.dict(os.environ, {LATTICE_MAP_VARIABLE: self.map_path}):
+            index = ComplexityIndex(self.index_path)
+            self.assertNotEqual(index.path, self.index_path)
+            self.assertEqual(index.get_level(6, 5), ComplexityIndex(None).get_level(6, 5))
+            self.assertNotEqual(index.get_level(6, 5), builtin_level)
+
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(LATTICE_MAP_VARIABLE, None)
+            self.assertEqual(ComplexityIndex(self.index_path).get_level(6, 5), builtin_level)
+
+
+if __name__ == '__main__':
+    unittest.main()
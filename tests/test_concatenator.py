@@ -0,0 +1,66 @@
+'''Tests of the concatenation of calculator's JSON outputs.'''
+
+import os
+import shutil
+
+import pytest
+
+from rpscripts import concatenator
+from rpscripts.lib.base import PRIMARY_COLUMNS, CustomException, RPData
+from rpscripts.trimmer import multiple_main
+
+
+EXAMPLE_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'schumann-opus48no2.json')
+RANGES = ['1:6', '7:12', '13:']
+
+
+@pytest.fixture
+def rpdata(tmp_path) -> RPData:
+    filename = str(tmp_path / 'example.json')
+    shutil.copyfile(EXAMPLE_FILENAME, filename)
+    return RPData(filename)
+
+
+def get_excerpts_filenames(rpdata: RPData) -> list:
+    multiple_main(rpdata, RANGES)
+    return [rpdata.path.replace('.json', '-excerpt-{}.json'.format(suffix)) for suffix in ['1-6', '7-12', '13-end']]
+
+
+def test_trim_concat_reconstruction(rpdata) -> None:
+    excerpts = [RPData(filename) for filename in get_excerpts_filenames(rpdata)]
+
+    for merge_parsemae in [True, False]:
+        new_rpdata = excerpts[0].concat(excerpts[1:], merge_parsemae)
+        for column in PRIMARY_COLUMNS:
+            assert list(new_rpdata.data[column]) == list(rpdata.data[column])
+        assert new_rpdata.offset_map == {int(k): v for k, v in rpdata.offset_map.items()}
+        assert list(new_rpdata.tclass) == list(rpdata.tclass)
+        assert list(new_rpdata.labels) == list(rpdata.labels)
+        assert list(new_rpdata.tcontour) == []
+
+
+def test_boundary_merge(rpdata) -> None:
+    first = rpdata.trim(0, 2)
+    second = rpdata.trim(7, 10)
+
+    merged = first.concat([second])
+    assert list(merged.partitions) == ['0', '1.3', '1^2.3', '1.4']
+    assert merged.data['Duration'][1] == rpdata.data['Duration'][1] + rpdata.data['Duration'][7]
+    assert first.concat([second], False).size == 5
+
+
+def test_main(rpdata) -> None:
+    filenames = get_excerpts_filenames(rpdata)
+    concatenator.main(filenames)
+    new_rpdata = RPData(filenames[0].replace('.json', '-concat.json'))
+
+    assert list(new_rpdata.partitions) == list(rpdata.partitions)
+    assert new_rpdata.labels.get_distinct_labels() == ['Part A', 'Part B', 'Part A1']
+
+    output = os.path.join(os.path.dirname(rpdata.path), 'pieces.json')
+    concatenator.main(filenames, output, label_pieces=True)
+    labels = RPData(output).labels.get_distinct_labels()
+    assert labels == ['example-excerpt-1-6', 'example-excerpt-7-12', 'example-excerpt-13-end']
+
+    with pytest.raises(CustomException):
+        concatenator.main(filenames[:1])
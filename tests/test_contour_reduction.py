@@ -0,0 +1,30 @@
+'''Tests of the Morris contour reduction.'''
+
+from rpscripts.tcontour import collapse_repetitions, get_contour_extrema, make_morris_reduction
+
+
+def test_collapse_repetitions() -> None:
+    values = [0, 0, 5, 3, 3, 5, 5]
+
+    assert collapse_repetitions(values, list(range(7))) == [0, 2, 3, 6]
+    assert collapse_repetitions([2, 2, 2], [0, 1, 2]) == [0]
+
+
+def test_extrema() -> None:
+    values = [0, 1, 2, 1, 3]
+
+    assert get_contour_extrema(values, list(range(5)), True) == [0, 2, 4]
+    assert get_contour_extrema(values, list(range(5)), False) == [0, 3, 4]
+
+
+def test_reduction_depths() -> None:
+    assert make_morris_reduction([0, 1, 2, 1, 3]) == [2, 0, 1, 1, 2]
+    assert make_morris_reduction([1, 3, 2, 4, 1, 5, 3]) == [0] * 7
+    assert make_morris_reduction([]) == []
+
+
+def test_reduction_of_repeated_values() -> None:
+    assert make_morris_reduction([0, 5, 5]) == [1, 0, 1]
+    assert make_morris_reduction([5, 5, 0]) == [1, 0, 1]
+    assert make_morris_reduction([0, 5, 5, 0]) == [1, 1, 0, 1]
+    assert make_morris_reduction([0, 5, 5, 5, 3, 5, 2]) == [2, 2, 0, 0, 1, 1, 2]
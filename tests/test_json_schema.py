@@ -0,0 +1,55 @@
+'''Tests of the compact (version 2) and gzip-compressed JSON schemas.'''
+
+import os
+import shutil
+
+import pytest
+
+from rpscripts.converter import convert_schema
+from rpscripts.lib.base import GZIP_MAGIC_NUMBER, RPData, load_json_file
+
+
+EXAMPLE_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'schumann-opus48no2.json')
+
+
+@pytest.fixture
+def json_filename(tmp_path) -> str:
+    filename = str(tmp_path / 'example.json')
+    shutil.copyfile(EXAMPLE_FILENAME, filename)
+    return filename
+
+
+def get_columns(rpdata: RPData) -> dict:
+    columns = {column: list(values) for column, values in rpdata.data.items()}
+    columns.update({attribute: list(rpdata.__getattribute__(attribute)) for attribute in rpdata.get_derived_attributes()})
+    return columns
+
+
+def test_compact_gzip_round_trip(json_filename) -> None:
+    original = load_json_file(json_filename)
+    columns = get_columns(RPData(json_filename))
+
+    convert_schema(json_filename, 2, True)
+    with open(json_filename, 'rb') as fp:
+        assert fp.read(2) == GZIP_MAGIC_NUMBER
+    compact = load_json_file(json_filename)
+    assert compact['version'] == 2
+    assert sorted(compact['texture_data']) == ['Duration', 'Global offset', 'Measure number', 'Offset', 'Partition']
+    assert compact['summary']['size'] == len(original['texture_data']['Partition'])
+
+    rpdata = RPData(json_filename)
+    assert rpdata.schema_version == 2 and rpdata.compress
+    assert get_columns(rpdata) == columns
+
+    convert_schema(json_filename, 1, False)
+    full = load_json_file(json_filename)
+    assert {k: full[k] for k in original} == original
+
+
+def test_compact_without_gzip(json_filename) -> None:
+    columns = get_columns(RPData(json_filename))
+
+    convert_schema(json_filename, 2)
+    with open(json_filename, 'rb') as fp:
+        assert fp.read(1) == b'{'
+    assert get_columns(RPData(json_filename)) == columns
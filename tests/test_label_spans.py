@@ -0,0 +1,40 @@
+'''Tests of the labeled spans of the texture data.'''
+
+from fractions import Fraction
+
+from rpscripts.lib.base import LabelSpans, make_label_spans
+
+
+GLOBAL_OFFSETS = [Fraction(0), Fraction(1), Fraction(5, 2), Fraction(4), Fraction(6), Fraction(8), Fraction(10)]
+DURATIONS = [Fraction(1), Fraction(3, 2), Fraction(3, 2), Fraction(2), Fraction(2), Fraction(2), Fraction(2)]
+
+
+def test_label_spans() -> None:
+    spans = LabelSpans([('b', Fraction(4), Fraction(8)), ('a', Fraction(0), Fraction(5, 2)), ('c', Fraction(20), Fraction(24))], GLOBAL_OFFSETS)
+
+    assert spans.get_spans() == [('a', 0, Fraction(5, 2)), ('b', 4, 8)]
+    assert list(spans) == ['a', 'a', None, 'b', 'b', None, None]
+    assert spans.get_label(Fraction(1)) == 'a'
+    assert spans.get_label(Fraction(3)) is None
+    assert spans.get_label(Fraction(7)) == 'b'
+    assert spans.get_label(Fraction(8)) is None
+    assert spans.get_label_rows_slices('b') == [slice(3, 5)]
+    assert spans.get_distinct_labels() == ['a', 'b']
+
+
+def test_label_spans_trim() -> None:
+    spans = LabelSpans([('a', Fraction(0), Fraction(5, 2)), ('b', Fraction(4), Fraction(12))], GLOBAL_OFFSETS)
+    trimmed = spans[1:5]
+
+    assert trimmed.get_spans() == [('a', 1, Fraction(5, 2)), ('b', 4, 8)]
+    assert list(trimmed) == ['a', None, 'b', 'b']
+    assert trimmed.to_json() == [['a', '1', '5/2'], ['b', '4', '8']]
+
+
+def test_make_label_spans() -> None:
+    labels = ['a', 'a', 'b', None, None, 'a', 'a']
+    spans = make_label_spans(labels, GLOBAL_OFFSETS, DURATIONS)
+
+    assert spans.get_spans() == [('a', 0, Fraction(5, 2)), ('b', Fraction(5, 2), 4), ('a', 8, 12)]
+    assert spans == labels
+    assert spans.get_label_rows_slices('a') == [slice(0, 2), slice(5, 7)]
@@ -0,0 +1,65 @@
+'''Tests of the lattice graph of partitional operations and its use by the neighbor and operation queries.'''
+
+import pytest
+
+from rpscripts.lib import lattice
+from rpscripts.lib.partition import Partition, iter_lexset
+from rpscripts.operations import get_partitional_operation
+
+
+CARDINALITY = 8
+
+
+@pytest.fixture
+def graph_path(tmp_path, monkeypatch) -> str:
+    '''Save a small graph and make it the default one.'''
+
+    path = str(tmp_path / 'lattice_graph')
+    lattice.make_lattice_graph(CARDINALITY).save_to_dir(path)
+    monkeypatch.setattr(lattice, '_LATTICE_GRAPHS', {})
+    monkeypatch.setattr(lattice, 'LATTICE_GRAPH_PATH', path)
+    return path
+
+
+def use_arithmetic(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(lattice, '_LATTICE_GRAPHS', {})
+    monkeypatch.setattr(lattice, 'LATTICE_GRAPH_PATH', str(tmp_path / 'missing'))
+
+
+def get_neighbors(partition: Partition) -> tuple:
+    return partition.resize(), partition.revariate(), partition.transfer(), partition.transfer(False)
+
+
+def test_graph_neighbors() -> None:
+    graph = lattice.make_lattice_graph(4)
+
+    assert graph.get_neighbors('1.2', 'resize+') == [Partition('1.3'), Partition('2^2')]
+    assert graph.get_neighbors('1.2', 'revariance+') == [Partition('1^2.2')]
+    assert graph.get_operation('1.2', '3') == 'transfer-'
+    assert graph.get_operation('3', '1.2') == 'transfer+'
+    assert graph.get_operation('1.2', '4') is None
+
+
+def test_covering_graph(graph_path) -> None:
+    assert lattice.get_lattice_graph(CARDINALITY).cardinality == CARDINALITY
+    assert lattice.get_lattice_graph(CARDINALITY + 1) is None
+
+
+def test_neighbor_queries_match_arithmetic(graph_path, monkeypatch, tmp_path) -> None:
+    partitions = [Partition(parts) for parts in iter_lexset(CARDINALITY - 1)]
+    from_graph = [get_neighbors(p) for p in partitions]
+
+    use_arithmetic(monkeypatch, tmp_path)
+    assert [get_neighbors(p) for p in partitions] == from_graph
+
+
+def test_operations_match_arithmetic(graph_path, monkeypatch, tmp_path) -> None:
+    graph = lattice.get_lattice_graph(CARDINALITY)
+    pairs = []
+    for node in range(len(graph.indptr) - 1):
+        for target in graph.get_neighbors_ids(node):
+            pairs.append((graph.codec.unrank(node), graph.codec.unrank(target)))
+    from_graph = [get_partitional_operation(*pair) for pair in pairs]
+
+    use_arithmetic(monkeypatch, tmp_path)
+    assert [get_partitional_operation(*pair) for pair in pairs] == from_graph
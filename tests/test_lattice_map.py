@@ -0,0 +1,44 @@
+'''Tests of the lattice map generation by dynamic programming.'''
+
+from rpscripts.lib import partition
+from rpscripts.lib.partition import Partition, get_agglomeration_bitsets, get_bitset_values, get_partitions, load_lattice_map, make_ryp_map
+
+
+def get_brute_force_map(higher_cardinality: int) -> dict:
+    '''Return the lattice map from all the partitions' dispersion indexes.'''
+
+    return {
+        dn: sorted(set(Partition(parts).get_dispersion_index() for parts in get_partitions(dn)))
+        for dn in range(1, higher_cardinality + 1)
+    }
+
+
+def test_bitsets() -> None:
+    assert get_bitset_values(0b1011) == [0, 1, 3]
+    assert get_bitset_values(0) == []
+    # 3: agglomerations 0 (1^3), 1 (1.2) and 3 (3)
+    assert get_agglomeration_bitsets(3) == [1, 1, 0b11, 0b1011]
+
+
+def test_small_map() -> None:
+    assert make_ryp_map(5) == {1: [0], 2: [0, 1], 3: [0, 2, 3], 4: [0, 3, 4, 5, 6], 5: [0, 4, 6, 7, 8, 9, 10]}
+
+
+def test_map_matches_brute_force() -> None:
+    assert make_ryp_map(16) == get_brute_force_map(16)
+
+
+def test_map_matches_builtin_map() -> None:
+    builtin_map = load_lattice_map()
+
+    assert max(builtin_map) == 70
+    assert make_ryp_map(70) == builtin_map
+
+
+def test_map_beyond_builtin_map(monkeypatch) -> None:
+    monkeypatch.setattr(partition, 'get_lattice_map', lambda: make_ryp_map(10))
+
+    assert partition.get_ryp_map(8) == make_ryp_map(8)
+    ryp_map = partition.get_ryp_map(80)
+    assert sorted(ryp_map) == list(range(1, 81))
+    assert ryp_map[80][0] == 0 and ryp_map[80][-1] == 80 * 79 // 2
@@ -0,0 +1,48 @@
+'''Tests of the binary search lookups of measures and events.'''
+
+from fractions import Fraction
+
+import pytest
+
+from rpscripts.lib.base import CustomException, OffsetIndex
+
+
+OFFSET_MAP = {'1': '0', '2': '4', '3': '8', '0': '-1'}
+GLOBAL_OFFSETS = [Fraction(0), Fraction(1), Fraction(5, 2), Fraction(4), Fraction(6), Fraction(8), Fraction(10)]
+
+
+@pytest.fixture
+def offset_index() -> OffsetIndex:
+    return OffsetIndex(OFFSET_MAP, GLOBAL_OFFSETS)
+
+
+def test_measures(offset_index) -> None:
+    assert offset_index.measure_numbers == [0, 1, 2, 3]
+    assert offset_index.get_measure_offset(2) == 4
+    assert offset_index.get_measure_offset('3') == 8
+    assert offset_index.has_measure(1) and not offset_index.has_measure(4)
+    with pytest.raises(CustomException):
+        offset_index.get_measure_offset(4)
+
+
+def test_locations(offset_index) -> None:
+    assert offset_index.get_measure_number(Fraction(-2)) == 0
+    assert offset_index.get_measure_number(Fraction(7, 2)) == 1
+    assert offset_index.get_measure_number(Fraction(4)) == 2
+    assert offset_index.get_location(Fraction(19, 2)) == (3, Fraction(3, 2))
+    assert offset_index.get_global_offset(2, '1/2') == Fraction(9, 2)
+
+    location = offset_index.get_event_location(Fraction(5, 2))
+    assert (location.measure_number, location.offset, location.global_offset) == (1, Fraction(5, 2), Fraction(5, 2))
+
+
+def test_rows(offset_index) -> None:
+    assert offset_index.get_row(Fraction(-1)) == -1
+    assert offset_index.get_row(Fraction(0)) == 0
+    assert offset_index.get_row(Fraction(3)) == 2
+    assert offset_index.get_row(Fraction(20)) == 6
+    assert offset_index.get_rows_slice(Fraction(1), Fraction(6)) == slice(1, 4)
+    assert offset_index.get_rows_slice(Fraction(6), Fraction(1)) == slice(4, 4)
+    assert offset_index.get_measures_rows_slice(1, 1) == slice(0, 3)
+    assert offset_index.get_measures_rows_slice(2) == slice(3, 7)
+    assert offset_index.get_measures_rows_slice(None, 2) == slice(0, 5)
@@ -0,0 +1,59 @@
+'''Tests of the partitional operations classification.'''
+
+import os
+import shutil
+
+import pytest
+
+from rpscripts.lib.base import RPData
+from rpscripts.operations import IDENTITY, NO_OPERATION, get_partitional_operation, main, make_operations
+
+
+EXAMPLE_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'schumann-opus48no2.json')
+
+OPERATIONS = [
+    ('1', '2', 'resize+'),
+    ('2', '1', 'resize-'),
+    ('0', '1', 'revariance+'),
+    ('1', '1^2', 'revariance+'),
+    ('1^2', '1', 'revariance-'),
+    ('1', '1^2.2', 'concurrence+'),
+    ('1^2.2', '1', 'concurrence-'),
+    ('3', '1.2', 'transfer+'),
+    ('1.2', '3', 'transfer-'),
+    ('2', '1^2', 'transfer+'),
+    ('1.3', '2^2', 'transfer+'),
+    ('2^2', '1.3', 'transfer-'),
+    ('1.2', '1.2', IDENTITY),
+]
+
+
+@pytest.mark.parametrize('previous, following, operation', OPERATIONS)
+def test_partitional_operation(previous, following, operation) -> None:
+    assert get_partitional_operation(previous, following) == operation
+
+
+def test_partitional_operation_inputs() -> None:
+    assert get_partitional_operation([1, 2], (3,)) == 'transfer-'
+
+
+def test_make_operations() -> None:
+    assert list(make_operations(['0', '1', '1^2', '1^2', '2', '1'])) == [NO_OPERATION, 'revariance+', 'revariance+', IDENTITY, 'transfer-', 'resize-']
+    assert list(make_operations([])) == []
+
+
+def test_make_operations_matches_pairwise() -> None:
+    partitions = list(RPData(EXAMPLE_FILENAME).partitions)
+    operations = [NO_OPERATION] + [get_partitional_operation(a, b) for a, b in zip(partitions, partitions[1:])]
+
+    assert list(make_operations(partitions)) == operations
+
+
+def test_main(tmp_path) -> None:
+    filename = str(tmp_path / 'example.json')
+    shutil.copyfile(EXAMPLE_FILENAME, filename)
+    main(filename)
+
+    operations = list(RPData(filename).operations)
+    assert operations[:5] == [NO_OPERATION, 'concurrence+', 'transfer-', 'resize+', 'concurrence-']
+    assert len(operations) == 55
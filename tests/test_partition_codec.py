@@ -0,0 +1,47 @@
+'''Tests of the streaming partition enumeration and the partition codec.'''
+
+import pytest
+
+from rpscripts.lib.base import CustomException
+from rpscripts.lib.partition import PartitionCodec, get_lexset, get_partitions, iter_lexset, iter_partitions
+
+
+def test_iter_partitions() -> None:
+    assert list(iter_partitions(4)) == [(4,), (3, 1), (2, 2), (2, 1, 1), (1, 1, 1, 1)]
+    assert list(iter_partitions(0)) == []
+    assert get_partitions(3) == [[3], [2, 1], [1, 1, 1]]
+    assert get_lexset(3) == [[1], [2], [1, 1], [3], [2, 1], [1, 1, 1]]
+    assert [len(list(iter_partitions(n))) for n in range(1, 11)] == [1, 2, 3, 5, 7, 11, 15, 22, 30, 42]
+
+
+def test_codec_ids() -> None:
+    codec = PartitionCodec(5)
+
+    assert len(codec) == 19
+    assert codec.rank([]) == 0
+    assert codec.rank([1]) == 1
+    assert codec.rank([2]) == 2
+    assert codec.rank([1, 1]) == 3
+    assert codec.rank([1, 2]) == codec.rank([2, 1]) == 5
+    assert codec.unrank(18) == (1, 1, 1, 1, 1)
+    assert codec.count_partitions(5, 2) == 3
+
+
+def test_codec_round_trip() -> None:
+    codec = PartitionCodec(15)
+    partitions = [()] + list(iter_lexset(15))
+
+    assert len(codec) == len(partitions)
+    assert [codec.rank(parts) for parts in partitions] == list(range(len(partitions)))
+    assert [codec.unrank(i) for i in range(len(codec))] == partitions
+
+
+def test_codec_limits() -> None:
+    codec = PartitionCodec(5)
+
+    with pytest.raises(CustomException):
+        codec.rank([3, 3])
+    with pytest.raises(CustomException):
+        codec.unrank(len(codec))
+    with pytest.raises(CustomException):
+        codec.unrank(-1)
@@ -0,0 +1,109 @@
+'''Tests of the pass manager of derived attributes.'''
+
+import os
+import shutil
+
+import pytest
+
+from rpscripts.lib.base import CategoricalSequence, CustomException, RPData, read_sidecar_rows
+from rpscripts.lib.passes import AttributePass, PassManager, broadcast_values
+from rpscripts.operations import OperationsPass, make_operations
+
+
+EXAMPLE_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'schumann-opus48no2.json')
+
+
+class DensityPass(AttributePass):
+    def setup(self) -> None:
+        self.attribute = 'density'
+        self.calls = 0
+
+    def map_partition(self, partition):
+        self.calls += 1
+        return partition.get_density_number()
+
+
+class DoubledDensityPass(AttributePass):
+    def setup(self) -> None:
+        self.attribute = 'doubled'
+        self.requires = ['density']
+
+    def make_attribute(self, rpdata, partitions, values):
+        return [2 * value for value in rpdata.density]
+
+
+class RequiringPass(AttributePass):
+    def __init__(self, attribute: str, required: str) -> None:
+        self._attribute = attribute
+        self._required = required
+        super().__init__()
+
+    def setup(self) -> None:
+        self.attribute = self._attribute
+        self.requires = [self._required]
+
+
+@pytest.fixture
+def rpdata(tmp_path) -> RPData:
+    filename = str(tmp_path / 'example.json')
+    shutil.copyfile(EXAMPLE_FILENAME, filename)
+    return RPData(filename)
+
+
+def test_broadcast_values() -> None:
+    partitions = CategoricalSequence(['1', '2', '1', '1.2'])
+    values = ['a', 'b', 'c']
+
+    assert list(broadcast_values(partitions, values)) == [values[partitions.categories.index(p)] for p in ['1', '2', '1', '1.2']]
+    assert list(broadcast_values(CategoricalSequence([]), [])) == []
+
+
+def test_passes_order() -> None:
+    doubled = DoubledDensityPass()
+    density = DensityPass()
+    manager = PassManager([doubled, density])
+
+    assert manager.get_passes_order(['doubled']) == [density, doubled]
+    assert manager.get_passes_order(['density', 'doubled']) == [density, doubled]
+    assert manager.get_passes_order(['density']) == [density]
+    with pytest.raises(CustomException):
+        manager.get_passes_order(['tclass'])
+    with pytest.raises(CustomException):
+        manager.register(DensityPass())
+
+
+def test_circular_requirement() -> None:
+    manager = PassManager([RequiringPass('a', 'b'), RequiringPass('b', 'c'), RequiringPass('c', 'a')])
+
+    with pytest.raises(CustomException):
+        manager.get_passes_order(['a'])
+
+
+def test_missing_requirement(rpdata) -> None:
+    manager = PassManager([RequiringPass('changes', 'operations')])
+
+    with pytest.raises(CustomException):
+        manager.run(rpdata, save=False)
+
+
+def test_single_traversal(rpdata) -> None:
+    density = DensityPass()
+    manager = PassManager([DoubledDensityPass(), density])
+
+    assert manager.run(rpdata, save=False) == ['density', 'doubled']
+    assert density.calls == 17
+    assert list(rpdata.density) == list(rpdata.data['Density-number'])
+    assert list(rpdata.doubled) == [2 * value for value in rpdata.data['Density-number']]
+
+
+def test_run_and_save(rpdata) -> None:
+    from rpscripts.tclass import ExtendedRPData, TexturalClassPass
+
+    manager = PassManager([TexturalClassPass(), OperationsPass()])
+    assert manager.run(rpdata) == ['tclass', 'operations']
+    assert [row['attribute'] for row in read_sidecar_rows(rpdata.path)] == ['tclass', 'operations']
+
+    expected = ExtendedRPData(rpdata.path)
+    assert list(expected.operations) == list(make_operations(rpdata.partitions))
+    expected.set_textural_classes()
+    assert list(rpdata.tclass) == list(expected.tclass)
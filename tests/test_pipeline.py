@@ -0,0 +1,89 @@
+'''Tests of the in-process pipeline of the standard processing steps.'''
+
+import glob
+import os
+import shutil
+
+import pytest
+
+from rpscripts.lib.base import GZIP_MAGIC_NUMBER, PRIMARY_COLUMNS, CustomException, RPData, get_sidecar_filename, read_sidecar_rows
+from rpscripts.operations import make_operations
+
+
+pipeline = pytest.importorskip('rpscripts.pipeline')
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+
+def get_columns(rpdata: RPData) -> dict:
+    return {column: list(rpdata.data[column]) for column in PRIMARY_COLUMNS}
+
+
+@pytest.fixture
+def json_filename(tmp_path) -> str:
+    filename = str(tmp_path / 'example.json')
+    shutil.copyfile(os.path.join(EXAMPLES_DIR, 'schumann-opus48no2.json'), filename)
+    return filename
+
+
+@pytest.fixture
+def score_filename(tmp_path) -> str:
+    filename = str(tmp_path / 'example.mxl')
+    shutil.copyfile(os.path.join(EXAMPLES_DIR, 'schumann-opus48no2.mxl'), filename)
+    return filename
+
+
+def test_parse_steps() -> None:
+    assert pipeline.parse_steps('stats, calc,tclass') == ['calc', 'tclass', 'stats']
+    assert pipeline.parse_steps(pipeline.DEFAULT_STEPS) == ['calc', 'tclass', 'tcontour', 'plot', 'stats']
+    with pytest.raises(CustomException):
+        pipeline.parse_steps('calc,plots')
+
+
+def test_invalid_options() -> None:
+    with pytest.raises(CustomException):
+        pipeline.Pipeline('example.json', ['tclass'], compact=True)
+    with pytest.raises(CustomException):
+        pipeline.Pipeline('example.json', ['tcontour'], smoothing='binned')
+
+
+def test_without_calc(json_filename) -> None:
+    with open(json_filename, 'rb') as fp:
+        content = fp.read()
+
+    result = pipeline.main(json_filename, 'tclass,ops')
+
+    assert [name for name, _ in result.timings] == ['load', 'tclass, ops', 'save']
+    with open(json_filename, 'rb') as fp:
+        assert fp.read() == content
+    assert [row['attribute'] for row in read_sidecar_rows(json_filename)] == ['tclass', 'operations']
+
+    rpdata = RPData(json_filename)
+    assert list(rpdata.tclass) == list(result.rpdata.tclass)
+    assert list(rpdata.operations) == list(make_operations(rpdata.partitions))
+
+
+def test_with_calc(score_filename, calc_filename) -> None:
+    result = pipeline.main(score_filename, 'calc,tclass,ops', compact=True, compress=True)
+    json_filename = score_filename.replace('.mxl', '.json')
+
+    assert [name for name, _ in result.timings] == ['calc', 'tclass, ops', 'save']
+    with open(json_filename, 'rb') as fp:
+        assert fp.read(2) == GZIP_MAGIC_NUMBER
+    assert not os.path.exists(get_sidecar_filename(json_filename))
+
+    rpdata = RPData(json_filename)
+    assert rpdata.schema_version == 2
+    assert get_columns(rpdata) == get_columns(RPData(calc_filename))
+    assert list(rpdata.tclass) == list(result.rpdata.tclass)
+    assert len(rpdata.operations) == rpdata.size
+
+
+def test_charts(json_filename, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr('rpscripts.tcontour.COMPLEXITY_INDEX_PATH', str(tmp_path / 'complexity_index.npy'))
+    pipeline.main(json_filename, 'tcontour,plot', smoothing='binned', smoothing_bins=16)
+
+    charts = [os.path.basename(f) for f in glob.glob(str(tmp_path / 'example-*.svg'))]
+    assert 'example-complexity.svg' in charts
+    assert 'example-simple-partitiogram.svg' in charts
+    assert len(RPData(json_filename).tcontour) == 55
@@ -0,0 +1,44 @@
+'''Tests of the bulk partition indexes over ragged arrays.'''
+
+import math
+
+from rpscripts.lib.base import TextureData
+from rpscripts.lib.partition import Partition, get_ragged_indexes, make_ragged_parts
+
+
+PARTITIONS = ['0', '1', '1^3.2', '4', '1.3', '2^2.5']
+
+
+def test_ragged_arrays() -> None:
+    parts, offsets = make_ragged_parts(['0', '1^2.3', Partition('2'), [4, 1]])
+
+    assert parts.tolist() == [1, 1, 3, 2, 1, 4]
+    assert offsets.tolist() == [0, 0, 3, 4, 6]
+
+
+def test_ragged_indexes_match_partitions() -> None:
+    density_numbers, parts_counts, agglomerations, dispersions = get_ragged_indexes(*make_ragged_parts(PARTITIONS))
+
+    assert density_numbers.tolist() == [0, 1, 5, 4, 4, 9]
+    assert parts_counts.tolist() == [0, 1, 4, 1, 2, 3]
+    for i, string in enumerate(PARTITIONS):
+        partition = Partition(string)
+        assert density_numbers[i] == partition.get_density_number()
+        assert parts_counts[i] == partition.get_parts_size()
+        if partition.get_agglomeration_index() is None:
+            assert math.isnan(agglomerations[i]) and math.isnan(dispersions[i])
+        else:
+            assert agglomerations[i] == partition.get_agglomeration_index()
+            assert dispersions[i] == partition.get_dispersion_index()
+
+
+def test_derived_columns() -> None:
+    data = TextureData(values_map={'4': (6, 0)})
+    data['Partition'] = ['0', '1.3', '4', '1.3']
+
+    assert data['Density-number'] == [0, 4, 4, 4]
+    assert data['Agglomeration'][1:] == [3, 6, 3]
+    assert data['Dispersion'][1:] == [3, 0, 3]
+    assert math.isnan(data['Agglomeration'][0])
+    assert math.isnan(data['Dispersion'][0])
+    assert data['Parts'] == [[], [1, 3], [4], [1, 3]]
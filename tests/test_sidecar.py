@@ -0,0 +1,80 @@
+'''Tests of the derived attributes sidecar file.'''
+
+import os
+import shutil
+
+import pytest
+
+from rpscripts.lib.base import RPData, append_sidecar_entries, compact_sidecar_file, get_sidecar_filename, load_sidecar_entries, read_sidecar_rows
+
+
+EXAMPLE_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'schumann-opus48no2.json')
+
+
+@pytest.fixture
+def json_filename(tmp_path) -> str:
+    filename = str(tmp_path / 'example.json')
+    shutil.copyfile(EXAMPLE_FILENAME, filename)
+    return filename
+
+
+def test_sidecar_filename() -> None:
+    assert get_sidecar_filename('dir/piece.json') == 'dir/piece-attributes.jsonl'
+
+
+def test_append_and_load(json_filename) -> None:
+    append_sidecar_entries(json_filename, 'b', {'tclass': ['L']})
+    append_sidecar_entries(json_filename, 'a', {'tclass': ['R', 'B'], 'tcontour': [1, 2]})
+    append_sidecar_entries(json_filename, 'a', {'tclass': ['B', 'B']})
+    with open(get_sidecar_filename(json_filename), 'a') as fp:
+        fp.write('{"base": "a", "attribute": "tcl')
+
+    assert load_sidecar_entries(json_filename, 'a') == {'tclass': ['B', 'B'], 'tcontour': [1, 2]}
+    assert load_sidecar_entries(json_filename, 'b') == {'tclass': ['L']}
+    assert load_sidecar_entries(json_filename, 'c') == {}
+
+
+def test_compaction(json_filename) -> None:
+    for i in range(10):
+        append_sidecar_entries(json_filename, 'a', {'tclass': [i], 'tcontour': [i]})
+        assert len(read_sidecar_rows(json_filename)) <= 4
+
+    assert load_sidecar_entries(json_filename, 'a') == {'tclass': [9], 'tcontour': [9]}
+    assert compact_sidecar_file(json_filename, 'a', force=True)
+    assert [row['data'] for row in read_sidecar_rows(json_filename)] == [[9], [9]]
+
+    # Entries of other base data are superseded
+    assert compact_sidecar_file(json_filename, 'b', force=True)
+    assert read_sidecar_rows(json_filename) == []
+
+
+def test_rpdata_attributes(json_filename) -> None:
+    with open(json_filename, 'rb') as fp:
+        content = fp.read()
+
+    rpdata = RPData(json_filename)
+    tclass = ['B'] * rpdata.size
+    rpdata.set_attribute_from_json('tclass', tclass)
+    rpdata.save_attributes(['tclass'])
+
+    with open(json_filename, 'rb') as fp:
+        assert fp.read() == content
+    assert list(RPData(json_filename).tclass) == tclass
+
+    # A full save includes the attribute and removes the sidecar file
+    rpdata.save_to_file()
+    assert not os.path.exists(get_sidecar_filename(json_filename))
+    assert list(RPData(json_filename).tclass) == tclass
+
+
+def test_hash_invalidation(json_filename) -> None:
+    original = list(RPData(json_filename).tclass)
+
+    rpdata = RPData(json_filename)
+    rpdata.set_attribute_from_json('tclass', ['B'] * rpdata.size)
+    rpdata.save_attributes(['tclass'])
+
+    # The sidecar entries are ignored once the JSON file changes
+    with open(json_filename, 'a') as fp:
+        fp.write('\n')
+    assert list(RPData(json_filename).tclass) == original
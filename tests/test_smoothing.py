@@ -0,0 +1,70 @@
+'''Tests of the smoothing methods of time series.'''
+
+import numpy
+import pytest
+
+from rpscripts.lib.base import CustomException
+from rpscripts.lib.smoothing import binned_smoothing, get_lowess_delta, lowess, make_step_integral, rolling_smoothing, smooth
+
+
+STARTS = [0, 1, 3]
+ENDS = [1, 3, 4]
+VALUES = [2, 4, 0]
+
+
+def test_step_integral() -> None:
+    times, integral = make_step_integral(STARTS, ENDS, VALUES)
+
+    assert times.tolist() == [0, 1, 1, 3, 3, 4]
+    assert integral.tolist() == [0, 2, 2, 10, 10, 10]
+
+
+def test_binned_smoothing() -> None:
+    centers, means = binned_smoothing(STARTS, ENDS, VALUES, bins=2)
+    assert centers.tolist() == [1, 3]
+    assert means.tolist() == [3, 2]
+
+    centers, means = binned_smoothing(STARTS, ENDS, VALUES, bins=4)
+    assert means.tolist() == [2, 4, 4, 0]
+
+    with pytest.raises(CustomException):
+        binned_smoothing(STARTS, ENDS, VALUES, bins=0)
+
+
+def test_rolling_smoothing() -> None:
+    assert rolling_smoothing(STARTS, ENDS, VALUES, 2).tolist() == [2, 3, 2]
+    # Gaps between events have zero value
+    assert rolling_smoothing([0, 2], [1, 3], [4, 4], 4).tolist() == [2, 8 / 3]
+
+    with pytest.raises(CustomException):
+        rolling_smoothing(STARTS, ENDS, VALUES, 0)
+
+
+def test_lowess_delta() -> None:
+    assert get_lowess_delta(numpy.arange(10)) == 0
+    assert get_lowess_delta(numpy.arange(2000)) == pytest.approx(19.99)
+
+
+def test_lowess() -> None:
+    pytest.importorskip('statsmodels')
+    x_values = numpy.arange(50)
+
+    assert lowess(x_values, 2 * x_values + 1, frac=0.3) == pytest.approx(2 * x_values + 1)
+
+
+def test_smooth() -> None:
+    pytest.importorskip('statsmodels')
+    starts = numpy.arange(100)
+    ends = starts + 1
+    values = numpy.full(100, 3.0)
+
+    for method in ['lowess', 'binned', 'rolling']:
+        x_values, y_values = smooth(starts, ends, values, method, frac=0.2, bins=10)
+        assert y_values == pytest.approx(numpy.full(len(x_values), 3.0))
+    assert smooth(starts, ends, values, 'binned', bins=10)[0].tolist() == [5 + 10 * i for i in range(10)]
+    assert smooth(starts, ends, values, 'rolling')[0].tolist() == starts.tolist()
+
+    x_values, y_values = smooth([], [], [])
+    assert len(x_values) == len(y_values) == 0
+    with pytest.raises(CustomException):
+        smooth(starts, ends, values, 'spline')
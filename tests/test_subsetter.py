@@ -0,0 +1,45 @@
+'''Tests of the parts subsets calculated from the parts table.'''
+
+import pytest
+
+from rpscripts.lib.base import PRIMARY_COLUMNS, CustomException, RPData
+from rpscripts.subsetter import get_subset_suffix, main
+
+
+def get_columns(rpdata: RPData) -> dict:
+    return {column: list(rpdata.data[column]) for column in PRIMARY_COLUMNS}
+
+
+def test_parts_selection(parts_table) -> None:
+    assert len(parts_table.parts) == 7
+    assert [part.section for part in parts_table.parts] == ['voices'] + ['keyboards'] * 6
+    assert parts_table.get_parts_indexes() == list(range(7))
+    assert parts_table.get_parts_indexes([1], ['keyboards']) == list(range(7))
+    assert parts_table.get_parts_indexes(instruments=['choir aahs']) == [0]
+    with pytest.raises(CustomException):
+        parts_table.get_parts_indexes([8])
+    with pytest.raises(CustomException):
+        parts_table.get_parts_indexes(sections=['brass'])
+
+
+def test_all_parts_subset_equals_calc(calc_filename, parts_table) -> None:
+    rpdata = parts_table.make_rpdata(parts_table.get_parts_indexes())
+
+    assert get_columns(rpdata) == get_columns(RPData(calc_filename))
+
+
+def test_single_part_subset(parts_table) -> None:
+    rpdata = parts_table.make_rpdata([0])
+
+    assert rpdata.size == 15
+    assert set(rpdata.partitions) == {'0', '1'}
+    assert list(rpdata.data['Density-number'][:4]) == [0, 1, 0, 1]
+
+
+def test_main(calc_filename, parts_table) -> None:
+    main(calc_filename, sections=['keyboards'], compact=True)
+    rpdata = RPData(calc_filename.replace('.json', '-subset-keyboards.json'))
+
+    assert rpdata.schema_version == 2
+    assert get_columns(rpdata) == get_columns(parts_table.make_rpdata(list(range(1, 7))))
+    assert get_subset_suffix([1, 2], ['strings'], ['Alto Sax']) == 'subset-1-2-strings-alto-sax'
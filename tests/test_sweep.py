@@ -0,0 +1,49 @@
+'''Tests of the parts subsets sweep.'''
+
+import csv
+import json
+
+import pytest
+
+from rpscripts.lib.base import PRIMARY_COLUMNS, CustomException, RPData
+from rpscripts.subsetter import main, sweep_main
+
+
+def get_columns(rpdata: RPData) -> dict:
+    return {column: list(rpdata.data[column]) for column in PRIMARY_COLUMNS}
+
+
+def test_groupings(parts_table) -> None:
+    assert parts_table.make_groups('sections') == {'voices': [0], 'keyboards': [1, 2, 3, 4, 5, 6]}
+    assert parts_table.make_groups('section-pairs') == {'voices+keyboards': list(range(7))}
+    assert list(parts_table.make_groups('parts'))[:2] == ['1-MusicXML Part', '2-MusicXML Part']
+
+
+def test_sweep_equals_single_subsets(parts_table) -> None:
+    groups = parts_table.make_groups('parts')
+    groups.update(parts_table.make_groups('sections'))
+    groups_rpdata = parts_table.make_groups_rpdata(groups)
+
+    assert [rpdata.size for rpdata in groups_rpdata.values()][:7] == [15, 35, 2, 2, 19, 7, 4]
+    for name, indexes in groups.items():
+        assert get_columns(groups_rpdata[name]) == get_columns(parts_table.make_rpdata(indexes))
+
+
+def test_sweep_files(calc_filename, tmp_path) -> None:
+    grouping_filename = str(tmp_path / 'grouping.json')
+    with open(grouping_filename, 'w') as fp:
+        json.dump({'choir': ['voices'], 'bass': [5, 6, 7]}, fp)
+
+    prefix = str(tmp_path / 'sweep.json')
+    sweep_main(calc_filename, grouping_filename, output=prefix)
+    main(calc_filename, [5, 6, 7], output=str(tmp_path / 'bass.json'))
+    assert get_columns(RPData(str(tmp_path / 'sweep-subset-bass.json'))) == get_columns(RPData(str(tmp_path / 'bass.json')))
+    assert RPData(str(tmp_path / 'sweep-subset-choir.json')).size == 15
+
+    sweep_main(calc_filename, grouping_filename, stacked=True, output=prefix)
+    with open(str(tmp_path / 'sweep-sweep.csv')) as fp:
+        groups = [row['Group'] for row in csv.DictReader(fp)]
+    assert groups.count('choir') == 15 and set(groups) == {'choir', 'bass'}
+
+    with pytest.raises(CustomException):
+        sweep_main(calc_filename, grouping_filename, stacked=True, compact=True)
@@ -0,0 +1,56 @@
+'''Tests of the measures and labels excerpts of the trimmer.'''
+
+import os
+import shutil
+
+import pytest
+
+from rpscripts.lib.base import PRIMARY_COLUMNS, CustomException, RPData, SequenceView
+from rpscripts.trimmer import make_labels_excerpts, make_measures_excerpt, multiple_main, parse_measures_range
+
+
+EXAMPLE_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'schumann-opus48no2.json')
+
+
+@pytest.fixture
+def rpdata(tmp_path) -> RPData:
+    filename = str(tmp_path / 'example.json')
+    shutil.copyfile(EXAMPLE_FILENAME, filename)
+    return RPData(filename)
+
+
+def test_parse_measures_range() -> None:
+    assert parse_measures_range('3:8') == (3, 8)
+    assert parse_measures_range(' :8') == (None, 8)
+    assert parse_measures_range('3:') == (3, None)
+    for value in ['3', 'a:8']:
+        with pytest.raises(CustomException):
+            parse_measures_range(value)
+
+
+def test_measures_excerpt(rpdata) -> None:
+    excerpt = make_measures_excerpt(rpdata, 2, 3)
+
+    assert excerpt.path.endswith('example-excerpt-2-3.json')
+    assert list(excerpt.data['Measure number']) == [2, 3, 3, 3]
+    assert list(excerpt.partitions) == ['4', '5', '0', '1']
+    assert list(excerpt.data['Global offset']) == list(rpdata.data['Global offset'][2:6])
+    assert isinstance(excerpt.data['Partition'], SequenceView)
+    assert make_measures_excerpt(rpdata, None, None) is None
+
+
+def test_labels_excerpts(rpdata) -> None:
+    excerpts = make_labels_excerpts(rpdata)
+
+    assert [os.path.basename(e.path) for e in excerpts] == ['example-excerpt-1-part-a.json', 'example-excerpt-2-part-b.json', 'example-excerpt-3-part-a1.json']
+    assert [e.labels.get_distinct_labels() for e in excerpts] == [['Part A'], ['Part B'], ['Part A1']]
+    assert sum(e.size for e in excerpts) == rpdata.size
+
+
+def test_multiple_excerpts(rpdata) -> None:
+    multiple_main(rpdata, ['1:6', '7:12', '13:'])
+    filenames = [rpdata.path.replace('.json', '-excerpt-{}.json'.format(suffix)) for suffix in ['1-6', '7-12', '13-end']]
+    excerpts = [RPData(filename) for filename in filenames]
+
+    for column in PRIMARY_COLUMNS:
+        assert sum((list(e.data[column]) for e in excerpts), []) == list(rpdata.data[column])